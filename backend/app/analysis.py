@@ -0,0 +1,192 @@
+"""
+Batch site analysis: nearest track, noise and frequency for many locations.
+
+Locations are grouped by track tile so each group loads its tracks once
+(one Overpass or store lookup shared by every point in it); groups run
+concurrently. Addresses are geocoded through the rate-limited geocoder
+while coordinate items are already being analysed. Each result is saved
+as a SavedAnalysis and emitted as soon as its group is done.
+
+Every result has a `status`: "ok", "no_track" (no track within the
+radius) or "error" (with an `error` message; e.g. the input could not
+be geocoded or the tracks around it could not be loaded). Error results
+are not saved.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+
+from .db import SessionLocal
+from .frequency import find_segment, segment_exposure, segment_profile, summarize
+from .geo import BBox, circle_bbox
+from .geocode import geocode_many
+from .models import Location, SavedAnalysis
+from .overpass import get_nearest_tracks, get_tracks_in_bbox, unavailable_tiles
+from .tiles import tile_for
+
+ANALYSIS_CONCURRENCY = 8
+# Larger batches must run as a job
+STREAM_MAX = 200
+BATCH_MAX = 5000
+# Geocoded sites are analysed in chunks of this size while geocoding continues
+GEOCODE_CHUNK = 25
+
+
+# Tile groups analysed at once, across all running batches
+_slots = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+
+
+class Site(NamedTuple):
+    index: int
+    lat: float
+    lng: float
+    name: Optional[str]
+    address: Optional[str]
+
+
+def _group_bbox(sites: List[Site], radius: int) -> BBox:
+    boxes = [circle_bbox(s.lat, s.lng, radius) for s in sites]
+    return (
+        min(b[0] for b in boxes), min(b[1] for b in boxes),
+        max(b[2] for b in boxes), max(b[3] for b in boxes),
+    )
+
+
+def _error(index: int, name: Optional[str], message: str, **fields) -> Dict[str, Any]:
+    return {"index": index, "name": name, **fields, "status": "error", "error": message}
+
+
+def _evaluate_and_save(sites: List[Site], hits: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Frequency/noise per site and persistence; runs in a worker thread."""
+    results = []
+    with SessionLocal() as db:
+        # Noise for all sites of a segment in one vectorized evaluation
+        by_segment: Dict[str, List[int]] = defaultdict(list)
+        for i, hit in enumerate(hits):
+            if hit is not None:
+                by_segment[hit["track"].segment_id].append(i)
+        noise: Dict[int, Dict[str, float]] = {}
+        for segment_id, positions in by_segment.items():
+            track = hits[positions[0]]["track"]
+            _, exposure = segment_exposure(db, segment_id, track_type=track.track_type)
+            levels = exposure.levels([hits[i]["distance_m"] for i in positions])
+            for j, i in enumerate(positions):
+                noise[i] = {k: round(float(v[j]), 1) for k, v in levels.items()}
+
+        profiles: Dict[str, tuple] = {}
+        for i, (site, hit) in enumerate(zip(sites, hits)):
+            result: Dict[str, Any] = {
+                "index": site.index,
+                "name": site.name,
+                "address": site.address,
+                "lat": site.lat,
+                "lng": site.lng,
+                "status": "no_track",
+                "nearest_track": None,
+                "distance_m": None,
+            }
+            segment_pk = None
+            if hit is not None:
+                track = hit["track"]
+                if track.segment_id not in profiles:
+                    profiles[track.segment_id] = (
+                        find_segment(db, track.segment_id)[0],
+                        *segment_profile(db, track.segment_id, track_type=track.track_type),
+                    )
+                segment_pk, source, hours = profiles[track.segment_id]
+                stats = summarize(hours)
+                result.update({
+                    "status": "ok",
+                    "nearest_track": {"id": track.id, "name": track.name, "track_type": track.track_type},
+                    "distance_m": round(hit["distance_m"], 1),
+                    "frequency_source": source,
+                    "stats": stats,
+                    "noise": noise[i],
+                })
+
+            location = Location(name=site.name, lat=site.lat, lng=site.lng, address=site.address)
+            db.add(location)
+            db.flush()
+            analysis = SavedAnalysis(location_id=location.id, track_segment_id=segment_pk, data_json=result)
+            db.add(analysis)
+            db.flush()
+            results.append({**result, "analysis_id": analysis.id})
+        db.commit()
+    return results
+
+
+async def _analyse_sites(sites: List[Site], radius: int, emit):
+    groups: Dict[Any, List[Site]] = defaultdict(list)
+    for site in sites:
+        groups[tile_for(site.lat, site.lng)].append(site)
+
+    async def run_group(group: List[Site]):
+        async with _slots:
+            # One load for the whole group; the per-site lookups below hit the cache
+            await get_tracks_in_bbox(_group_bbox(group, radius))
+            analysed, hits = [], []
+            for site in group:
+                nearest = await get_nearest_tracks(site.lat, site.lng, radius, 1)
+                if unavailable_tiles(circle_bbox(site.lat, site.lng, radius)):
+                    # Not "no track nearby": part of the area could not be loaded
+                    await emit(_error(site.index, site.name, "track data unavailable",
+                                      address=site.address, lat=site.lat, lng=site.lng))
+                    continue
+                analysed.append(site)
+                hits.append(nearest[0] if nearest else None)
+            for result in await asyncio.to_thread(_evaluate_and_save, analysed, hits):
+                await emit(result)
+
+    await asyncio.gather(*(run_group(g) for g in groups.values()))
+
+
+async def _geocode_and_analyse(pending: List[tuple], radius: int, emit):
+    """Geocode (index, name, address) items and analyse them in chunks as they resolve."""
+    chunk: List[Site] = []
+    tasks = []
+    position = 0
+    async for result in geocode_many([address for _, _, address in pending]):
+        index, name, address = pending[position]
+        position += 1
+        if "error" in result:
+            await emit(_error(index, name, result["error"], address=address))
+            continue
+        chunk.append(Site(index, result["lat"], result["lng"], name, address))
+        if len(chunk) >= GEOCODE_CHUNK:
+            tasks.append(asyncio.create_task(_analyse_sites(chunk, radius, emit)))
+            chunk = []
+    tasks.append(asyncio.create_task(_analyse_sites(chunk, radius, emit)))
+    await asyncio.gather(*tasks)
+
+
+async def analyse_batch(locations: List[Any], radius: int = 2000) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyse locations (objects with lat, lng, address, name), yielding one
+    result per input in completion order; `index` refers to the input.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    sites, pending = [], []
+    for index, loc in enumerate(locations):
+        if loc.lat is not None and loc.lng is not None:
+            sites.append(Site(index, loc.lat, loc.lng, loc.name, loc.address))
+        elif loc.address:
+            pending.append((index, loc.name, loc.address))
+        else:
+            await queue.put(_error(index, loc.name, "lat/lng or address required"))
+
+    async def produce():
+        try:
+            await asyncio.gather(
+                _analyse_sites(sites, radius, queue.put),
+                _geocode_and_analyse(pending, radius, queue.put),
+            )
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(produce())
+    try:
+        while (result := await queue.get()) is not None:
+            yield result
+        await task  # re-raise a failure
+    finally:
+        task.cancel()
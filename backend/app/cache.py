@@ -0,0 +1,124 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Named caches, reported by cache_metrics()
+_caches: Dict[str, "ByteLRU"] = {}
+
+
+class ByteLRU:
+    """
+    LRU mapping bounded by the total size of its values.
+
+    `sizeof` gives a value's size in bytes (taken once, on put); the least
+    recently used entries are evicted once the total exceeds `max_bytes`.
+    With `ttl`, entries older than `ttl` seconds are treated as absent and
+    dropped when seen. `on_evict(key, value)` is called for entries removed
+    by the size bound or the TTL, not for pop(), clear() or replacement.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = len, ttl: Optional[float] = None,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None, name: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (value, size, stored_at)
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        if name is not None:
+            _caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._live(key) is not None
+
+    def _live(self, key: Hashable) -> Optional[Tuple[Any, int, float]]:
+        """Entry for key, expiring it first if it is past the TTL."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+            self._remove(key)
+            self.expirations += 1
+            if self.on_evict is not None:
+                self.on_evict(key, entry[0])
+            return None
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value for key, marking it recently used; counted as a hit or miss."""
+        entry = self._live(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Value for key without touching recency or the counters."""
+        entry = self._live(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        self.pop(key)
+        size = self.sizeof(value)
+        self._data[key] = (value, size, time.monotonic())
+        self.bytes += size
+        # Always keep the newest entry, even if it alone exceeds the bound
+        while self.bytes > self.max_bytes and len(self._data) > 1:
+            old_key, (old, old_size, _) = self._data.popitem(last=False)
+            self.bytes -= old_size
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(old_key, old)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._data:
+            return default
+        return self._remove(key)[0]
+
+    def _remove(self, key: Hashable) -> Tuple[Any, int, float]:
+        entry = self._data.pop(key)
+        self.bytes -= entry[1]
+        return entry
+
+    def expire(self) -> int:
+        """Drop every entry past the TTL; returns how many."""
+        if self.ttl is None:
+            return 0
+        cutoff = time.monotonic() - self.ttl
+        old = [k for k, (_, _, stored_at) in self._data.items() if stored_at < cutoff]
+        for k in old:
+            self._live(k)
+        return len(old)
+
+    def clear(self):
+        self._data.clear()
+        self.bytes = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """Counters of every named cache."""
+    return {name: cache.metrics() for name, cache in sorted(_caches.items())}
@@ -0,0 +1,199 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+USER_AGENT = "SIGNAL-App/1.0"
+
+# Shared client, created lazily and closed in the app lifespan
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Process-wide HTTP client with keep-alive pooling (and HTTP/2 if available)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=httpx.Timeout(45.0, connect=10.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60),
+            headers={"User-Agent": USER_AGENT},
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class RateLimiter:
+    """Spaces calls at least `interval` seconds apart across all callers."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+class UpstreamBudget:
+    """
+    Process-wide budget for one upstream API: at most `concurrency`
+    requests in flight, started at most `rate` per second (0 = unlimited).
+    """
+
+    def __init__(self, concurrency: int, rate: float):
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(concurrency)
+        self._limiter = RateLimiter(1 / rate) if rate > 0 else None
+        self.active = 0
+        self.waiting = 0
+
+    def saturated(self) -> bool:
+        """True while every slot is taken or callers are queued for one."""
+        return self.waiting > 0 or self.active >= self.concurrency
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            if self._limiter is not None:
+                await self._limiter.wait()
+            self.active += 1
+            try:
+                yield
+            finally:
+                self.active -= 1
+        finally:
+            self._slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"concurrency": self.concurrency, "active": self.active, "waiting": self.waiting}
+
+
+class ServerHealth:
+    """
+    Health model for one upstream server.
+
+    Tracks EWMA latency and error rate, and a circuit breaker that opens
+    after FAILURE_THRESHOLD consecutive failures. An open breaker lets a
+    single probe through (half-open) once OPEN_SECONDS have passed: the
+    first caller of admit() claims it, others are refused until its
+    outcome is recorded (or PROBE_SECONDS pass without one).
+    """
+
+    ALPHA = 0.3
+    FAILURE_THRESHOLD = 3
+    OPEN_SECONDS = 60.0
+    PROBE_SECONDS = 60.0
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency_ewma: float | None = None
+        self.error_ewma = 0.0
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.probe_started: float | None = None
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.OPEN_SECONDS:
+            return "half_open"
+        return "open"
+
+    def _probing(self) -> bool:
+        return self.probe_started is not None and time.time() - self.probe_started < self.PROBE_SECONDS
+
+    def available(self) -> bool:
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._probing())
+
+    def admit(self) -> bool:
+        """Call before each request; False while another request probes the half-open breaker."""
+        if self.state != "half_open":
+            return True
+        if self._probing():
+            return False
+        self.probe_started = time.time()
+        return True
+
+    def record_success(self, latency_s: float):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self.error_ewma *= 1 - self.ALPHA
+        if self.latency_ewma is None:
+            self.latency_ewma = latency_s
+        else:
+            self.latency_ewma += self.ALPHA * (latency_s - self.latency_ewma)
+
+    def record_failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.error_ewma += self.ALPHA * (1 - self.error_ewma)
+        if self.consecutive_failures >= self.FAILURE_THRESHOLD or self.state == "half_open":
+            self.opened_at = time.time()
+        self.probe_started = None
+
+    def score(self) -> float:
+        """Expected cost of routing here: latency inflated by error rate."""
+        # Unmeasured servers get a neutral guess so they are tried early
+        latency = self.latency_ewma if self.latency_ewma is not None else 5.0
+        return latency / max(1 - self.error_ewma, 0.05)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "state": self.state,
+            "probing": self._probing(),
+            "latency_ewma_s": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "error_rate_ewma": round(self.error_ewma, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class ServerPool:
+    """Routes requests across mirror servers, fastest healthy first."""
+
+    def __init__(self, urls: List[str]):
+        self.servers = [ServerHealth(u) for u in urls]
+
+    def ranked(self) -> List[ServerHealth]:
+        """Available servers by score; if every breaker is open, all of them."""
+        available = [s for s in self.servers if s.available()]
+        if not available:
+            return sorted(self.servers, key=lambda s: s.opened_at or 0)
+        return sorted(available, key=lambda s: s.score())
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        return [s.to_dict() for s in self.servers]
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import sys
+from array import array
+from typing import Dict, List, Any, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from .geo import BBox
+from .noise import get_track_stats_by_type
+
+# OSM tags carried through to the API's `properties`, in storage order
+PROPERTY_TAGS = ("usage", "service", "operator", "maxspeed", "gauge", "ref")
+
+
+class Track:
+    """
+    One railway way, backed by its batch's shared coordinate buffer.
+
+    Tag values are interned, so the handful of distinct operators, gauges
+    and usages are stored once per process rather than once per way.
+    """
+
+    __slots__ = (
+        "id", "name", "track_type", "electrified", "multi_track", "tags",
+        "_batch", "_index", "_json", "_digest",
+    )
+
+    def __init__(self, batch: "TrackBatch", index: int, way_id: int, name: str, track_type: str,
+                 electrified: bool, multi_track: bool, tags: Tuple[str, ...]):
+        self._batch = batch
+        self._index = index
+        self.id = way_id
+        self.name = name
+        self.track_type = track_type
+        self.electrified = electrified
+        self.multi_track = multi_track
+        self.tags = tags
+        self._json: bytes | None = None
+        self._digest: bytes | None = None
+
+    @property
+    def segment_id(self) -> str:
+        return str(self.id)
+
+    @property
+    def coords(self) -> np.ndarray:
+        """(N, 2) [lon, lat] view into the batch buffer."""
+        offsets = self._batch.offsets
+        return self._batch.coords[offsets[self._index]:offsets[self._index + 1]]
+
+    @property
+    def bbox(self) -> BBox:
+        return tuple(self._batch.bboxes[self._index].tolist())
+
+    @property
+    def properties(self) -> Dict[str, Any]:
+        return {**dict(zip(PROPERTY_TAGS, self.tags)), **get_track_stats_by_type(self.track_type)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """GeoJSON-style dict for API responses."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "segment_id": self.segment_id,
+            "track_type": self.track_type,
+            "electrified": self.electrified,
+            "multi_track": self.multi_track,
+            "geojson_geometry": {
+                "type": "LineString",
+                "coordinates": self.coords.tolist(),
+            },
+            "properties": self.properties,
+        }
+
+    def to_json(self) -> bytes:
+        """Serialized to_dict(), computed once per track."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode()
+        return self._json
+
+    @property
+    def digest(self) -> bytes:
+        """Content hash of to_json(), for building ETags."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self.to_json(), digest_size=16).digest()
+        return self._digest
+
+    def detach(self) -> "Track":
+        """This track backed by a copy of its own coordinates, so it no longer keeps its batch alive."""
+        coords = self.coords.copy()
+        record = (self.id, self.name, self.track_type, self.electrified, self.multi_track, self.tags)
+        bboxes = self._batch.bboxes[self._index:self._index + 1].copy()
+        track = TrackBatch(coords, np.array([0, len(coords)], dtype=np.int64), [record], bboxes)[0]
+        track._json, track._digest = self._json, self._digest
+        return track
+
+
+class TrackBatch:
+    """
+    Tracks from one fetch in columnar form.
+
+    All vertices live in one (N, 2) float64 array; track i owns rows
+    offsets[i]:offsets[i + 1]. Bounding boxes are precomputed per track.
+    """
+
+    __slots__ = ("coords", "offsets", "bboxes", "tracks")
+
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray, records: Sequence[tuple],
+                 bboxes: np.ndarray | None = None):
+        self.coords = coords
+        self.offsets = offsets
+        self.tracks = [Track(self, i, *rec) for i, rec in enumerate(records)]
+
+        if bboxes is not None:
+            self.bboxes = bboxes
+        elif len(records):
+            starts = offsets[:-1]
+            lo = np.minimum.reduceat(coords, starts)
+            hi = np.maximum.reduceat(coords, starts)
+            # (south, west, north, east)
+            self.bboxes = np.column_stack((lo[:, 1], lo[:, 0], hi[:, 1], hi[:, 0]))
+        else:
+            self.bboxes = np.empty((0, 4))
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def __iter__(self) -> Iterator[Track]:
+        return iter(self.tracks)
+
+    def __getitem__(self, i: int) -> Track:
+        return self.tracks[i]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the batch, including record objects."""
+        return (
+            self.coords.nbytes + self.offsets.nbytes + self.bboxes.nbytes
+            + sum(sys.getsizeof(t) + sys.getsizeof(t.tags) for t in self.tracks)
+        )
+
+
+class TrackBatchBuilder:
+    """Accumulates ways into flat buffers, then freezes them into a TrackBatch."""
+
+    def __init__(self):
+        self._coords = array("d")
+        self._offsets = [0]
+        self._records: List[tuple] = []
+
+    def add(self, way_id: int, name: str, track_type: str, electrified: bool, multi_track: bool,
+            tags: Iterable[str], coords: Iterable[float]):
+        """Add a way; `coords` is a flat lon, lat, lon, lat, ... sequence."""
+        self._coords.extend(coords)
+        self._offsets.append(len(self._coords) // 2)
+        self._records.append((
+            way_id,
+            sys.intern(name),
+            track_type,
+            electrified,
+            multi_track,
+            tuple(sys.intern(v) for v in tags),
+        ))
+
+    def build(self) -> TrackBatch:
+        coords = np.frombuffer(self._coords, dtype=np.float64).reshape(-1, 2) if self._coords else np.empty((0, 2))
+        offsets = np.asarray(self._offsets, dtype=np.int64)
+        return TrackBatch(coords, offsets, self._records)
@@ -0,0 +1,256 @@
+"""
+Hourly frequency rollup over train_passages.
+
+train_frequencies holds one counter row per (segment, weekday, hour,
+train type). Loaders call record() for passages they insert and forget()
+for passages they are about to delete, so /stats and the frequency chart
+read at most 7 × 24 × 4 rows per segment instead of scanning passages.
+
+    python -m app.frequency    # rebuild the rollup from train_passages
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .cache import ByteLRU
+from .db import create_schema, engine, SessionLocal
+from .models import GtfsImport, TrackSegment, TrainFrequency, TrainPassage, TrainType
+from .noise import DAY_HOURS, Exposure, type_codes
+from .schedule import TYPES, get_day
+from .store import _insert
+from .telemetry import setup_logging
+
+log = logging.getLogger(__name__)
+
+# Used for passages without a speed (GTFS has none)
+TYPICAL_SPEED_KMH = {
+    TrainType.FERNVERKEHR: 160,
+    TrainType.REGIONALVERKEHR: 120,
+    TrainType.SBAHN: 80,
+    TrainType.GUETERVERKEHR: 70,
+}
+
+RollupKey = Tuple[int, int, int, TrainType]
+
+# Per (segment, day) passage energy sums for the noise model; an hour
+# bounds how long a finished import takes to show up
+EXPOSURE_TTL = 3600
+_exposures = ByteLRU(4 * 1024 * 1024, sizeof=lambda entry: entry[1].nbytes, ttl=EXPOSURE_TTL, name="noise")
+
+
+def _rollup(passages: Iterable[tuple]) -> Dict[RollupKey, List[int]]:
+    """(segment_id, train_type, scheduled_time, speed_kmh) rows -> {key: [passages, speed_sum]}."""
+    totals: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+    for segment_id, train_type, scheduled, speed in passages:
+        train_type = TrainType(train_type)
+        acc = totals[(segment_id, scheduled.weekday(), scheduled.hour, train_type)]
+        acc[0] += 1
+        acc[1] += speed or TYPICAL_SPEED_KMH[train_type]
+    return totals
+
+
+def _apply(db, totals: Dict[RollupKey, List[int]], sign: int):
+    if not totals:
+        return
+    rows = [
+        {
+            "track_segment_id": segment_id,
+            "weekday": weekday,
+            "hour": hour,
+            "train_type": train_type,
+            "passages": sign * count,
+            "speed_sum": sign * speed_sum,
+        }
+        for (segment_id, weekday, hour, train_type), (count, speed_sum) in totals.items()
+    ]
+    table = TrainFrequency.__table__
+    stmt = _insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["track_segment_id", "weekday", "hour", "train_type"],
+        set_={
+            "passages": table.c.passages + stmt.excluded.passages,
+            "speed_sum": table.c.speed_sum + stmt.excluded.speed_sum,
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def record(db, passages: Iterable[tuple]):
+    """Add passages to the rollup (in the caller's transaction)."""
+    _apply(db, _rollup(passages), 1)
+
+
+def forget(db, query):
+    """Subtract the passages matched by a TrainPassage query before deleting them."""
+    rows = query.with_entities(
+        TrainPassage.track_segment_id,
+        TrainPassage.train_type,
+        TrainPassage.scheduled_time,
+        TrainPassage.speed_kmh,
+    ).yield_per(50_000)
+    _apply(db, _rollup(rows), -1)
+
+
+def imported_dates(db) -> Set[date]:
+    """Service days covered by finished GTFS imports."""
+    dates = set()
+    for start, days in db.query(GtfsImport.window_start, GtfsImport.window_days).filter(
+        GtfsImport.finished_at.isnot(None)
+    ):
+        dates.update(start.date() + timedelta(days=d) for d in range(days))
+    return dates
+
+
+def covered_days(db) -> List[int]:
+    """Number of imported service days per weekday (0 = Monday)."""
+    counts = [0] * 7
+    for d in imported_dates(db):
+        counts[d.weekday()] += 1
+    return counts
+
+
+def hourly_profile(db, segment_id: int, weekday: Optional[int] = None) -> Optional[List[Dict]]:
+    """
+    Average trains per hour of day for one segment, split by train type.
+
+    Averages over all imported days, or over one weekday. None if the
+    segment has no timetable data.
+    """
+    days = covered_days(db)
+    n_days = days[weekday] if weekday is not None else sum(days)
+    if not n_days:
+        return None
+
+    query = db.query(TrainFrequency).filter(TrainFrequency.track_segment_id == segment_id)
+    if weekday is not None:
+        query = query.filter(TrainFrequency.weekday == weekday)
+
+    counts = [dict.fromkeys(TrainType, 0) for _ in range(24)]
+    speeds = [0] * 24
+    found = False
+    for row in query:
+        counts[row.hour][row.train_type] += row.passages
+        speeds[row.hour] += row.speed_sum
+        found = found or row.passages > 0
+    if not found:
+        return None
+
+    hours = []
+    for hour in range(24):
+        by_type = counts[hour]
+        total = sum(by_type.values())
+        freight = by_type[TrainType.GUETERVERKEHR]
+        hours.append({
+            "hour": hour,
+            "passenger": round((total - freight) / n_days, 1),
+            "freight": round(freight / n_days, 1),
+            "total": round(total / n_days, 1),
+            "by_type": {t.value: round(c / n_days, 1) for t, c in by_type.items()},
+            "avg_speed": speeds[hour] / total if total else 0.0,
+        })
+    return hours
+
+
+def find_segment(db, track_id: str) -> Tuple[Optional[int], str]:
+    """(primary key, track type) of a stored segment by OSM way id; (None, "main") if unknown."""
+    row = db.query(TrackSegment.id, TrackSegment.track_type).filter(TrackSegment.segment_id == track_id).first()
+    return (row[0], row[1].value) if row else (None, "main")
+
+
+def segment_profile(db, track_id: str, weekday: Optional[int] = None,
+                    track_type: Optional[str] = None) -> Tuple[str, List[Dict]]:
+    """
+    ("timetable", profile) from imported passages, else ("estimate",
+    profile) of the generated schedule for today (or the next `weekday`).
+
+    `track_type` is used for segments not in the store (e.g. a Track from
+    the tile cache).
+    """
+    segment_pk, stored_type = find_segment(db, track_id)
+    hours = hourly_profile(db, segment_pk, weekday) if segment_pk is not None else None
+    if hours is not None:
+        return "timetable", hours
+
+    day = date.today()
+    if weekday is not None:
+        day += timedelta(days=(weekday - day.weekday()) % 7)
+    if segment_pk is not None or track_type is None:
+        track_type = stored_type
+    return "estimate", get_day(track_id, track_type, day).hourly()
+
+
+def segment_exposure(db, track_id: str, day: Optional[date] = None,
+                     track_type: Optional[str] = None) -> Tuple[str, Exposure]:
+    """
+    (source, Exposure) of every passage on one segment and calendar day:
+    imported passages if the day is covered by a GTFS import, else the
+    generated schedule. Cached per (segment, day).
+    """
+    day = day or date.today()
+    segment_pk, stored_type = find_segment(db, track_id)
+    if segment_pk is not None or track_type is None:
+        track_type = stored_type
+    key = (track_id, track_type, day)
+    cached = _exposures.get(key)
+    if cached is not None:
+        return cached
+
+    if segment_pk is not None and day in imported_dates(db):
+        start = datetime.combine(day, datetime.min.time())
+        rows = db.query(TrainPassage.train_type, TrainPassage.scheduled_time, TrainPassage.speed_kmh).filter(
+            TrainPassage.track_segment_id == segment_pk,
+            TrainPassage.scheduled_time >= start,
+            TrainPassage.scheduled_time < start + timedelta(days=1),
+        ).all()
+        types = [TrainType(t) for t, _, _ in rows]
+        speeds = np.fromiter(
+            (speed or TYPICAL_SPEED_KMH[t] for t, (_, _, speed) in zip(types, rows)), dtype=np.float64, count=len(rows)
+        )
+        hours = np.fromiter((scheduled.hour for _, scheduled, _ in rows), dtype=np.int8, count=len(rows))
+        entry = ("timetable", Exposure(type_codes(types), speeds, hours))
+    else:
+        schedule = get_day(track_id, track_type, day)
+        codes = type_codes(TYPES)[schedule.types]
+        entry = ("estimate", Exposure(codes, schedule.speeds, schedule.seconds // 3600))
+    _exposures.put(key, entry)
+    return entry
+
+
+def summarize(hours: List[Dict]) -> Dict[str, float]:
+    """StatsResponse fields from an hourly profile."""
+    total = sum(h["total"] for h in hours)
+    day = sum(hours[h]["total"] for h in DAY_HOURS)
+    freight = sum(h["freight"] for h in hours)
+    return {
+        "trains_per_day": round(day),
+        "trains_per_night": round(total - day),
+        "max_per_hour": round(max(h["total"] for h in hours)),
+        "freight_percentage": freight / total if total else 0.0,
+        "avg_speed": sum(h["avg_speed"] * h["total"] for h in hours) / total if total else 0.0,
+    }
+
+
+def rebuild():
+    """Recompute train_frequencies from scratch."""
+    with SessionLocal() as db:
+        db.query(TrainFrequency).delete(synchronize_session=False)
+        rows = db.query(
+            TrainPassage.track_segment_id,
+            TrainPassage.train_type,
+            TrainPassage.scheduled_time,
+            TrainPassage.speed_kmh,
+        ).filter(TrainPassage.track_segment_id.isnot(None)).yield_per(50_000)
+        totals = _rollup(rows)
+        _apply(db, totals, 1)
+        db.commit()
+        log.info("Rebuilt frequency rollup", extra={"rows": len(totals)})
+
+
+if __name__ == "__main__":
+    setup_logging()
+    with engine.begin() as conn:
+        create_schema(conn)
+    rebuild()
@@ -0,0 +1,77 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEG = math.pi * EARTH_RADIUS_M / 180
+
+# (south, west, north, east) in degrees
+BBox = Tuple[float, float, float, float]
+
+
+def circle_bbox(lat: float, lng: float, radius_m: float) -> BBox:
+    """Bounding box of a circle around a point."""
+    dlat = radius_m / METERS_PER_DEG
+    dlng = radius_m / (METERS_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+    return (lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+
+
+def bbox_intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def distance_to_line(lat: float, lng: float, coordinates) -> float:
+    """
+    Shortest distance in meters from a point to a [lon, lat] polyline.
+
+    Uses a local equirectangular projection around the point, which is
+    accurate to well under a meter at the few-km scale we query.
+    """
+    pts = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    x = (pts[:, 0] - lng) * (METERS_PER_DEG * math.cos(math.radians(lat)))
+    y = (pts[:, 1] - lat) * METERS_PER_DEG
+    if len(pts) == 1:
+        return float(math.hypot(x[0], y[0]))
+
+    ax, ay = x[:-1], y[:-1]
+    dx, dy = x[1:] - ax, y[1:] - ay
+    len2 = dx * dx + dy * dy
+    t = np.divide(-(ax * dx + ay * dy), len2, out=np.zeros_like(len2), where=len2 > 0)
+    np.clip(t, 0.0, 1.0, out=t)
+    return float(np.hypot(ax + t * dx, ay + t * dy).min())
+
+
+def simplify_line(points, tolerance: float):
+    """
+    Douglas-Peucker simplification of an (N, 2) array in planar units.
+
+    Returns the kept points as a new array; endpoints are always kept.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    n = len(pts)
+    if n < 3 or tolerance <= 0:
+        return pts
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        a, b = pts[i], pts[j]
+        seg = b - a
+        seg_len = math.hypot(seg[0], seg[1])
+        rel = pts[i + 1:j] - a
+        if seg_len > 0:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        else:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            m = i + 1 + k
+            keep[m] = True
+            stack.append((i, m))
+            stack.append((m, j))
+    return pts[keep]
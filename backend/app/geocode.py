@@ -0,0 +1,137 @@
+"""
+Geocoding through Nominatim, cached in the locations table.
+
+Addresses are normalized before lookup, so "Hauptstr. 1, Berlin" and
+"hauptstrasse 1 berlin" share one cache entry. Nominatim is only asked
+on a miss, at most NOMINATIM_RATE times per second across the process
+(its usage policy allows 1). NOMINATIM_URL may point at a local
+instance or a stub.
+"""
+import logging
+import os
+import re
+import time
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from .clients import RateLimiter, get_client
+from sqlalchemy import select
+
+from .db import AsyncSessionLocal
+from .models import Location
+from .telemetry import NOMINATIM_LATENCY
+
+log = logging.getLogger(__name__)
+
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+NOMINATIM_RATE = float(os.getenv("NOMINATIM_RATE", "1"))  # requests per second, 0 = unlimited
+GEOCODE_TTL = timedelta(days=90)
+NOT_FOUND_TTL = 24 * 3600  # seconds
+BATCH_MAX = 10_000
+
+_limiter = RateLimiter(1 / NOMINATIM_RATE if NOMINATIM_RATE > 0 else 0.0)
+# Normalized addresses Nominatim had no result for, with the time of the lookup
+_not_found: Dict[str, float] = {}
+
+Coords = Tuple[float, float]
+
+
+def normalize_address(address: str) -> str:
+    """Cache key for an address: case-folded, separators and abbreviations unified."""
+    text = unicodedata.normalize("NFKC", address).casefold()
+    text = re.sub(r"str\.", "strasse ", text)
+    text = re.sub(r"[,;]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()[:500]
+
+
+async def cached_coords(db, keys: Iterable[str]) -> Dict[str, Coords]:
+    """Fresh cached coordinates for normalized addresses (AsyncSession)."""
+    cutoff = datetime.utcnow() - GEOCODE_TTL
+    keys = list(set(keys))
+    found: Dict[str, Coords] = {}
+    for i in range(0, len(keys), 500):
+        rows = await db.execute(select(Location.address_key, Location.lat, Location.lng).where(
+            Location.address_key.in_(keys[i:i + 500]),
+            Location.geocoded_at >= cutoff,
+        ))
+        for key, lat, lng in rows:
+            found[key] = (lat, lng)
+    return found
+
+
+async def query_nominatim(address: str) -> Optional[Coords]:
+    """
+    One rate-limited Nominatim search; None if there is no result.
+    Raises httpx.HTTPError, or ValueError for a malformed response body.
+    """
+    key = normalize_address(address)
+    if time.time() - _not_found.get(key, 0) < NOT_FOUND_TTL:
+        return None
+
+    await _limiter.wait()
+    started = time.monotonic()
+    status = "error"
+    try:
+        resp = await get_client().get(
+            NOMINATIM_URL,
+            params={
+                "q": address,
+                "format": "json",
+                "limit": 1,
+                "countrycodes": "de"
+            },
+            timeout=15.0
+        )
+        status = str(resp.status_code)
+    except httpx.TimeoutException:
+        status = "timeout"
+        raise
+    finally:
+        NOMINATIM_LATENCY.labels(status=status).observe(time.monotonic() - started)
+    resp.raise_for_status()
+    results = resp.json()
+    if not results:
+        _not_found[key] = time.time()
+        return None
+    try:
+        return float(results[0]["lat"]), float(results[0]["lon"])
+    except (KeyError, IndexError, TypeError) as e:
+        raise ValueError(f"Malformed Nominatim result: {e!r}") from e
+
+
+async def geocode_many(addresses: List[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Geocode a list of addresses, yielding one result per input in order.
+
+    Cache hits are resolved in one query up front; misses go to Nominatim
+    one by one (rate-limited) and are stored as locations as they arrive.
+    Duplicate addresses are looked up once.
+    """
+    keys = [normalize_address(a) for a in addresses]
+    async with AsyncSessionLocal() as db:
+        hits = await cached_coords(db, keys)
+    resolved: Dict[str, Optional[Coords]] = dict(hits)
+
+    for address, key in zip(addresses, keys):
+        if key not in resolved:
+            try:
+                coords = await query_nominatim(address)
+            except (httpx.HTTPError, ValueError) as e:
+                log.warning("Geocoding failed", extra={"address": address, "error": str(e)})
+                yield {"address": address, "error": "geocoding failed"}
+                continue
+            resolved[key] = coords
+            if coords is not None:
+                async with AsyncSessionLocal() as db:
+                    db.add(Location(lat=coords[0], lng=coords[1], address=address,
+                                    address_key=key, geocoded_at=datetime.utcnow()))
+                    await db.commit()
+
+        coords = resolved[key]
+        if coords is None:
+            yield {"address": address, "error": "not found"}
+        else:
+            yield {"address": address, "lat": coords[0], "lng": coords[1], "cached": key in hits}
@@ -0,0 +1,371 @@
+"""
+Streaming GTFS importer for train_passages.
+
+    python -m app.gtfs FEED [--start YYYY-MM-DD] [--days 7] [--batch 50000] [--force]
+
+FEED is a GTFS .zip or an unpacked directory. stop_times.txt is read as a
+stream, one row at a time; each departure of a rail trip at a stop is
+turned into a passage on the track segment nearest that stop, for every
+service day in the import window. Passages are bulk-loaded in batches
+(COPY on PostgreSQL), and each batch commits together with a checkpoint,
+so an interrupted import resumes where it stopped.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import logging
+import os
+import re
+import sys
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from . import frequency
+from .db import create_schema, engine, SessionLocal
+from .geo import circle_bbox, distance_to_line
+from .models import GtfsImport, TrackSegment, TrainPassage, TrainType
+from .telemetry import setup_logging
+
+log = logging.getLogger(__name__)
+
+# A stop is matched to the nearest track segment within this distance
+STOP_RADIUS_M = 300
+BATCH_ROWS = 50_000
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+FERN_PREFIX = re.compile(r"^(ICE|IC|EC|ECE|RJX?|NJ|FLX|TGV)\b", re.IGNORECASE)
+SBAHN_PREFIX = re.compile(r"^S\s?\d", re.IGNORECASE)
+
+
+class _CountingReader(io.RawIOBase):
+    """Counts bytes read through it, for progress reporting."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self.raw.readinto(buffer) or 0
+        self.count += n
+        return n
+
+
+class Feed:
+    """Read access to the files of a GTFS feed, zipped or unpacked."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+
+    def has(self, name: str) -> bool:
+        if self._zip is not None:
+            return name in self._zip.namelist()
+        return os.path.exists(os.path.join(self.path, name))
+
+    def size(self, name: str) -> int:
+        if self._zip is not None:
+            return self._zip.getinfo(name).file_size
+        return os.path.getsize(os.path.join(self.path, name))
+
+    @property
+    def fingerprint(self) -> str:
+        """Cheap identity of the feed (name, size, mtime), for resuming."""
+        target = self.path if self._zip is not None else os.path.join(self.path, "stop_times.txt")
+        st = os.stat(target)
+        key = f"{os.path.abspath(self.path)}:{st.st_size}:{int(st.st_mtime)}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @contextmanager
+    def open(self, name: str):
+        """Binary stream of one feed file, wrapped to count bytes read."""
+        raw = self._zip.open(name) if self._zip is not None else open(os.path.join(self.path, name), "rb")
+        try:
+            yield _CountingReader(raw)
+        finally:
+            raw.close()
+
+    def rows(self, name: str) -> Iterator[Dict[str, str]]:
+        with self.open(name) as stream:
+            text = io.TextIOWrapper(io.BufferedReader(stream), encoding="utf-8-sig", newline="")
+            yield from csv.DictReader(text)
+
+
+def classify_route(route_type: int, short_name: str) -> Optional[TrainType]:
+    """TrainType of a GTFS route, or None if it is not heavy rail."""
+    if not (route_type == 2 or 100 <= route_type <= 117):
+        return None
+    if route_type in (101, 102) or FERN_PREFIX.match(short_name):
+        return TrainType.FERNVERKEHR
+    if route_type == 109 or SBAHN_PREFIX.match(short_name):
+        return TrainType.SBAHN
+    return TrainType.REGIONALVERKEHR
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y%m%d").date()
+
+
+def _parse_time(value: str) -> timedelta:
+    """GTFS HH:MM:SS, which may run past 24:00 on the service day."""
+    h, m, s = value.strip().split(":")
+    return timedelta(hours=int(h), minutes=int(m), seconds=int(s))
+
+
+def active_dates(feed: Feed, start: date, days: int) -> Dict[str, List[date]]:
+    """Service days of each service_id inside the import window."""
+    window = [start + timedelta(days=d) for d in range(days)]
+    services: Dict[str, set] = {}
+
+    if feed.has("calendar.txt"):
+        for row in feed.rows("calendar.txt"):
+            first, last = _parse_date(row["start_date"]), _parse_date(row["end_date"])
+            for d in window:
+                if first <= d <= last and row[WEEKDAYS[d.weekday()]] == "1":
+                    services.setdefault(row["service_id"], set()).add(d)
+
+    if feed.has("calendar_dates.txt"):
+        in_window = set(window)
+        for row in feed.rows("calendar_dates.txt"):
+            d = _parse_date(row["date"])
+            if d not in in_window:
+                continue
+            if row["exception_type"] == "1":
+                services.setdefault(row["service_id"], set()).add(d)
+            else:
+                services.get(row["service_id"], set()).discard(d)
+
+    return {sid: sorted(ds) for sid, ds in services.items() if ds}
+
+
+def load_trips(feed: Feed, services: Dict[str, List[date]]) -> Dict[str, tuple]:
+    """
+    Rail trips running in the window.
+
+    Maps trip_id to (train_type, train_number, headsign, operator, dates).
+    trips.txt is streamed and only trips stop_times.txt can use are kept:
+    non-rail routes and trips without service days are dropped, and
+    values share the per-route, per-service and repeated headsign/number
+    objects, so a nationwide feed costs little more than its rail trip ids.
+    """
+    agencies = {}
+    if feed.has("agency.txt"):
+        agencies = {row.get("agency_id", ""): row["agency_name"] for row in feed.rows("agency.txt")}
+
+    routes = {}
+    for row in feed.rows("routes.txt"):
+        short_name = row.get("route_short_name", "") or row.get("route_long_name", "")
+        train_type = classify_route(int(row["route_type"]), short_name)
+        if train_type is None:
+            continue
+        operator = agencies.get(row.get("agency_id", ""), "") or next(iter(agencies.values()), "")
+        routes[row["route_id"]] = (train_type, short_name, operator)
+
+    trips = {}
+    skipped = 0
+    for row in feed.rows("trips.txt"):
+        route = routes.get(row["route_id"])
+        dates = services.get(row["service_id"])
+        if route is None or not dates:
+            skipped += 1
+            continue
+        train_type, short_name, operator = route
+        number = sys.intern(row.get("trip_short_name") or short_name)
+        headsign = sys.intern(row.get("trip_headsign", ""))
+        trips[row["trip_id"]] = (train_type, number, headsign, operator, dates)
+    log.info("Trips loaded", extra={"trips": len(trips), "skipped": skipped})
+    return trips
+
+
+class StopMatcher:
+    """Nearest track segment per stop, looked up lazily and cached."""
+
+    def __init__(self, db, feed: Feed):
+        self.db = db
+        self.stops: Dict[str, Tuple[float, float]] = {}
+        for row in feed.rows("stops.txt"):
+            if row.get("stop_lat") and row.get("stop_lon"):
+                self.stops[row["stop_id"]] = (float(row["stop_lat"]), float(row["stop_lon"]))
+        self._cache: Dict[str, Optional[int]] = {}
+
+    def segment_for(self, stop_id: str) -> Optional[int]:
+        if stop_id in self._cache:
+            return self._cache[stop_id]
+
+        best = None
+        position = self.stops.get(stop_id)
+        if position is not None:
+            lat, lng = position
+            south, west, north, east = circle_bbox(lat, lng, STOP_RADIUS_M)
+            candidates = self.db.query(TrackSegment.id, TrackSegment.geojson_geometry).filter(and_(
+                TrackSegment.min_lat <= north,
+                TrackSegment.max_lat >= south,
+                TrackSegment.min_lng <= east,
+                TrackSegment.max_lng >= west,
+            )).all()
+            best_distance = STOP_RADIUS_M
+            for segment_id, geometry in candidates:
+                d = distance_to_line(lat, lng, geometry["coordinates"])
+                if d <= best_distance:
+                    best, best_distance = segment_id, d
+
+        self._cache[stop_id] = best
+        return best
+
+
+PASSAGE_COLUMNS = (
+    "track_segment_id", "train_type", "train_number", "direction",
+    "scheduled_time", "operator", "import_id", "created_at",
+)
+
+
+def _load_batch(db, rows: List[tuple]):
+    """Bulk-insert passage rows (COPY on PostgreSQL) and count them into the frequency rollup."""
+    if not rows:
+        return
+    frequency.record(db, ((row[0], row[1], row[4], None) for row in rows))
+    if engine.dialect.name == "postgresql":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            # Enum columns store member names
+            writer.writerow((row[0], row[1].name) + row[2:])
+        buf.seek(0)
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY train_passages ({', '.join(PASSAGE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buf
+            )
+        finally:
+            cursor.close()
+    else:
+        db.execute(TrainPassage.__table__.insert(), [dict(zip(PASSAGE_COLUMNS, row)) for row in rows])
+
+
+def import_feed(path: str, start: date, days: int = 7, batch_rows: int = BATCH_ROWS, force: bool = False) -> GtfsImport:
+    """Import (or resume importing) a feed's passages for the window [start, start + days)."""
+    feed = Feed(path)
+    window_start = datetime.combine(start, datetime.min.time())
+
+    with SessionLocal() as db:
+        job = db.query(GtfsImport).filter(
+            GtfsImport.feed_hash == feed.fingerprint,
+            GtfsImport.window_start == window_start,
+            GtfsImport.window_days == days,
+        ).order_by(GtfsImport.id.desc()).first()
+
+        if job is not None and job.finished_at is not None and not force:
+            log.info("Feed already imported; use --force to redo",
+                     extra={"import_id": job.id, "passages": job.passages_loaded})
+            return job
+        if job is None or job.finished_at is not None:
+            job = GtfsImport(feed=path, feed_hash=feed.fingerprint, window_start=window_start, window_days=days)
+            db.add(job)
+            db.commit()
+        elif job.rows_done:
+            log.info("Resuming import", extra={"import_id": job.id, "rows_done": job.rows_done})
+
+        services = active_dates(feed, start, days)
+        trips = load_trips(feed, services)
+        matcher = StopMatcher(db, feed)
+        log.info("Feed loaded", extra={"trips": len(trips), "services": len(services), "stops": len(matcher.stops)})
+
+        total_bytes = feed.size("stop_times.txt")
+        started = time.time()
+        batch: List[tuple] = []
+        row_no = -1
+
+        def flush(rows_done: int):
+            now = datetime.utcnow()
+            _load_batch(db, [r + (job.id, now) for r in batch])
+            job.rows_done = rows_done
+            job.passages_loaded = (job.passages_loaded or 0) + len(batch)
+            job.updated_at = now
+            db.commit()
+            batch.clear()
+
+            elapsed = max(time.time() - started, 1e-6)
+            pct = 100 * stream.count / max(total_bytes, 1)
+            log.info("Import progress", extra={
+                "percent": round(pct, 1),
+                "rows_done": rows_done,
+                "passages": job.passages_loaded,
+                "rows_per_s": round((rows_done - resume_from) / elapsed),
+            })
+
+        resume_from = job.rows_done or 0
+        with feed.open("stop_times.txt") as stream:
+            text = io.TextIOWrapper(io.BufferedReader(stream), encoding="utf-8-sig", newline="")
+            for row_no, row in enumerate(csv.DictReader(text)):
+                if row_no < resume_from:
+                    continue
+                trip = trips.get(row["trip_id"])
+                if trip is None:
+                    continue
+                when = row.get("departure_time") or row.get("arrival_time")
+                if not when:
+                    continue
+                segment_id = matcher.segment_for(row["stop_id"])
+                if segment_id is None:
+                    continue
+
+                train_type, number, headsign, operator, dates = trip
+                offset = _parse_time(when)
+                for d in dates:
+                    scheduled = datetime.combine(d, datetime.min.time()) + offset
+                    batch.append((segment_id, train_type, number, headsign, scheduled, operator))
+
+                if len(batch) >= batch_rows:
+                    flush(row_no + 1)
+
+            flush(row_no + 1)
+
+        # The new import supersedes earlier passages in its window, including
+        # after-midnight runs of imports whose window lies entirely inside it
+        window_end = window_start + timedelta(days=days)
+        contained = [
+            other.id for other in db.query(GtfsImport).filter(GtfsImport.id != job.id)
+            if other.window_start >= window_start
+            and other.window_start + timedelta(days=other.window_days) <= window_end
+        ]
+        superseded = db.query(TrainPassage).filter(
+            TrainPassage.import_id != job.id,
+            or_(
+                and_(TrainPassage.scheduled_time >= window_start, TrainPassage.scheduled_time < window_end),
+                TrainPassage.import_id.in_(contained),
+            ),
+        )
+        frequency.forget(db, superseded)
+        superseded.delete(synchronize_session=False)
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        log.info("Import finished", extra={"import_id": job.id, "passages": job.passages_loaded})
+        db.refresh(job)
+        return job
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a GTFS feed into train_passages")
+    parser.add_argument("feed", help="GTFS .zip or directory")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="first service day (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=7, help="number of service days to import")
+    parser.add_argument("--batch", type=int, default=BATCH_ROWS, help="passages per bulk-load batch")
+    parser.add_argument("--force", action="store_true", help="re-import a feed that already finished")
+    args = parser.parse_args()
+
+    setup_logging()
+    with engine.begin() as conn:
+        create_schema(conn)
+    import_feed(args.feed, args.start, args.days, args.batch, args.force)
+
+
+if __name__ == "__main__":
+    main()
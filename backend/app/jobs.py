@@ -0,0 +1,77 @@
+"""
+In-process registry of long-running batch jobs, polled by id.
+
+A job runs as an asyncio task and appends to `results` as it goes;
+finished jobs are dropped JOB_TTL seconds after they end.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List
+
+log = logging.getLogger(__name__)
+
+JOB_TTL = 3600  # seconds
+
+
+class Job:
+    __slots__ = ("id", "kind", "total", "results", "status", "error", "created_at", "finished_at", "task")
+
+    def __init__(self, kind: str, total: int):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.total = total
+        self.results: List[Any] = []
+        self.status = "running"
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.task: asyncio.Task | None = None
+
+    def to_dict(self, offset: int = 0) -> Dict[str, Any]:
+        """Status plus results from `offset` on, so pollers fetch only what is new."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "total": self.total,
+            "done": len(self.results),
+            "offset": offset,
+            "results": self.results[offset:],
+        }
+
+
+_jobs: Dict[str, Job] = {}
+
+
+def _prune():
+    now = time.time()
+    for job_id in [j.id for j in _jobs.values() if j.finished_at and now - j.finished_at > JOB_TTL]:
+        del _jobs[job_id]
+
+
+def start_job(kind: str, total: int, run: Callable[[Job], Awaitable[None]]) -> Job:
+    """Register a job and run `run(job)` in the background."""
+    _prune()
+    job = Job(kind, total)
+    _jobs[job.id] = job
+
+    async def wrapper():
+        try:
+            await run(job)
+            job.status = "done"
+        except Exception as e:
+            log.exception("Job failed", extra={"job_id": job.id, "kind": job.kind})
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+
+    job.task = asyncio.create_task(wrapper())
+    return job
+
+
+def get_job(job_id: str) -> Job | None:
+    return _jobs.get(job_id)
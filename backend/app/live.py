@@ -0,0 +1,314 @@
+"""
+Live departures pushed over Server-Sent Events.
+
+Every segment with subscribers has one SegmentFeed holding its upcoming
+window (LIVE_HOURS, at most LIVE_LIMIT trains). A subscriber gets a
+`clock` event with the current server time and the window once as a
+`snapshot` event, then `update` events with the trains
+that departed, were added, removed or changed (delays). Feeds are woken
+by one shared TimerWheel at their next departure, or after
+REFRESH_INTERVAL to pick up delays and new trains, and reload their
+window once per wake-up: the number of schedule lookups depends on the
+number of watched segments, not on the number of clients. Events are
+encoded once per feed and the same bytes are queued to every subscriber.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from .db import SessionLocal
+from .frequency import find_segment
+from .schedule import schedule_window
+from .timetable import Cursor, has_passages, passage_window
+
+log = logging.getLogger(__name__)
+
+LIVE_HOURS = 12
+LIVE_LIMIT = 100
+# Trains are kept while delayed; passages this far past their scheduled
+# time are still read so a delay can hold them in the window
+DELAY_LOOKBACK = timedelta(minutes=30)
+REFRESH_INTERVAL = 60.0
+KEEPALIVE_INTERVAL = 15.0
+# Events queued per subscriber; a client this far behind is disconnected
+# (EventSource reconnects and starts from a fresh snapshot)
+SUBSCRIBER_BUFFER = 32
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "10000"))
+
+
+def upcoming_trains(db, track_id: str, start: datetime, end: datetime, limit: int,
+                    after: Optional[Cursor] = None) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
+    """
+    (source, trains, next cursor) in [start, end): stored passages if the
+    segment has any ("timetable"), else its generated schedule ("estimate").
+    """
+    segment_pk, track_type = find_segment(db, track_id)
+    if segment_pk is not None and has_passages(db, segment_pk):
+        passages, next_cursor = passage_window(db, segment_pk, start, end, limit, after)
+        trains = [
+            {
+                "id": p.id,
+                "train_type": p.train_type.value,
+                "train_number": p.train_number,
+                "direction": p.direction,
+                "scheduled_time": p.scheduled_time,
+                "actual_time": p.actual_time,
+                "operator": p.operator,
+                "speed_kmh": p.speed_kmh,
+            }
+            for p in passages
+        ]
+        return "timetable", trains, next_cursor
+    trains, next_cursor = schedule_window(track_id, track_type, start, end, limit, after)
+    return "estimate", trains, next_cursor
+
+
+def _expected(train: Dict[str, Any]) -> datetime:
+    return train.get("actual_time") or train["scheduled_time"]
+
+
+def _encode(event: str, data: Dict[str, Any]) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=lambda v: v.isoformat())
+    return f"event: {event}\ndata: {payload}\n\n".encode()
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel: SLOTS buckets of TICK seconds, advanced by one task.
+
+    Each key has at most one pending timer (scheduling again replaces it),
+    so a feed costs O(1) to re-arm however far ahead its next train is;
+    timers more than one revolution away stay in their bucket until due.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self._slots: List[Dict[Hashable, Tuple[int, Callable[[], None]]]] = [{} for _ in range(slots)]
+        self._where: Dict[Hashable, int] = {}
+        self._origin = 0.0
+        self._current = 0
+        self._task: asyncio.Task | None = None
+        self.fired = 0
+
+    def _now_tick(self) -> int:
+        return int((asyncio.get_running_loop().time() - self._origin) / self.tick)
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], None]):
+        """Run `callback` (synchronously, on the wheel task) after `delay` seconds."""
+        self.cancel(key)
+        due = max(self._current + 1, self._now_tick() + math.ceil(max(delay, 0.0) / self.tick))
+        slot = due % len(self._slots)
+        self._slots[slot][key] = (due, callback)
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable):
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            self._slots[slot].pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _advance(self, upto: int):
+        while self._current < upto:
+            self._current += 1
+            bucket = self._slots[self._current % len(self._slots)]
+            due = [key for key, (tick, _) in bucket.items() if tick <= self._current]
+            for key in due:
+                _, callback = bucket.pop(key)
+                del self._where[key]
+                self.fired += 1
+                try:
+                    callback()
+                except Exception:
+                    log.exception("Timer callback failed", extra={"key": str(key)})
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(self._origin + (self._current + 1) * self.tick - loop.time(), 0.0))
+            self._advance(self._now_tick())
+
+    def start(self):
+        if self._task is None:
+            self._origin = asyncio.get_running_loop().time()
+            self._current = 0
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class SegmentFeed:
+    """Upcoming window of one segment, shared by all its subscribers."""
+
+    def __init__(self, track_id: str, hub: "LiveHub"):
+        self.track_id = track_id
+        self.hub = hub
+        self.source = "estimate"
+        self.trains: Dict[int, Dict[str, Any]] = {}
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.ready = asyncio.Event()
+        self._snapshot: bytes | None = None
+        self._syncing: asyncio.Task | None = None
+
+    def _load(self, now: datetime) -> Tuple[str, List[Dict[str, Any]]]:
+        with SessionLocal() as db:
+            source, trains, _ = upcoming_trains(
+                db, self.track_id, now - DELAY_LOOKBACK, now + timedelta(hours=LIVE_HOURS), LIVE_LIMIT * 2
+            )
+        return source, [t for t in trains if _expected(t) > now][:LIVE_LIMIT]
+
+    def snapshot(self) -> bytes:
+        """The window as a `snapshot` event, encoded once until it changes (no server time: see subscribe)."""
+        if self._snapshot is None:
+            self._snapshot = _encode("snapshot", {
+                "source": self.source,
+                "trains": list(self.trains.values()),
+            })
+        return self._snapshot
+
+    async def sync(self):
+        """Reload the window, push the difference and re-arm the timer."""
+        now = datetime.now()
+        try:
+            source, trains = await asyncio.to_thread(self._load, now)
+        except Exception as e:
+            log.warning("Live feed reload failed", extra={"track_id": self.track_id, "error": str(e)})
+            self.hub.wheel.schedule(self.track_id, REFRESH_INTERVAL, self.wake)
+            self.ready.set()
+            return
+        self.hub.reloads += 1
+
+        fresh = {t["id"]: t for t in trains}
+        gone = [i for i in self.trains if i not in fresh]
+        update = {
+            "departed": [i for i in gone if _expected(self.trains[i]) <= now],
+            "removed": [i for i in gone if _expected(self.trains[i]) > now],
+            "added": [t for i, t in fresh.items() if i not in self.trains],
+            "changed": [t for i, t in fresh.items() if i in self.trains and self.trains[i] != t],
+        }
+        self.source = source
+        self.trains = fresh
+        if any(update.values()) or not self.ready.is_set():
+            self._snapshot = None
+            if self.ready.is_set():
+                self.broadcast(_encode("update", {
+                    "server_time": now,
+                    **{k: v for k, v in update.items() if v},
+                }))
+        self.ready.set()
+
+        delay = REFRESH_INTERVAL
+        if trains:
+            delay = min(delay, (min(_expected(t) for t in trains) - datetime.now()).total_seconds())
+        self.hub.wheel.schedule(self.track_id, delay, self.wake)
+
+    def wake(self):
+        if self._syncing is None or self._syncing.done():
+            self._syncing = asyncio.create_task(self.sync())
+
+    def broadcast(self, event: bytes):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow: end its stream, the client reconnects
+                self.subscribers.discard(queue)
+                self.hub.dropped += 1
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    def close(self):
+        self.hub.wheel.cancel(self.track_id)
+        if self._syncing is not None:
+            self._syncing.cancel()
+
+
+class LiveHub:
+    """Feeds by segment, created on first subscribe and closed with the last."""
+
+    def __init__(self):
+        self.wheel = TimerWheel()
+        self.feeds: Dict[str, SegmentFeed] = {}
+        self.reloads = 0
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(f.subscribers) for f in self.feeds.values())
+
+    async def subscribe(self, track_id: str) -> Tuple[SegmentFeed, asyncio.Queue]:
+        """Join the segment's feed; the queue starts with the server clock and the current snapshot."""
+        feed = self.feeds.get(track_id)
+        if feed is None:
+            feed = self.feeds[track_id] = SegmentFeed(track_id, self)
+            feed.wake()
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_BUFFER)
+        feed.subscribers.add(queue)
+        try:
+            await feed.ready.wait()
+        except asyncio.CancelledError:
+            # Client gone during the first load
+            self.unsubscribe(feed, queue)
+            raise
+        # The snapshot is cached, so the time it was encoded may be long
+        # past; each subscriber gets the current time of its own
+        queue.put_nowait(_encode("clock", {"server_time": datetime.now()}))
+        # No await between the snapshot and later broadcasts: nothing is missed
+        queue.put_nowait(feed.snapshot())
+        return feed, queue
+
+    def unsubscribe(self, feed: SegmentFeed, queue: asyncio.Queue):
+        feed.subscribers.discard(queue)
+        if not feed.subscribers and self.feeds.get(feed.track_id) is feed:
+            del self.feeds[feed.track_id]
+            feed.close()
+
+    async def stream(self, track_id: str):
+        """SSE byte stream for one subscriber, with keep-alive comments."""
+        feed, queue = await self.subscribe(track_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            self.unsubscribe(feed, queue)
+
+    def start(self):
+        self.wheel.start()
+
+    async def stop(self):
+        for feed in self.feeds.values():
+            feed.close()
+        self.feeds.clear()
+        await self.wheel.stop()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "feeds": len(self.feeds),
+            "subscribers": self.subscriber_count,
+            "timers": len(self.wheel),
+            "timers_fired": self.wheel.fired,
+            "reloads": self.reloads,
+            "dropped_subscribers": self.dropped,
+        }
+
+
+live_hub = LiveHub()
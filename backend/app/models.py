@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSON
@@ -26,6 +26,9 @@ class Location(Base):
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
     address = Column(Text)
+    # Normalized address and time of the Nominatim lookup, for the geocoding cache
+    address_key = Column(String(500), index=True)
+    geocoded_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -42,18 +45,53 @@ class TrackSegment(Base):
     electrified = Column(Boolean, default=False)
     multi_track = Column(Boolean, default=False)
     geojson_geometry = Column(JSON)
+    properties = Column(JSON)
+    # Bounding box of the geometry, for spatial lookups without PostGIS
+    min_lat = Column(Float)
+    min_lng = Column(Float)
+    max_lat = Column(Float)
+    max_lng = Column(Float)
+    fetched_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_track_segments_bbox", "min_lat", "max_lat", "min_lng", "max_lng"),
+    )
+    
     # Relationships
     train_passages = relationship("TrainPassage", back_populates="track_segment")
     noise_calculations = relationship("NoiseCalculation", back_populates="track_segment")
     saved_analyses = relationship("SavedAnalysis", back_populates="track_segment")
 
+class TrackTile(Base):
+    """Grid tile whose tracks have been fetched into track_segments."""
+    __tablename__ = "track_tiles"
+    
+    row = Column(Integer, primary_key=True)
+    col = Column(Integer, primary_key=True)
+    fetched_at = Column(DateTime, nullable=False)
+
+class GtfsImport(Base):
+    """One GTFS feed import; rows_done is the resume checkpoint into stop_times.txt."""
+    __tablename__ = "gtfs_imports"
+    
+    id = Column(Integer, primary_key=True)
+    feed = Column(String(500), nullable=False)
+    feed_hash = Column(String(64), nullable=False, index=True)
+    window_start = Column(DateTime, nullable=False)
+    window_days = Column(Integer, nullable=False)
+    rows_done = Column(Integer, default=0)
+    passages_loaded = Column(Integer, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
 class TrainPassage(Base):
     __tablename__ = "train_passages"
     
     id = Column(Integer, primary_key=True)
     track_segment_id = Column(Integer, ForeignKey("track_segments.id"))
+    import_id = Column(Integer, ForeignKey("gtfs_imports.id"), index=True)
     train_type = Column(Enum(TrainType), nullable=False)
     train_number = Column(String(50))
     direction = Column(String(100))
@@ -63,9 +101,24 @@ class TrainPassage(Base):
     speed_kmh = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_train_passages_segment_time", "track_segment_id", "scheduled_time"),
+    )
+    
     # Relationships
     track_segment = relationship("TrackSegment", back_populates="train_passages")
 
+class TrainFrequency(Base):
+    """Rollup of train_passages per segment, weekday (0 = Monday), hour and train type."""
+    __tablename__ = "train_frequencies"
+
+    track_segment_id = Column(Integer, ForeignKey("track_segments.id"), primary_key=True)
+    weekday = Column(Integer, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    train_type = Column(Enum(TrainType), primary_key=True)
+    passages = Column(Integer, nullable=False, default=0)
+    speed_sum = Column(Integer, nullable=False, default=0)
+
 class NoiseCalculation(Base):
     __tablename__ = "noise_calculations"
     
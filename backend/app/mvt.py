@@ -0,0 +1,198 @@
+"""
+Mapbox Vector Tile (MVT 2.1) encoding for railway geometry.
+
+Only what we need is implemented: one "tracks" layer of LineString
+features with string/bool properties, written as raw protobuf.
+"""
+import math
+from typing import Dict, List, Tuple, Any
+
+import numpy as np
+
+from .columnar import Track
+from .geo import BBox, simplify_line
+
+EXTENT = 4096
+# Geometry kept outside the tile edge so lines join without seams
+BUFFER = 64
+# Simplification tolerance in extent units (16 units = 1 px on a 256 px tile)
+SIMPLIFY_TOLERANCE = 8
+LAYER_NAME = "tracks"
+
+
+def tile_bbox(z: int, x: int, y: int) -> BBox:
+    """(south, west, north, east) of a web-mercator tile."""
+    n = 2 ** z
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (lat(y + 1), x / n * 360 - 180, lat(y), (x + 1) / n * 360 - 180)
+
+
+def _project(coords: np.ndarray, z: int, x: int, y: int) -> np.ndarray:
+    """[lon, lat] -> tile-local extent units (y down)."""
+    n = 2 ** z
+    lat = np.radians(np.clip(coords[:, 1], -85.0511, 85.0511))
+    tx = ((coords[:, 0] + 180) / 360 * n - x) * EXTENT
+    ty = ((1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / math.pi) / 2 * n - y) * EXTENT
+    return np.column_stack((tx, ty))
+
+
+def _clip_line(points: np.ndarray, lo: float, hi: float) -> List[List[Tuple[float, float]]]:
+    """Clip a polyline to the square [lo, hi]² (Liang-Barsky per segment)."""
+    parts: List[List[Tuple[float, float]]] = []
+    current: List[Tuple[float, float]] = []
+
+    for (x0, y0), (x1, y1) in zip(points[:-1].tolist(), points[1:].tolist()):
+        dx, dy = x1 - x0, y1 - y0
+        t0, t1 = 0.0, 1.0
+        visible = True
+        for p, q in ((-dx, x0 - lo), (dx, hi - x0), (-dy, y0 - lo), (dy, hi - y0)):
+            if p == 0:
+                if q < 0:
+                    visible = False
+                    break
+                continue
+            r = q / p
+            if p < 0:
+                t0 = max(t0, r)
+            else:
+                t1 = min(t1, r)
+            if t0 > t1:
+                visible = False
+                break
+
+        if not visible:
+            if len(current) > 1:
+                parts.append(current)
+            current = []
+            continue
+
+        start = (x0 + t0 * dx, y0 + t0 * dy)
+        end = (x0 + t1 * dx, y0 + t1 * dy)
+        if not current:
+            current = [start]
+        elif t0 > 0:
+            # Re-entered the box: start a new part
+            if len(current) > 1:
+                parts.append(current)
+            current = [start]
+        current.append(end)
+        if t1 < 1:
+            if len(current) > 1:
+                parts.append(current)
+            current = []
+
+    if len(current) > 1:
+        parts.append(current)
+    return parts
+
+
+# --- protobuf wire format ---
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _field(number: int, wire_type: int) -> bytes:
+    return _varint((number << 3) | wire_type)
+
+
+def _bytes_field(number: int, payload: bytes) -> bytes:
+    return _field(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number: int, values: List[int]) -> bytes:
+    return _bytes_field(number, b"".join(_varint(v) for v in values))
+
+
+def _value(v: Any) -> bytes:
+    """Layer Value message."""
+    if isinstance(v, bool):
+        return _field(7, 0) + _varint(int(v))
+    return _bytes_field(1, str(v).encode())
+
+
+def _geometry(parts: List[List[Tuple[float, float]]]) -> List[int]:
+    """MoveTo/LineTo command stream with zigzag deltas."""
+    commands: List[int] = []
+    cx = cy = 0
+    for part in parts:
+        points = [(int(round(px)), int(round(py))) for px, py in part]
+        # Drop repeated points created by rounding
+        points = [p for i, p in enumerate(points) if i == 0 or p != points[i - 1]]
+        if len(points) < 2:
+            continue
+        for i, (px, py) in enumerate(points):
+            if i == 0:
+                commands.append((1 << 3) | 1)  # MoveTo, count 1
+            elif i == 1:
+                commands.append(((len(points) - 1) << 3) | 2)  # LineTo, count n-1
+            commands.append(_zigzag(px - cx))
+            commands.append(_zigzag(py - cy))
+            cx, cy = px, py
+    return commands
+
+
+def encode_tile(tracks: List[Track], z: int, x: int, y: int) -> bytes:
+    """Encode the tracks overlapping tile z/x/y as an MVT with one layer."""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    values_encoded: List[bytes] = []
+    features: List[bytes] = []
+
+    def tag(key: str, value: Any) -> List[int]:
+        k = keys.setdefault(key, len(keys))
+        vk = (type(value), value)
+        if vk not in values:
+            values[vk] = len(values)
+            values_encoded.append(_value(value))
+        return [k, values[vk]]
+
+    for track in tracks:
+        points = _project(track.coords, z, x, y)
+        points = simplify_line(points, SIMPLIFY_TOLERANCE)
+        parts = _clip_line(points, -BUFFER, EXTENT + BUFFER)
+        geometry = _geometry(parts)
+        if not geometry:
+            continue
+
+        tags = (
+            tag("name", track.name)
+            + tag("track_type", track.track_type)
+            + tag("electrified", track.electrified)
+            + tag("multi_track", track.multi_track)
+        )
+        feature = (
+            _field(1, 0) + _varint(track.id)
+            + _packed(2, tags)
+            + _field(3, 0) + _varint(2)  # LINESTRING
+            + _packed(4, geometry)
+        )
+        features.append(_bytes_field(2, feature))
+
+    if not features:
+        return b""
+
+    layer = (
+        _field(15, 0) + _varint(2)
+        + _bytes_field(1, LAYER_NAME.encode())
+        + b"".join(features)
+        + b"".join(_bytes_field(3, k.encode()) for k in keys)
+        + b"".join(_bytes_field(4, v) for v in values_encoded)
+        + _field(5, 0) + _varint(EXTENT)
+    )
+    return _bytes_field(3, layer)
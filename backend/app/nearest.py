@@ -0,0 +1,152 @@
+import math
+from typing import List, Dict, Any
+
+import numpy as np
+
+from .columnar import Track
+from .geo import METERS_PER_DEG
+
+# Grid cell for the segment index: ~220 m N-S, ~140 m E-W in Germany
+CELL_DEG = 0.002
+
+
+class SegmentIndex:
+    """
+    Nearest-segment lookup over a set of track polylines.
+
+    All vertices are packed into one float64 array; every line segment is
+    registered in each grid cell its bbox overlaps, stored as a sorted
+    cell-id array so a cell range is found with a binary search. Queries
+    project the point onto candidate segments in one vectorized pass.
+    """
+
+    def __init__(self, tracks: List[Track]):
+        self.tracks = tracks
+        coords = [t.coords for t in tracks]
+        lengths = np.array([len(c) for c in coords], dtype=np.int64)
+        packed = np.concatenate(coords) if coords else np.empty((0, 2))
+
+        # Segment j runs from packed[j] to packed[j + 1], except at track ends
+        is_last = np.zeros(len(packed), dtype=bool)
+        is_last[np.cumsum(lengths)[lengths > 0] - 1] = True
+        starts = np.nonzero(~is_last)[0]
+        self.a = packed[starts]
+        self.b = packed[starts + 1]
+        self.owner = np.repeat(np.arange(len(lengths)), np.maximum(lengths - 1, 0))
+
+        if not len(starts):
+            self.origin = (0.0, 0.0)
+            self.ncols = self.nrows = 0
+            self.cells = np.empty(0, dtype=np.int64)
+            self.cell_segments = np.empty(0, dtype=np.int64)
+            return
+
+        lo = np.minimum(self.a, self.b)
+        hi = np.maximum(self.a, self.b)
+        self.origin = (float(lo[:, 0].min()), float(lo[:, 1].min()))
+        c0 = np.floor((lo - self.origin) / CELL_DEG).astype(np.int64)
+        c1 = np.floor((hi - self.origin) / CELL_DEG).astype(np.int64)
+        self.ncols = int(c1[:, 0].max()) + 1
+        self.nrows = int(c1[:, 1].max()) + 1
+
+        # Expand each segment into the cells of its bbox (usually just one)
+        width = c1[:, 0] - c0[:, 0] + 1
+        span = width * (c1[:, 1] - c0[:, 1] + 1)
+        seg = np.repeat(np.arange(len(span)), span)
+        local = np.arange(len(seg)) - np.repeat(np.cumsum(span) - span, span)
+        col = c0[seg, 0] + local % width[seg]
+        row = c0[seg, 1] + local // width[seg]
+        cell = row * self.ncols + col
+
+        order = np.argsort(cell, kind="stable")
+        self.cells = cell[order]
+        self.cell_segments = seg[order]
+
+    def __len__(self) -> int:
+        return len(self.owner)
+
+    @property
+    def nbytes(self) -> int:
+        return self.a.nbytes + self.b.nbytes + self.owner.nbytes + self.cells.nbytes + self.cell_segments.nbytes
+
+    def _candidates(self, lat: float, lng: float, radius_m: float) -> np.ndarray | None:
+        """Segments registered in cells within radius_m; None if that is all of them."""
+        dlat = radius_m / METERS_PER_DEG
+        dlng = radius_m / (METERS_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+        x0 = max(int(math.floor((lng - dlng - self.origin[0]) / CELL_DEG)), 0)
+        x1 = min(int(math.floor((lng + dlng - self.origin[0]) / CELL_DEG)), self.ncols - 1)
+        y0 = max(int(math.floor((lat - dlat - self.origin[1]) / CELL_DEG)), 0)
+        y1 = min(int(math.floor((lat + dlat - self.origin[1]) / CELL_DEG)), self.nrows - 1)
+        if x0 == 0 and y0 == 0 and x1 == self.ncols - 1 and y1 == self.nrows - 1:
+            return None
+        if x0 > x1 or y0 > y1:
+            return np.empty(0, dtype=np.int64)
+
+        rows = np.arange(y0, y1 + 1) * self.ncols
+        lo = np.searchsorted(self.cells, rows + x0, side="left")
+        hi = np.searchsorted(self.cells, rows + x1, side="right")
+        parts = [self.cell_segments[i:j] for i, j in zip(lo, hi) if j > i]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def _project(self, lat: float, lng: float, segs: np.ndarray | None):
+        """Distance (m) and closest [lon, lat] on each segment (all if segs is None)."""
+        a = self.a if segs is None else self.a[segs]
+        b = self.b if segs is None else self.b[segs]
+        kx = METERS_PER_DEG * math.cos(math.radians(lat))
+        ky = METERS_PER_DEG
+        ax = (a[:, 0] - lng) * kx
+        ay = (a[:, 1] - lat) * ky
+        dx = (b[:, 0] - lng) * kx - ax
+        dy = (b[:, 1] - lat) * ky - ay
+        len2 = dx * dx + dy * dy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(len2 > 0, -(ax * dx + ay * dy) / len2, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        px = ax + t * dx
+        py = ay + t * dy
+        closest = a + t[:, None] * (b - a)
+        return np.hypot(px, py), closest
+
+    def nearest(self, lat: float, lng: float, k: int = 1, max_distance: float | None = None) -> List[Dict[str, Any]]:
+        """
+        The k nearest tracks to a point.
+
+        Returns dicts with the track, the exact perpendicular distance in
+        meters and the closest point on the track, sorted by distance.
+        """
+        if not len(self):
+            return []
+
+        radius = CELL_DEG * METERS_PER_DEG / 2
+        while True:
+            if max_distance is not None:
+                radius = min(radius, max_distance)
+            segs = self._candidates(lat, lng, radius)
+            dist, closest = self._project(lat, lng, segs)
+            owners = self.owner if segs is None else self.owner[segs]
+
+            # Best segment per track, then the k best tracks
+            order = np.lexsort((dist, owners))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = owners[order][1:] != owners[order][:-1]
+            best = order[first]
+            best = best[np.argsort(dist[best], kind="stable")]
+
+            exhaustive = segs is None or (max_distance is not None and radius >= max_distance)
+            # Everything within `radius` has been seen, so those results are exact
+            within = best[dist[best] <= radius]
+            if exhaustive or len(within) >= k:
+                chosen = (best if segs is None else within)[:k]
+                if max_distance is not None:
+                    chosen = chosen[dist[chosen] <= max_distance]
+                return [
+                    {
+                        "track": self.tracks[int(owners[i])],
+                        "distance_m": float(dist[i]),
+                        "closest_point": {"lat": float(closest[i, 1]), "lng": float(closest[i, 0])},
+                    }
+                    for i in chosen
+                ]
+            radius *= 2
@@ -1,5 +1,19 @@
 import math
-from typing import Dict
+from typing import Dict, List, Any, Sequence
+
+import numpy as np
+
+from .geo import BBox, METERS_PER_DEG, simplify_line
+from .models import TrainType
+
+# Day period 06:00-22:00 (hour 22 is night), shared by the schedule
+# generator, the frequency rollup and the passage model
+DAY_HOURS = range(6, 22)
+
+# Base levels at 25m reference distance
+PASSENGER_BASE_DB = 75
+FREIGHT_BASE_DB = 85
+REFERENCE_M = 25
 
 def calculate_noise(distance_m: float, trains_per_hour: float, freight_pct: float) -> Dict[str, float]:
     """
@@ -13,12 +27,8 @@ def calculate_noise(distance_m: float, trains_per_hour: float, freight_pct: floa
     Returns:
         Dictionary with day_level_db, night_level_db, max_level_db
     """
-    # Base levels at 25m reference distance
-    passenger_base = 75  # dB at 25m
-    freight_base = 85    # dB at 25m
-    
     # Weighted base level
-    base = freight_pct * freight_base + (1 - freight_pct) * passenger_base
+    base = freight_pct * FREIGHT_BASE_DB + (1 - freight_pct) * PASSENGER_BASE_DB
     
     # Distance attenuation (6dB per doubling of distance)
     if distance_m < 25:
@@ -36,6 +46,98 @@ def calculate_noise(distance_m: float, trains_per_hour: float, freight_pct: floa
         "max_level_db": round(base - attenuation + 10, 1),  # Single loud freight train
     }
 
+# Passage-level model (after Schall 03): each passage contributes its pass-by
+# sound exposure level (SEL), LAeq is the energy sum over a period.
+# SEL at REFERENCE_M per 100 m of train at 100 km/h, by type code
+NOISE_TYPES = (TrainType.FERNVERKEHR, TrainType.REGIONALVERKEHR, TrainType.SBAHN, TrainType.GUETERVERKEHR)
+SEL_100_DB = np.array([87.0, 86.0, 86.0, 92.0])
+TRAIN_LENGTH_M = np.array([400.0, 120.0, 140.0, 600.0])
+# Rolling noise: Lmax +30 dB per decade of speed, pass-by time -10 dB
+SPEED_COEFF = 20.0
+AIR_ABSORPTION_DB_PER_M = 0.002
+DAY_SECONDS = len(DAY_HOURS) * 3600
+NIGHT_SECONDS = (24 - len(DAY_HOURS)) * 3600
+FLOOR_DB = 30.0
+
+
+def type_codes(train_types: Sequence[Any]) -> np.ndarray:
+    """TrainType values (or members) -> NOISE_TYPES codes."""
+    index = {t: i for i, t in enumerate(NOISE_TYPES)}
+    return np.fromiter((index[TrainType(t)] for t in train_types), dtype=np.int8, count=len(train_types))
+
+
+def _line_attenuation(distance_m: np.ndarray, length_m: np.ndarray) -> np.ndarray:
+    """
+    Level drop from REFERENCE_M to `distance_m` of an incoherent line source
+    of the train's length: -3 dB per doubling close by, -6 dB far away.
+    """
+    d = np.maximum(distance_m, REFERENCE_M)
+    ratio = (np.arctan(length_m / (2 * d)) / d) / (np.arctan(length_m / (2 * REFERENCE_M)) / REFERENCE_M)
+    return -10 * np.log10(ratio)
+
+
+class Exposure:
+    """
+    Summed pass-by energy of one day of passages at REFERENCE_M.
+
+    Distance only shifts every passage of a segment by the same amount,
+    so levels() evaluates any number of receivers from these few sums.
+    """
+
+    __slots__ = ("day_energy", "night_energy", "lmax_by_type", "passages_day", "passages_night")
+
+    def __init__(self, codes: np.ndarray, speeds_kmh: np.ndarray, hours: np.ndarray):
+        codes = np.asarray(codes, dtype=np.intp)
+        speeds = np.maximum(np.asarray(speeds_kmh, dtype=np.float64), 10.0)
+        length = TRAIN_LENGTH_M[codes]
+        sel = SEL_100_DB[codes] + SPEED_COEFF * np.log10(speeds / 100) + 10 * np.log10(length / 100)
+        energy = 10 ** (sel / 10)
+
+        hours = np.asarray(hours)
+        day = (hours >= DAY_HOURS.start) & (hours < DAY_HOURS.stop)
+        self.day_energy = float(energy[day].sum())
+        self.night_energy = float(energy[~day].sum())
+        self.passages_day = int(day.sum())
+        self.passages_night = int(len(day) - day.sum())
+
+        # Loudest single passage per type: Lmax = SEL - 10 lg(pass-by seconds)
+        lmax = sel - 10 * np.log10(length / (speeds / 3.6))
+        self.lmax_by_type = np.full(len(NOISE_TYPES), -np.inf)
+        np.maximum.at(self.lmax_by_type, codes, lmax)
+
+    @property
+    def nbytes(self) -> int:
+        return self.lmax_by_type.nbytes + 64
+
+    def levels(self, distance_m) -> Dict[str, np.ndarray]:
+        """Day/night LAeq and max level (dB) at each distance from the track."""
+        d = np.maximum(np.atleast_1d(np.asarray(distance_m, dtype=np.float64)), REFERENCE_M)
+        # SEL of a whole passage falls like a line source (-3 dB per doubling)
+        spread = 10 * np.log10(d / REFERENCE_M) + AIR_ABSORPTION_DB_PER_M * (d - REFERENCE_M)
+        floor = 10 ** (FLOOR_DB / 10)
+
+        def laeq(energy: float, seconds: int) -> np.ndarray:
+            level = 10 * np.log10(max(energy / seconds, floor)) - spread
+            return np.maximum(level, FLOOR_DB)
+
+        present = np.isfinite(self.lmax_by_type)
+        if present.any():
+            lmax = self.lmax_by_type[present, None] - _line_attenuation(d[None, :], TRAIN_LENGTH_M[present, None])
+            max_level = np.maximum(lmax.max(axis=0) - AIR_ABSORPTION_DB_PER_M * (d - REFERENCE_M), FLOOR_DB)
+        else:
+            max_level = np.full(len(d), FLOOR_DB)
+
+        return {
+            "day_level_db": laeq(self.day_energy, DAY_SECONDS),
+            "night_level_db": laeq(self.night_energy, NIGHT_SECONDS),
+            "max_level_db": max_level,
+        }
+
+    def at(self, distance_m: float) -> Dict[str, float]:
+        """levels() for one receiver, rounded like calculate_noise()."""
+        return {k: round(float(v[0]), 1) for k, v in self.levels(distance_m).items()}
+
+
 def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """
     Calculate haversine distance between two points in meters.
@@ -77,4 +179,131 @@ def get_track_stats_by_type(track_type: str) -> Dict[str, float]:
         }
     }
     
-    return stats.get(track_type, stats["main"])
\ No newline at end of file
+    return stats.get(track_type, stats["main"])
+
+
+# Raster settings: levels are floored at GRID_FLOOR_DB, distances are
+# computed exactly on every COARSE_STEP-th pixel and only refined within
+# NEAR_BLOCKS coarse cells of a track
+GRID_FLOOR_DB = 30.0
+COARSE_STEP = 8
+NEAR_BLOCKS = 1
+
+
+def _segment_distances(px, py, ax, ay, bx, by) -> np.ndarray:
+    """Min distance from each point to a set of segments (planar meters)."""
+    # float32 is plenty for offsets of a few km and halves memory traffic
+    px, py, ax, ay = (np.asarray(v, dtype=np.float32) for v in (px, py, ax, ay))
+    dx = np.asarray(bx, dtype=np.float32) - ax
+    dy = np.asarray(by, dtype=np.float32) - ay
+    len2 = dx * dx + dy * dy
+    inv = np.divide(1.0, len2, out=np.zeros_like(len2), where=len2 > 0)
+    out = np.empty(len(px), dtype=np.float64)
+    # Bound the (points x segments) temporaries to ~1M elements
+    chunk = max(1, 1_000_000 // max(len(ax), 1))
+    for start in range(0, len(px), chunk):
+        qx = px[start:start + chunk, None] - ax
+        qy = py[start:start + chunk, None] - ay
+        t = qx * dx
+        t += qy * dy
+        t *= inv
+        np.clip(t, 0.0, 1.0, out=t)
+        qx -= t * dx
+        qy -= t * dy
+        qx *= qx
+        qy *= qy
+        qx += qy
+        out[start:start + chunk] = np.sqrt(qx.min(axis=1))
+    return out
+
+
+def _upsample(coarse: np.ndarray, step: int, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Bilinear interpolation at fine pixel (rows, cols) of a grid sampled every `step` pixels."""
+    r0 = np.minimum(rows // step, coarse.shape[0] - 2)
+    c0 = np.minimum(cols // step, coarse.shape[1] - 2)
+    fr = (rows - r0 * step) / step
+    fc = (cols - c0 * step) / step
+    return (
+        coarse[r0, c0] * (1 - fr) * (1 - fc)
+        + coarse[r0, c0 + 1] * (1 - fr) * fc
+        + coarse[r0 + 1, c0] * fr * (1 - fc)
+        + coarse[r0 + 1, c0 + 1] * fr * fc
+    )
+
+
+def noise_grid(tracks: List[Any], bbox: BBox, width: int, height: int, period: str = "day") -> np.ndarray:
+    """
+    Noise level raster in dB over a bounding box.
+
+    Each track is a line source with the calculate_noise model (level at
+    25 m from its trains/hour and freight share, -6 dB per doubling of the
+    distance to the nearest point of the polyline); tracks are summed by
+    energy. Row 0 is the northern edge.
+    """
+    south, west, north, east = bbox
+    lat0 = (south + north) / 2
+    lng0 = (west + east) / 2
+    kx = METERS_PER_DEG * math.cos(math.radians(lat0))
+    ky = METERS_PER_DEG
+
+    step_x = (east - west) * kx / width
+    step_y = (north - south) * ky / height
+    x0 = (west - lng0) * kx + step_x / 2
+    y0 = (north - lat0) * ky - step_y / 2
+    xs = x0 + np.arange(width) * step_x
+    ys = y0 - np.arange(height) * step_y
+    pixel_m = max(step_x, step_y)
+
+    # Coarse nodes cover the whole grid, possibly overshooting the last pixel
+    s = COARSE_STEP
+    cxs = x0 + np.arange(0, width + s, s)[: (width - 1) // s + 2] * step_x
+    cys = y0 - np.arange(0, height + s, s)[: (height - 1) // s + 2] * step_y
+    cgx, cgy = np.meshgrid(cxs, cys)
+    near_m = NEAR_BLOCKS * s * pixel_m
+
+    # A coarse block may hold a pixel within near_m of the track only if
+    # one of its corners is within near_m + the block diagonal
+    block_reach = near_m + s * pixel_m * math.sqrt(2)
+    rows = np.arange(height)
+    cols = np.arange(width)
+
+    # Far from a track its energy varies smoothly, so energies are summed on
+    # the coarse grid and interpolated once; close to each track the
+    # interpolated share is swapped for an exact one
+    coarse_energy = np.zeros(cgx.shape)
+    corrections = []
+    for track in tracks:
+        coords = track.coords
+        if len(coords) < 2:
+            continue
+        stats = get_track_stats_by_type(track.track_type)
+        tph = stats[f"{period}_trains_per_hour"]
+        freight_pct = stats["freight_percentage"]
+        base = freight_pct * FREIGHT_BASE_DB + (1 - freight_pct) * PASSENGER_BASE_DB
+        # Energy at 25 m; it falls with 1/d² (-6 dB per doubling)
+        power = 10 ** ((base + 10 * math.log10(max(tph, 0.1))) / 10) * REFERENCE_M ** 2
+
+        pts = np.column_stack(((coords[:, 0] - lng0) * kx, (coords[:, 1] - lat0) * ky))
+        pts = simplify_line(pts, pixel_m / 2)
+        ax, ay = pts[:-1, 0], pts[:-1, 1]
+        bx, by = pts[1:, 0], pts[1:, 1]
+
+        dist = _segment_distances(cgx.ravel(), cgy.ravel(), ax, ay, bx, by).reshape(cgx.shape)
+        track_coarse = power / np.maximum(dist, REFERENCE_M) ** 2
+        coarse_energy += track_coarse
+
+        corner = dist < block_reach
+        blocks = corner[:-1, :-1] | corner[1:, :-1] | corner[:-1, 1:] | corner[1:, 1:]
+        if not blocks.any():
+            continue
+        near = np.repeat(np.repeat(blocks, s, axis=0), s, axis=1)[:height, :width]
+        r, c = np.nonzero(near)
+        exact = _segment_distances(xs[c], ys[r], ax, ay, bx, by)
+        delta = power / np.maximum(exact, REFERENCE_M) ** 2 - _upsample(track_coarse, s, r, c)
+        corrections.append((r, c, delta))
+
+    energy = _upsample(coarse_energy, s, rows[:, None], cols[None, :])
+    for r, c, delta in corrections:
+        energy[r, c] += delta
+
+    return 10 * np.log10(np.maximum(energy, 10 ** (GRID_FLOOR_DB / 10)))
@@ -1,99 +1,252 @@
 import httpx
 import asyncio
+import json
+import logging
+import os
 import time
 import math
-from typing import List, Dict, Any, Tuple
-from .noise import get_track_stats_by_type
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
 
-# In-memory cache: {grid_key: (timestamp, tracks)}
-_cache: Dict[str, Tuple[float, List[Dict]]] = {}
-CACHE_TTL = 7200  # 2 hours
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from . import store
+from .columnar import PROPERTY_TAGS, Track, TrackBatch, TrackBatchBuilder
+from .clients import ServerPool, UpstreamBudget, get_client
+from .geo import BBox, circle_bbox, distance_to_line
+from .prefetch import PREFETCH_REGIONS, Prefetcher
+from .telemetry import OVERPASS_LATENCY, PARSE_ELEMENTS, PARSE_LATENCY, timed
+from .tiles import TileIndex, TileKey, tiles_for_bbox, union_bounds
+
+log = logging.getLogger(__name__)
 
-OVERPASS_SERVERS = [
+CACHE_TTL = 7200  # 2 hours
+# Stale-while-revalidate: tiles past CACHE_TTL are still served (and
+# refreshed in the background) until they are STALE_TTL old
+STALE_TTL = int(os.getenv("STALE_TTL", str(24 * 3600)))
+# Memory bounds per worker for tile data and nearest-segment indexes
+TILE_CACHE_BYTES = int(os.getenv("TILE_CACHE_BYTES", str(256 * 1024 * 1024)))
+TILE_INDEX_BYTES = int(os.getenv("TILE_INDEX_BYTES", str(128 * 1024 * 1024)))
+
+# In-memory tile store: Overpass results are ingested per fixed grid tile
+# and any (lat, lng, radius) query is answered from the tiles it overlaps.
+_tiles = TileIndex(CACHE_TTL, STALE_TTL, TILE_CACHE_BYTES, TILE_INDEX_BYTES)
+
+# Single-flight: tiles currently being fetched, shared by concurrent misses
+_inflight: Dict[TileKey, "asyncio.Task[bool]"] = {}
+# Negative cache: tiles whose last fetch failed, {tile: failed_at}
+_failed: Dict[TileKey, float] = {}
+NEGATIVE_TTL = 30  # seconds
+# Background refreshes of stale tiles; referenced so they are not collected
+_refreshing: Set["asyncio.Task[bool]"] = set()
+
+# Comma-separated override, e.g. to point at a local stub server
+OVERPASS_SERVERS = [u for u in os.getenv("OVERPASS_SERVERS", "").split(",") if u] or [
     "https://overpass-api.de/api/interpreter",
     "https://overpass.kumi.systems/api/interpreter",
 ]
 
 
-def _grid_key(lat: float, lng: float, radius: int) -> str:
-    """Round to ~500m grid cells for caching."""
-    return f"{round(lat, 2)}:{round(lng, 2)}:{radius}"
+# Per-mirror health (EWMA latency, error rate, circuit breaker)
+overpass_pool = ServerPool(OVERPASS_SERVERS)
+
+# Shared by user requests, refreshes and prefetch; the public instances
+# allow a couple of concurrent slots per client
+OVERPASS_CONCURRENCY = int(os.getenv("OVERPASS_CONCURRENCY", "2"))
+OVERPASS_RATE = float(os.getenv("OVERPASS_RATE", "1"))  # queries per second
+overpass_budget = UpstreamBudget(OVERPASS_CONCURRENCY, OVERPASS_RATE)
+
+
+class TrackStreamParser:
+    """
+    Incremental Overpass JSON -> TrackBatch.
+
+    Body chunks are fed as they arrive; each element of "elements" is
+    added to the batch as soon as it is complete, so only the current
+    element and the packed coordinates are held, never the whole document.
+    Without ijson the body is buffered and parsed on close().
+    """
+
+    def __init__(self):
+        self.builder = TrackBatchBuilder()
+        self.elements = 0
+        self.skipped = 0
+        self.parse_s = 0.0
+        if ijson is not None:
+            self._items = ijson.sendable_list()
+            self._coro = ijson.items_coro(self._items, "elements.item", use_float=True)
+        else:
+            self._chunks: List[bytes] = []
+
+    def feed(self, chunk: bytes):
+        if ijson is None:
+            self._chunks.append(chunk)
+            return
+        started = time.perf_counter()
+        try:
+            self._coro.send(chunk)
+        except ijson.JSONError as e:
+            raise ValueError(f"invalid Overpass JSON: {e}") from e
+        self._drain()
+        self.parse_s += time.perf_counter() - started
+
+    def _add(self, element: Any):
+        self.elements += 1
+        if not _add_element(self.builder, element):
+            self.skipped += 1
+
+    def _drain(self):
+        for element in self._items:
+            self._add(element)
+        del self._items[:]
+
+    def close(self) -> TrackBatch:
+        started = time.perf_counter()
+        if ijson is None:
+            body = b"".join(self._chunks)
+            if not body.lstrip().startswith(b"{"):
+                raise ValueError(f"non-JSON Overpass response: {body[:100]!r}")
+            for element in json.loads(body).get("elements", []):
+                self._add(element)
+        else:
+            try:
+                self._coro.close()
+            except ijson.JSONError as e:
+                raise ValueError(f"invalid Overpass JSON: {e}") from e
+            self._drain()
+        batch = self.builder.build()
+        self.parse_s += time.perf_counter() - started
+        if self.skipped:
+            log.warning("Skipped malformed Overpass elements", extra={"skipped": self.skipped})
+        PARSE_ELEMENTS.observe(self.elements)
+        PARSE_LATENCY.observe(self.parse_s)
+        return batch
+
+
+async def _read_json(resp: httpx.Response) -> Dict[str, Any]:
+    body = await resp.aread()
+    if not body.lstrip().startswith(b"{"):
+        raise ValueError(f"non-JSON Overpass response: {body[:100]!r}")
+    return json.loads(body)
+
+
+async def _read_tracks(resp: httpx.Response) -> TrackBatch:
+    parser = TrackStreamParser()
+    async for chunk in resp.aiter_bytes():
+        parser.feed(chunk)
+    return parser.close()
+
+
+async def _post(client: httpx.AsyncClient, server: str, query: str, read: Callable[[httpx.Response], Awaitable[Any]]):
+    """
+    One budgeted, streamed POST to a mirror; returns (status code, result,
+    seconds). `read` consumes a 200 body while it downloads.
+    """
+    async with overpass_budget.slot():
+        started = time.monotonic()
+        status = "error"
+        try:
+            async with client.stream("POST", server, data={"data": query}) as resp:
+                status = str(resp.status_code)
+                result = await read(resp) if resp.status_code == 200 else None
+        except httpx.TimeoutException:
+            status = "timeout"
+            raise
+        except ValueError:
+            status = "invalid"
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            OVERPASS_LATENCY.labels(server=server, status=status).observe(elapsed)
+    return resp.status_code, result, elapsed
+
+
+async def _run_query(query: str, read: Callable[[httpx.Response], Awaitable[Any]]) -> Any:
+    """Run an Overpass QL query, fastest healthy mirror first; None if all fail."""
+    client = get_client()
+
+    for health in overpass_pool.ranked():
+        server = health.url
+        for attempt in range(2):
+            if not health.admit():
+                break  # another request is probing this mirror
+            try:
+                status_code, result, elapsed = await _post(client, server, query, read)
+
+                if status_code == 429:
+                    health.record_failure()
+                    log.warning("Overpass rate limited", extra={"server": server, "attempt": attempt + 1})
+                    if not health.available():
+                        break  # breaker opened; do not retry into it
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+
+                if status_code == 504 or status_code >= 500:
+                    health.record_failure()
+                    log.warning("Overpass server error", extra={"server": server, "status": status_code})
+                    break  # Try next server
+
+                if status_code != 200:
+                    health.record_failure()
+                    log.warning("Overpass HTTP error", extra={"server": server, "status": status_code})
+                    break
+
+                health.record_success(elapsed)
+                log.info("Overpass OK", extra={
+                    "server": server,
+                    "elements": len(result) if isinstance(result, TrackBatch) else len(result.get("elements", [])),
+                    "duration_s": round(elapsed, 3),
+                })
+                return result
 
+            except httpx.TimeoutException:
+                health.record_failure()
+                log.warning("Overpass timeout", extra={"server": server, "attempt": attempt + 1})
+                if attempt == 0:
+                    await asyncio.sleep(1)
+            except ValueError as e:
+                health.record_failure()
+                log.warning("Overpass invalid response", extra={"server": server, "error": str(e)[:200]})
+                break
+            except Exception as e:
+                health.record_failure()
+                log.warning("Overpass request failed", extra={"server": server, "error": str(e)})
+                break
 
-def _find_cached(lat: float, lng: float, radius: int) -> List[Dict] | None:
-    """Check if any nearby cache entry covers this request."""
-    now = time.time()
-    # Check exact grid
-    key = _grid_key(lat, lng, radius)
-    if key in _cache:
-        ts, tracks = _cache[key]
-        if now - ts < CACHE_TTL:
-            return tracks
-    # Check neighboring grid cells (wider coverage)
-    for dlat in [-0.01, 0, 0.01]:
-        for dlng in [-0.01, 0, 0.01]:
-            k = _grid_key(lat + dlat, lng + dlng, radius)
-            if k in _cache:
-                ts, tracks = _cache[k]
-                if now - ts < CACHE_TTL:
-                    return tracks
+    log.error("All Overpass servers failed")
     return None
 
 
+async def run_overpass_query(query: str) -> Dict[str, Any] | None:
+    """Run an Overpass QL query and return the decoded JSON; None if all mirrors fail."""
+    return await _run_query(query, _read_json)
+
+
 async def fetch_nearby_tracks(lat: float, lng: float, radius: int = 2000) -> Dict[str, Any]:
-    """Fetch railway tracks from Overpass API with server failover."""
+    """Fetch railway tracks around a point from Overpass API."""
     query = f"""[out:json][timeout:30];
 (
   way["railway"="rail"](around:{radius},{lat},{lng});
   way["railway"="light_rail"](around:{radius},{lat},{lng});
 );
 out body geom;"""
+    data = await run_overpass_query(query)
+    return data if data is not None else {"elements": []}
 
-    for server in OVERPASS_SERVERS:
-        for attempt in range(2):
-            try:
-                async with httpx.AsyncClient(
-                    timeout=httpx.Timeout(45.0, connect=10.0)
-                ) as client:
-                    resp = await client.post(
-                        server,
-                        data={"data": query},
-                        headers={"User-Agent": "SIGNAL-App/1.0"}
-                    )
-
-                    if resp.status_code == 429:
-                        print(f"Overpass 429 from {server}, waiting...")
-                        await asyncio.sleep(2 ** attempt)
-                        continue
-
-                    if resp.status_code == 504 or resp.status_code >= 500:
-                        print(f"Overpass {resp.status_code} from {server}")
-                        break  # Try next server
-
-                    if resp.status_code != 200:
-                        print(f"Overpass HTTP {resp.status_code} from {server}")
-                        break
-
-                    text = resp.text
-                    if not text.strip().startswith("{"):
-                        print(f"Overpass non-JSON from {server}: {text[:100]}")
-                        break
-
-                    data = resp.json()
-                    elements = data.get("elements", [])
-                    print(f"Overpass OK from {server}: {len(elements)} elements")
-                    return data
 
-            except httpx.TimeoutException:
-                print(f"Overpass timeout from {server} (attempt {attempt+1})")
-                if attempt == 0:
-                    await asyncio.sleep(1)
-            except Exception as e:
-                print(f"Overpass error from {server}: {e}")
-                break
-
-    print("All Overpass servers failed")
-    return {"elements": []}
+async def fetch_bbox_tracks(south: float, west: float, north: float, east: float) -> TrackBatch | None:
+    """Railway tracks intersecting a bounding box, parsed while the response streams in."""
+    bbox = f"{south:.5f},{west:.5f},{north:.5f},{east:.5f}"
+    query = f"""[out:json][timeout:30];
+(
+  way["railway"="rail"]({bbox});
+  way["railway"="light_rail"]({bbox});
+);
+out body geom;"""
+    return await _run_query(query, _read_tracks)
 
 
 def classify_track_type(tags: Dict[str, str]) -> str:
@@ -109,83 +262,271 @@ def classify_track_type(tags: Dict[str, str]) -> str:
     return "main"
 
 
-def process_track_data(overpass_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Process raw Overpass data into structured track segments."""
-    tracks = []
+def process_track_data(overpass_data: Dict[str, Any]) -> TrackBatch:
+    """Process raw Overpass data into a columnar batch of track segments."""
+    elements = overpass_data.get("elements", [])
+    PARSE_ELEMENTS.observe(len(elements))
+    with timed(PARSE_LATENCY):
+        builder = TrackBatchBuilder()
+        skipped = sum(not _add_element(builder, element) for element in elements)
+        if skipped:
+            log.warning("Skipped malformed Overpass elements", extra={"skipped": skipped})
+        return builder.build()
+
+
+def _track_count(value: str) -> int:
+    """OSM `tracks` value -> number of tracks; "2;1", "2-3" count as 2, junk as 1."""
+    match = re.match(r"\s*(\d+)", value)
+    return int(match.group(1)) if match else 1
+
+
+def _add_element(builder: TrackBatchBuilder, element: Any) -> bool:
+    """
+    _add_way() that skips (and reports) a malformed element instead of
+    failing the whole response: one bad way is a data error, not a bad mirror.
+    """
+    try:
+        _add_way(builder, element)
+        return True
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        log.debug("Malformed Overpass element", extra={"error": str(e)})
+        return False
+
+
+def _add_way(builder: TrackBatchBuilder, element: Dict[str, Any]):
+    """Add one Overpass element to a batch if it is a way with geometry."""
+    if element["type"] != "way":
+        return
+
+    tags = element.get("tags", {})
+    geometry = element.get("geometry", [])
+
+    if not geometry or len(geometry) < 2:
+        return
+
+    track_type = classify_track_type(tags)
+
+    name = tags.get("name", "")
+    if not name:
+        ref = tags.get("ref", "")
+        if ref:
+            name = f"Strecke {ref}"
+        elif track_type == "main":
+            name = "Hauptstrecke"
+        elif track_type == "branch":
+            name = "Nebenstrecke"
+        elif track_type == "freight":
+            name = "Güterstrecke"
+        else:
+            name = "Bahnstrecke"
+
+    # Everything is converted before add() so a bad value cannot leave a
+    # half-added way in the builder
+    coords = [float(v) for node in geometry for v in (node["lon"], node["lat"])]
+    property_tags = [str(tags.get(k, "")) for k in PROPERTY_TAGS]
+    builder.add(
+        int(element["id"]),
+        str(name),
+        track_type,
+        tags.get("electrified", "no") != "no",
+        _track_count(str(tags.get("tracks", "1"))) > 1,
+        property_tags,
+        coords,
+    )
+
+
+async def _load_stored(keys: List[TileKey]) -> List[TileKey]:
+    """Ingest tiles already covered in the track store; returns the rest."""
+    try:
+        covered, tracks = await asyncio.to_thread(store.load_tiles, keys)
+    except Exception as e:
+        log.warning("Track store read failed", extra={"error": str(e)})
+        return keys
+    if covered:
+        _tiles.ingest(covered, tracks)
+        log.info("Track store hit", extra={"tiles": len(covered), "tracks": len(tracks)})
+    return [k for k in keys if k not in set(covered)]
+
+
+async def _fetch_and_ingest(keys: List[TileKey]) -> bool:
+    """Load tiles from the track store, fetching the rest in one Overpass query."""
+    keys = await _load_stored(keys)
+    if not keys:
+        return True
+
+    try:
+        tracks = await fetch_bbox_tracks(*union_bounds(keys))
+    except Exception as e:
+        log.warning("Tile fetch failed", extra={"error": str(e)})
+        tracks = None
+
+    if tracks is None:
+        failed_at = time.time()
+        for k in keys:
+            _failed[k] = failed_at
+        return False
+
+    _tiles.ingest(keys, tracks)
+    for k in keys:
+        _failed.pop(k, None)
+
+    try:
+        await asyncio.to_thread(store.save_tiles, keys, tracks)
+    except Exception as e:
+        log.warning("Track store write failed", extra={"error": str(e)})
+    return True
+
+
+def _release(keys: List[TileKey], task: "asyncio.Task[bool]"):
+    for k in keys:
+        if _inflight.get(k) is task:
+            del _inflight[k]
+
+
+async def fetch_tiles(keys: List[TileKey]) -> bool:
+    """
+    Load tiles, coalescing with fetches already in flight.
+
+    Tiles that failed within NEGATIVE_TTL are skipped so an upstream error
+    (e.g. a 429 storm) is not repeated by every waiting request.
+    Returns True only if every requested tile is now loaded.
+    """
+    now = time.time()
+    wanted = [k for k in keys if now - _failed.get(k, 0) >= NEGATIVE_TTL]
+
+    waiting = {_inflight[k] for k in wanted if k in _inflight}
+    todo = [k for k in wanted if k not in _inflight]
+    if todo:
+        task = asyncio.create_task(_fetch_and_ingest(todo))
+        for k in todo:
+            _inflight[k] = task
+        task.add_done_callback(lambda t, ks=todo: _release(ks, t))
+        waiting.add(task)
+
+    if not waiting:
+        return len(wanted) == len(keys)
+
+    # Shield so a disconnecting client does not cancel a fetch others await
+    results = await asyncio.gather(*(asyncio.shield(t) for t in waiting))
+    return all(results) and len(wanted) == len(keys)
+
+
+def _refresh(keys: List[TileKey]):
+    """Refetch stale tiles in the background (coalesced with other fetches)."""
+    keys = [k for k in keys if k not in _inflight]
+    if not keys:
+        return
+    task = asyncio.create_task(fetch_tiles(keys))
+    _refreshing.add(task)
+    task.add_done_callback(_refreshing.discard)
+
+
+async def _load_bbox(bbox: BBox):
+    """Make sure the tiles overlapping a bbox are loaded; returns (keys, was_hit)."""
+    keys = tiles_for_bbox(bbox)
+
+    missing = _tiles.missing(keys)
+    if missing:
+        now = time.time()
+        absent = [k for k in missing if _tiles.age(k, now) is None]
+        stale = [k for k in missing if k not in absent]
+        if stale:
+            _refresh(stale)
+        if absent:
+            # Tiles that fail to load stay missing (or stale) and are retried
+            # once their negative-cache window has passed
+            await fetch_tiles(absent)
+            _tiles.prune()
+    return keys, not missing
+
+
+async def _load_area(lat: float, lng: float, radius: int):
+    """Make sure the tiles around a point are loaded; returns (bbox, keys, was_hit)."""
+    bbox = circle_bbox(lat, lng, radius)
+    keys, hit = await _load_bbox(bbox)
+    return bbox, keys, hit
+
+
+def unavailable_tiles(bbox: BBox) -> List[TileKey]:
+    """Tiles of a bbox without any data, fresh or stale (their last load failed)."""
+    now = time.time()
+    return [k for k in tiles_for_bbox(bbox) if _tiles.age(k, now) is None]
 
-    for element in overpass_data.get("elements", []):
-        if element["type"] != "way":
-            continue
 
-        tags = element.get("tags", {})
-        geometry = element.get("geometry", [])
+async def get_tracks_in_bbox(bbox: BBox) -> List[Track]:
+    """Get tracks whose bounding box intersects `bbox`."""
+    keys, _ = await _load_bbox(bbox)
+    return _tiles.query(bbox, keys)
 
-        if not geometry or len(geometry) < 2:
-            continue
 
-        track_type = classify_track_type(tags)
-        stats = get_track_stats_by_type(track_type)
-        coordinates = [[node["lon"], node["lat"]] for node in geometry]
-
-        name = tags.get("name", "")
-        if not name:
-            ref = tags.get("ref", "")
-            if ref:
-                name = f"Strecke {ref}"
-            elif track_type == "main":
-                name = "Hauptstrecke"
-            elif track_type == "branch":
-                name = "Nebenstrecke"
-            elif track_type == "freight":
-                name = "Güterstrecke"
-            else:
-                name = "Bahnstrecke"
-
-        tracks.append({
-            "id": element["id"],
-            "name": name,
-            "segment_id": str(element["id"]),
-            "track_type": track_type,
-            "electrified": tags.get("electrified", "no") != "no",
-            "multi_track": int(tags.get("tracks", "1")) > 1,
-            "geojson_geometry": {
-                "type": "LineString",
-                "coordinates": coordinates
-            },
-            "properties": {
-                "usage": tags.get("usage", ""),
-                "service": tags.get("service", ""),
-                "operator": tags.get("operator", ""),
-                "maxspeed": tags.get("maxspeed", ""),
-                "gauge": tags.get("gauge", ""),
-                "ref": tags.get("ref", ""),
-                **stats
-            }
-        })
+def _tracks_within(lat: float, lng: float, radius: int, bbox: BBox, keys: List[TileKey]) -> List[Track]:
+    return [t for t in _tiles.query(bbox, keys) if distance_to_line(lat, lng, t.coords) <= radius]
+
 
+def _nearest(lat: float, lng: float, radius: int, k: int, keys: List[TileKey]) -> List[Dict[str, Any]]:
+    best: Dict[int, Dict[str, Any]] = {}
+    for key in keys:
+        index = _tiles.segment_index(key)
+        if index is None:
+            continue
+        # A way crossing several tiles shows up in each; keep one
+        for hit in index.nearest(lat, lng, k=k, max_distance=radius):
+            way_id = hit["track"].id
+            if way_id not in best or hit["distance_m"] < best[way_id]["distance_m"]:
+                best[way_id] = hit
+    return sorted(best.values(), key=lambda h: h["distance_m"])[:k]
+
+
+async def get_cached_or_fetch_tracks(lat: float, lng: float, radius: int = 2000) -> List[Track]:
+    """Get tracks within `radius` meters, fetching only uncovered tiles."""
+    bbox, keys, hit = await _load_area(lat, lng, radius)
+    prefetcher.schedule_ring(keys)
+
+    tracks = _tracks_within(lat, lng, radius, bbox, keys)
+    if hit:
+        log.debug("Tile cache hit", extra={"lat": round(lat, 3), "lng": round(lng, 3), "tracks": len(tracks)})
     return tracks
 
 
-async def get_cached_or_fetch_tracks(lat: float, lng: float, radius: int = 2000) -> List[Dict[str, Any]]:
-    """Get tracks from cache or fetch from Overpass API."""
-    # Check cache
-    cached = _find_cached(lat, lng, radius)
-    if cached is not None:
-        print(f"Cache hit for {lat:.3f},{lng:.3f} ({len(cached)} tracks)")
-        return cached
+async def get_nearest_tracks(lat: float, lng: float, radius: int = 2000, k: int = 1) -> List[Dict[str, Any]]:
+    """
+    The k tracks nearest to a point within `radius` meters.
 
-    # Fetch fresh
-    overpass_data = await fetch_nearby_tracks(lat, lng, radius)
-    tracks = process_track_data(overpass_data)
+    Each result has the track, its perpendicular distance_m and the
+    closest_point on it, sorted by distance.
+    """
+    _, keys, _ = await _load_area(lat, lng, radius)
+    return _nearest(lat, lng, radius, k, keys)
 
-    # Cache
-    key = _grid_key(lat, lng, radius)
-    _cache[key] = (time.time(), tracks)
 
-    # Prune stale entries
-    now = time.time()
-    stale = [k for k, (ts, _) in _cache.items() if now - ts > CACHE_TTL * 2]
-    for k in stale:
-        del _cache[k]
+async def get_tracks_and_nearest(lat: float, lng: float, radius: int = 2000,
+                                 k: int = 1) -> Tuple[List[Track], List[Dict[str, Any]]]:
+    """get_cached_or_fetch_tracks and get_nearest_tracks from a single tile load."""
+    bbox, keys, _ = await _load_area(lat, lng, radius)
+    prefetcher.schedule_ring(keys)
+    return _tracks_within(lat, lng, radius, bbox, keys), _nearest(lat, lng, radius, k, keys)
 
-    return tracks
+
+# Warms the ring around viewed areas and PREFETCH_REGIONS; started in the app lifespan
+prefetcher = Prefetcher(
+    fetch_tiles,
+    lambda keys: _tiles.missing(keys, record=False),
+    overpass_budget,
+    PREFETCH_REGIONS,
+    CACHE_TTL / 2,
+)
+
+
+def tile_metrics() -> Dict[str, Any]:
+    """Tile cache counters, including stale tiles served while refreshing."""
+    return _tiles.metrics()
+
+
+def overpass_status() -> Dict[str, Any]:
+    return {
+        "servers": overpass_pool.metrics(),
+        "budget": overpass_budget.metrics(),
+        "tiles": len(_tiles),
+        "refreshing": len(_refreshing),
+        "prefetch": prefetcher.metrics(),
+    }
@@ -0,0 +1,281 @@
+"""
+Offline rail network import from an OSM PBF extract into the track store.
+
+    python -m app.pbf germany-latest.osm.pbf [--cover S,W,N,E] [--workdir DIR]
+
+Three streaming passes keep memory bounded on a whole-country extract:
+
+1. railway=rail|light_rail ways are selected inside libosmium; their tags
+   are spooled to a JSON-lines file and their node ids to a flat int64 file.
+2. Only the referenced nodes are read and written to a NodeIndex, a
+   sorted on-disk array of (id, lon, lat) searched with binary search.
+3. Ways are resolved against the index in chunks, parsed with the same
+   code as Overpass responses and upserted into track_segments.
+
+Only tiles lying fully inside the extract are then marked covered, as
+a tile on its border holds just part of its tracks: with --cover S,W,N,E
+(pass the extract's interior) every tile inside that box, so empty tiles
+are not asked from Overpass either; otherwise the tiles within the
+bounds in the extract's header that a stored way has a point in. Stored
+tiles expire after STORE_TTL: re-run the import (e.g. weekly from the
+daily Geofabrik extract) and Overpass is only needed for areas outside
+it or for fresher data.
+"""
+import math
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import osmium
+
+from . import store
+from .columnar import PROPERTY_TAGS, TrackBatchBuilder
+from .db import create_schema, engine
+from .geo import BBox
+from .overpass import _add_element
+from .telemetry import setup_logging
+from .tiles import TILE_DEG, TileKey
+
+log = logging.getLogger(__name__)
+
+RAIL_TAGS = (("railway", "rail"), ("railway", "light_rail"))
+# Tags read by the track parser; everything else is dropped in pass 1
+KEEP_TAGS = {"name", "ref", "railway", "usage", "service", "electrified", "tracks", *PROPERTY_TAGS}
+# Ways per store upsert in pass 3
+CHUNK_WAYS = 20_000
+
+# A way with nodes missing from the extract is split into its resolvable
+# runs; run k > 0 gets id + k * PIECE_ID_STEP (OSM way ids are far below)
+PIECE_ID_STEP = 10**11
+
+# libosmium keeps coordinates as fixed-point integers with 7 decimals
+COORD_SCALE = 1e7
+NODE_DTYPE = np.dtype([("id", "<i8"), ("x", "<i4"), ("y", "<i4")])
+
+
+class NodeIndex:
+    """
+    Node coordinates on disk, 16 bytes per node, sorted by id.
+
+    Nodes are appended in file order (PBF extracts are normally sorted by
+    id; otherwise the file is sorted once in finish()) and looked up in
+    bulk with searchsorted on a memory map.
+    """
+
+    BUFFER = 1 << 16
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "wb")
+        self._buffer: List[Tuple[int, int, int]] = []
+        self._data: Optional[np.ndarray] = None
+
+    def add(self, node_id: int, x: int, y: int):
+        self._buffer.append((node_id, x, y))
+        if len(self._buffer) >= self.BUFFER:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            np.array(self._buffer, dtype=NODE_DTYPE).tofile(self._file)
+            self.count += len(self._buffer)
+            self._buffer.clear()
+
+    def finish(self):
+        self._flush()
+        self._file.close()
+        if not self.count:
+            self._data = np.empty(0, dtype=NODE_DTYPE)
+            return
+        self._data = np.memmap(self.path, dtype=NODE_DTYPE, mode="r+")
+        ids = self._data["id"]
+        if np.any(ids[1:] < ids[:-1]):
+            log.info("Sorting node index", extra={"nodes": self.count})
+            self._data.sort(order="id")
+            self._data.flush()
+
+    def lookup(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """((N, 2) lon/lat, found mask) for node ids."""
+        data = self._data
+        pos = np.searchsorted(data["id"], ids)
+        pos = np.minimum(pos, max(len(data) - 1, 0))
+        found = data["id"][pos] == ids if len(data) else np.zeros(len(ids), dtype=bool)
+        coords = np.column_stack((data["x"][pos], data["y"][pos])) / COORD_SCALE if len(data) else np.empty((0, 2))
+        return coords, found
+
+
+def _spool_ways(path: str, meta_path: str, refs_path: str) -> Tuple[int, "osmium.IdTracker"]:
+    """Pass 1: rail ways -> tag spool and node-id file; returns (way count, referenced nodes)."""
+    tracker = osmium.IdTracker()
+    ways = 0
+    offset = 0
+    processor = osmium.FileProcessor(path, osmium.osm.WAY).with_filter(osmium.filter.TagFilter(*RAIL_TAGS))
+    with open(meta_path, "w", encoding="utf-8") as meta, open(refs_path, "wb") as refs:
+        for way in processor:
+            nodes = array("q", (n.ref for n in way.nodes))
+            nodes.tofile(refs)
+            tracker.add_references(way)
+            tags = {t.k: t.v for t in way.tags if t.k in KEEP_TAGS}
+            meta.write(json.dumps({"id": way.id, "tags": tags, "start": offset, "n": len(nodes)}) + "\n")
+            offset += len(nodes)
+            ways += 1
+    return ways, tracker
+
+
+def _index_nodes(path: str, tracker: "osmium.IdTracker", index: NodeIndex):
+    """Pass 2: coordinates of the referenced nodes only."""
+    processor = osmium.FileProcessor(path, osmium.osm.NODE).with_filter(tracker.id_filter())
+    for node in processor:
+        location = node.location
+        if location.valid():
+            index.add(node.id, location.x, location.y)
+    index.finish()
+
+
+def _pieces(coords: np.ndarray, found: np.ndarray) -> List[np.ndarray]:
+    """Runs of at least two consecutive resolved nodes, split where nodes are missing."""
+    resolved = np.flatnonzero(found)
+    runs = np.split(resolved, np.flatnonzero(np.diff(resolved) > 1) + 1)
+    return [coords[run] for run in runs if len(run) >= 2]
+
+
+def _point_tiles(coords: np.ndarray) -> Set[TileKey]:
+    """Tiles containing at least one of the (N, 2) lon/lat points."""
+    keys = np.floor(coords[:, ::-1] / TILE_DEG).astype(np.int64)
+    return {(row, col) for row, col in np.unique(keys, axis=0).tolist()}
+
+
+def _tiles_inside(bbox: BBox) -> Set[TileKey]:
+    """Tiles lying entirely inside a bounding box."""
+    south, west, north, east = (v / TILE_DEG for v in bbox)
+    # (the tolerance keeps a tile whose edge is the box edge up to rounding)
+    r0, c0 = math.ceil(south - 1e-9), math.ceil(west - 1e-9)
+    r1, c1 = math.floor(north + 1e-9), math.floor(east + 1e-9)
+    return {(r, c) for r in range(r0, r1) for c in range(c0, c1)}
+
+
+def _extract_bounds(path: str) -> Optional[BBox]:
+    """Bounding box from the PBF header, if the extract has one."""
+    reader = osmium.io.Reader(path, osmium.osm.NOTHING)
+    try:
+        box = reader.header().box()
+    finally:
+        reader.close()
+    if not box.valid():
+        return None
+    return (box.bottom_left.lat, box.bottom_left.lon, box.top_right.lat, box.top_right.lon)
+
+
+def _load_ways(meta_path: str, refs_path: str, index: NodeIndex) -> Set[TileKey]:
+    """Pass 3: resolve, parse and store ways in chunks; returns the tiles their points are in."""
+    if os.path.getsize(refs_path):
+        refs = np.memmap(refs_path, dtype=np.int64, mode="r")
+    else:
+        refs = np.empty(0, dtype=np.int64)
+    touched: Set[TileKey] = set()
+    stored = skipped = 0
+
+    def flush(builder: TrackBatchBuilder):
+        nonlocal stored
+        batch = builder.build()
+        for track in batch:
+            touched.update(_point_tiles(track.coords))
+        store.save_tiles([], batch)
+        stored += len(batch)
+        log.info("Stored ways", extra={"ways": stored, "skipped": skipped})
+
+    builder = TrackBatchBuilder()
+    pending = 0
+    with open(meta_path, encoding="utf-8") as meta:
+        for line in meta:
+            way = json.loads(line)
+            coords, found = index.lookup(refs[way["start"]:way["start"] + way["n"]])
+            # Truncated extract: keep the resolvable parts, never a line across the gap
+            pieces = _pieces(coords, found)
+            if not pieces:
+                skipped += 1
+                continue
+            for k, piece in enumerate(pieces):
+                if not _add_element(builder, {
+                    "type": "way",
+                    "id": way["id"] + k * PIECE_ID_STEP,
+                    "tags": way["tags"],
+                    "geometry": [{"lon": lon, "lat": lat} for lon, lat in piece.tolist()],
+                }):
+                    # Unparseable tags: one bad way must not abort a country import
+                    skipped += 1
+                    break
+                pending += 1
+            if pending >= CHUNK_WAYS:
+                flush(builder)
+                builder = TrackBatchBuilder()
+                pending = 0
+    if pending:
+        flush(builder)
+    elif skipped:
+        log.info("Stored ways", extra={"ways": stored, "skipped": skipped})
+    return touched
+
+
+def import_pbf(path: str, cover: Optional[BBox] = None, workdir: Optional[str] = None) -> Dict[str, int]:
+    """Import the rail network of a PBF extract; returns counts."""
+    started = time.time()
+    with tempfile.TemporaryDirectory(dir=workdir, prefix="signal-pbf-") as tmp:
+        meta_path = os.path.join(tmp, "ways.jsonl")
+        refs_path = os.path.join(tmp, "way_nodes.i8")
+
+        ways, tracker = _spool_ways(path, meta_path, refs_path)
+        log.info("Pass 1 done", extra={"ways": ways, "seconds": round(time.time() - started)})
+
+        index = NodeIndex(os.path.join(tmp, "nodes.idx"))
+        _index_nodes(path, tracker, index)
+        del tracker
+        log.info("Pass 2 done", extra={"nodes": index.count, "seconds": round(time.time() - started)})
+
+        touched = _load_ways(meta_path, refs_path, index)
+
+    bounds = cover or _extract_bounds(path)
+    if bounds is None:
+        log.warning("No --cover and no bounds in the extract header; no tiles marked covered")
+        tiles: Set[TileKey] = set()
+    elif cover:
+        tiles = _tiles_inside(cover)
+    else:
+        tiles = touched & _tiles_inside(bounds)
+    store.save_tiles(sorted(tiles), [])
+    log.info("PBF import finished", extra={
+        "ways": ways,
+        "tiles": len(tiles),
+        "seconds": round(time.time() - started),
+    })
+    return {"ways": ways, "nodes": index.count, "tiles": len(tiles)}
+
+
+def _parse_bbox(text: str) -> BBox:
+    south, west, north, east = (float(v) for v in text.split(","))
+    return (south, west, north, east)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import railway ways from an OSM PBF extract into the track store")
+    parser.add_argument("pbf", help=".osm.pbf extract, e.g. germany-latest.osm.pbf from Geofabrik")
+    parser.add_argument("--cover", type=_parse_bbox,
+                        help="S,W,N,E inside the extract: mark every tile inside this box as covered")
+    parser.add_argument("--workdir", help="directory for the temporary node index (default: system temp)")
+    args = parser.parse_args()
+
+    setup_logging()
+    with engine.begin() as conn:
+        create_schema(conn)
+    import_pbf(args.pbf, args.cover, args.workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Background tile warming.
+
+Jobs are lists of tile keys: the ring of tiles around each viewed area,
+and blocks of PREFETCH_REGIONS (hot regions, "south,west,north,east"
+boxes separated by ";"), which are swept again before their tiles
+expire. One job runs at a time, and only while the Overpass budget has
+a free slot, so prefetching never queues ahead of user requests.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, FrozenSet, List
+
+from .clients import UpstreamBudget
+from .geo import BBox
+from .tiles import TileKey, ring_tiles, tiles_for_bbox
+
+log = logging.getLogger(__name__)
+
+QUEUE_MAX = 256
+# Hot regions are fetched in blocks of BLOCK × BLOCK tiles per Overpass query
+BLOCK = 3
+# How long to back off while the budget is saturated
+IDLE_WAIT = 1.0
+
+
+def parse_regions(spec: str) -> List[BBox]:
+    """'s,w,n,e;s,w,n,e' -> list of bboxes; malformed entries are skipped."""
+    regions = []
+    for part in spec.split(";"):
+        try:
+            south, west, north, east = (float(v) for v in part.split(","))
+        except ValueError:
+            if part.strip():
+                log.warning("Ignoring malformed prefetch region", extra={"region": part})
+            continue
+        regions.append((south, west, north, east))
+    return regions
+
+
+PREFETCH_RING = int(os.getenv("PREFETCH_RING", "1"))  # 0 disables ring prefetch
+PREFETCH_REGIONS = parse_regions(os.getenv("PREFETCH_REGIONS", ""))
+
+
+def _blocks(keys: List[TileKey]) -> List[List[TileKey]]:
+    groups: Dict[TileKey, List[TileKey]] = {}
+    for r, c in keys:
+        groups.setdefault((r // BLOCK, c // BLOCK), []).append((r, c))
+    return list(groups.values())
+
+
+class Prefetcher:
+    """
+    Bounded queue of tile jobs drained by one background task.
+
+    `load` fetches a list of tiles (returns True on success) and `missing`
+    filters keys down to those not fresh in the cache; jobs are re-checked
+    when they are picked up, so tiles loaded in the meantime are skipped.
+    When the queue is full the oldest job is dropped.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[List[TileKey]], Awaitable[bool]],
+        missing: Callable[[List[TileKey]], List[TileKey]],
+        budget: UpstreamBudget,
+        regions: List[BBox],
+        sweep_interval: float,
+    ):
+        self._load = load
+        self._missing = missing
+        self._budget = budget
+        self.regions = regions
+        self.sweep_interval = sweep_interval
+        self._queue: "OrderedDict[FrozenSet[TileKey], List[TileKey]]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.loaded = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def schedule(self, keys: List[TileKey]):
+        keys = self._missing(keys)
+        if not keys:
+            return
+        job = frozenset(keys)
+        if job in self._queue:
+            return
+        if len(self._queue) >= QUEUE_MAX:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+        self._queue[job] = keys
+        self._wakeup.set()
+
+    def schedule_ring(self, keys: List[TileKey]):
+        """Warm the tiles around a viewed area."""
+        if PREFETCH_RING > 0:
+            self.schedule(ring_tiles(keys, PREFETCH_RING))
+
+    def schedule_regions(self):
+        for bbox in self.regions:
+            for block in _blocks(tiles_for_bbox(bbox)):
+                self.schedule(block)
+
+    async def _run(self):
+        next_sweep = 0.0
+        while True:
+            now = time.monotonic()
+            if self.regions and now >= next_sweep:
+                self.schedule_regions()
+                next_sweep = now + self.sweep_interval
+
+            if not self._queue:
+                self._wakeup.clear()
+                timeout = next_sweep - now if self.regions else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if self._budget.saturated():
+                await asyncio.sleep(IDLE_WAIT)
+                continue
+
+            _, keys = self._queue.popitem(last=False)
+            keys = self._missing(keys)
+            if not keys:
+                continue
+            try:
+                ok = await self._load(keys)
+            except Exception as e:
+                log.warning("Prefetch failed", extra={"tiles": len(keys), "error": str(e)})
+                ok = False
+            if ok:
+                self.loaded += len(keys)
+            else:
+                self.failed += len(keys)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._queue),
+            "loaded_tiles": self.loaded,
+            "failed_tiles": self.failed,
+            "dropped_jobs": self.dropped,
+            "regions": len(self.regions),
+        }
@@ -0,0 +1,31 @@
+import struct
+import zlib
+
+import numpy as np
+
+# dB rasters travel as uint8 in half-dB steps (0 - 127.5 dB)
+DB_SCALE = 2
+
+
+def quantize_db(levels: np.ndarray) -> np.ndarray:
+    """dB raster -> uint8 with DB_SCALE steps per dB."""
+    return np.clip(np.round(levels * DB_SCALE), 0, 255).astype(np.uint8)
+
+
+def encode_png(gray: np.ndarray) -> bytes:
+    """Encode a 2-D uint8 array as an 8-bit grayscale PNG."""
+    height, width = gray.shape
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    # Filter byte 0 (None) in front of every scanline
+    raw = np.hstack((np.zeros((height, 1), dtype=np.uint8), gray)).tobytes()
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
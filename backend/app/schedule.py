@@ -0,0 +1,167 @@
+"""
+Deterministic synthetic train schedules for segments without timetable data.
+
+A day's schedule is a pure function of (track_id, track_type, date): the
+generator is seeded from a hash of the three and the whole day is drawn
+with a few vectorized NumPy calls. Days are kept in a byte-bounded LRU,
+so /trains, /stats, /frequency and /noise all read the same schedule.
+"""
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import ByteLRU
+from .models import TrainType
+from .noise import DAY_HOURS, get_track_stats_by_type
+from .timetable import Cursor, encode_cursor
+
+SCHEDULE_CACHE_BYTES = 16 * 1024 * 1024
+
+# Type codes index these tables
+TYPES = (TrainType.FERNVERKEHR, TrainType.REGIONALVERKEHR, TrainType.SBAHN, TrainType.GUETERVERKEHR)
+FREIGHT = TYPES.index(TrainType.GUETERVERKEHR)
+OPERATORS = (("DB Fernverkehr",), ("DB Regio", "agilis", "Meridian"), ("S-Bahn",), ("DB Cargo", "TX Logistik", "RTB Cargo"))
+NUMBER_FORMATS = ("ICE {}", "RE {}", "S{}", "G{}")
+NUMBER_RANGE = np.array([(1, 999), (1, 99), (1, 8), (1000, 9999)])
+SPEED_RANGE = np.array([(120, 200), (80, 140), (60, 100), (40, 80)])
+N_OPERATORS = np.array([len(ops) for ops in OPERATORS])
+DIRECTIONS = ("Nord", "Süd", "Ost", "West")
+
+# Train ids are day.toordinal() * ID_STRIDE + position, so they increase
+# with (scheduled_time, id) across days and double as cursor keys
+ID_STRIDE = 10_000
+
+
+class DaySchedule:
+    """One day of trains for one segment, as time-sorted columns."""
+
+    __slots__ = ("day", "ids", "seconds", "types", "numbers", "operators", "directions", "speeds")
+
+    def __init__(self, day: date, seconds, types, numbers, operators, directions, speeds):
+        self.day = day
+        self.ids = day.toordinal() * ID_STRIDE + np.arange(len(seconds), dtype=np.int64)
+        self.seconds = seconds
+        self.types = types
+        self.numbers = numbers
+        self.operators = operators
+        self.directions = directions
+        self.speeds = speeds
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__[1:])
+
+    def train(self, i: int) -> Dict[str, Any]:
+        t = int(self.types[i])
+        return {
+            "id": int(self.ids[i]),
+            "train_type": TYPES[t].value,
+            "train_number": NUMBER_FORMATS[t].format(int(self.numbers[i])),
+            "direction": DIRECTIONS[self.directions[i]],
+            "scheduled_time": datetime.combine(self.day, datetime.min.time()) + timedelta(seconds=int(self.seconds[i])),
+            "operator": OPERATORS[t][self.operators[i]],
+            "speed_kmh": int(self.speeds[i]),
+        }
+
+    def window(self, start_s: float, end_s: float, limit: int, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Up to `limit` trains with start_s <= seconds-of-day < end_s and id > after_id."""
+        lo = int(np.searchsorted(self.seconds, start_s, side="left"))
+        if after_id is not None:
+            lo = max(lo, int(np.searchsorted(self.ids, after_id, side="right")))
+        hi = int(np.searchsorted(self.seconds, end_s, side="left"))
+        return [self.train(i) for i in range(lo, min(hi, lo + limit))]
+
+    def hourly(self) -> List[Dict[str, Any]]:
+        """Trains per hour of day, in the shape of frequency.hourly_profile()."""
+        bins = (self.seconds // 3600) * len(TYPES) + self.types
+        counts = np.bincount(bins, minlength=24 * len(TYPES)).reshape(24, len(TYPES))
+        speed_sums = np.bincount(self.seconds // 3600, weights=self.speeds, minlength=24)
+
+        hours = []
+        for hour in range(24):
+            total = int(counts[hour].sum())
+            freight = int(counts[hour, FREIGHT])
+            hours.append({
+                "hour": hour,
+                "passenger": total - freight,
+                "freight": freight,
+                "total": total,
+                "by_type": {t.value: int(c) for t, c in zip(TYPES, counts[hour])},
+                "avg_speed": float(speed_sums[hour]) / total if total else 0.0,
+            })
+        return hours
+
+
+def _seed(track_id: str, track_type: str, day: date) -> int:
+    key = f"{track_id}|{track_type}|{day.isoformat()}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def generate_day(track_id: str, track_type: str, day: date) -> DaySchedule:
+    """Draw one day's schedule; same arguments, same schedule."""
+    rng = np.random.default_rng(_seed(track_id, track_type, day))
+    stats = get_track_stats_by_type(track_type)
+
+    hours = np.arange(24)
+    daytime = (hours >= DAY_HOURS.start) & (hours < DAY_HOURS.stop)
+    per_hour = np.where(daytime, stats["day_trains_per_hour"], stats["night_trains_per_hour"])
+    hour_of = np.repeat(hours, per_hour)
+    n = len(hour_of)
+
+    seconds = hour_of * 3600 + rng.integers(0, 60, n) * 60
+    freight = rng.random(n) < stats["freight_percentage"]
+    types = np.where(freight, FREIGHT, rng.integers(0, FREIGHT, n))
+    numbers = rng.integers(NUMBER_RANGE[types, 0], NUMBER_RANGE[types, 1] + 1)
+    speeds = rng.integers(SPEED_RANGE[types, 0], SPEED_RANGE[types, 1] + 1)
+    operators = rng.integers(0, N_OPERATORS[types])
+    directions = rng.integers(0, len(DIRECTIONS), n)
+
+    order = np.argsort(seconds, kind="stable")
+    return DaySchedule(
+        day,
+        seconds[order].astype(np.int32),
+        types[order].astype(np.int8),
+        numbers[order].astype(np.int16),
+        operators[order].astype(np.int8),
+        directions[order].astype(np.int8),
+        speeds[order].astype(np.int16),
+    )
+
+
+_days = ByteLRU(SCHEDULE_CACHE_BYTES, sizeof=lambda s: s.nbytes, name="schedule")
+
+
+def get_day(track_id: str, track_type: str, day: date) -> DaySchedule:
+    """Cached generate_day()."""
+    key = (track_id, track_type, day)
+    schedule = _days.get(key)
+    if schedule is None:
+        schedule = generate_day(track_id, track_type, day)
+        _days.put(key, schedule)
+    return schedule
+
+
+def schedule_window(track_id: str, track_type: str, start: datetime, end: datetime, limit: int,
+                    after: Optional[Cursor] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trains in [start, end) after the cursor, plus the next page's cursor."""
+    after_id = after[1] if after is not None else None
+    trains: List[Dict[str, Any]] = []
+    day = start.date()
+    while day <= end.date() and len(trains) <= limit:
+        midnight = datetime.combine(day, datetime.min.time())
+        trains += get_day(track_id, track_type, day).window(
+            (start - midnight).total_seconds(),
+            (end - midnight).total_seconds(),
+            limit + 1 - len(trains),
+            after_id,
+        )
+        day += timedelta(days=1)
+
+    page = trains[:limit]
+    next_cursor = encode_cursor(page[-1]["scheduled_time"], page[-1]["id"]) if len(trains) > limit else None
+    return page, next_cursor
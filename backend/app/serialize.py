@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+from typing import Dict, List
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .cache import ByteLRU
+from .columnar import Track
+from .telemetry import SERIALIZE_LATENCY, timed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Serialized /api/tracks bodies, keyed by ETag, bounded by total bytes
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class EncodedBody:
+    """
+    One response body, pre-compressed once per encoding. A level of None
+    skips that encoding; variants that do not shrink the body are dropped.
+    """
+
+    __slots__ = ("identity", "gzip", "br")
+
+    def __init__(self, body: bytes, gzip_level: int | None = 6, br_quality: int | None = 5):
+        self.identity = body
+        self.gzip = gzip.compress(body, compresslevel=gzip_level) if gzip_level is not None else None
+        if self.gzip is not None and len(self.gzip) >= len(body):
+            self.gzip = None
+        self.br = brotli.compress(body, quality=br_quality) if brotli is not None and br_quality is not None else None
+        if self.br is not None and len(self.br) >= len(body):
+            self.br = None
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.identity) + len(self.gzip or b"") + len(self.br or b"")
+
+    def pick(self, accept_encoding: str):
+        """(body, content-encoding) best matching an Accept-Encoding header."""
+        accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+        if self.br is not None and "br" in accepted:
+            return self.br, "br"
+        if self.gzip is not None and "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.identity, None
+
+
+_bodies = ByteLRU(RESPONSE_CACHE_BYTES, sizeof=lambda body: body.nbytes, name="responses")
+
+
+def tracks_etag(tracks: List[Track]) -> str:
+    """Strong ETag over the serialized content of a track list."""
+    h = hashlib.blake2b(digest_size=16)
+    for t in tracks:
+        h.update(t.digest)
+    return f'"{h.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match already names `etag` (a 304 will do)."""
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+
+def tracks_response(request: Request, tracks: List[Track]) -> Response:
+    """
+    Serve a track list as JSON from pre-serialized bytes.
+
+    Per-track JSON is built once per Track; the joined body is compressed
+    once per distinct track set. A matching If-None-Match gets a 304.
+    """
+    tracks = sorted(tracks, key=lambda t: t.id)
+    etag = tracks_etag(tracks)
+    headers: Dict[str, str] = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    body = _bodies.get(etag)
+    if body is None:
+        with timed(SERIALIZE_LATENCY):
+            body = EncodedBody(b"[" + b",".join(t.to_json() for t in tracks) + b"]")
+        _bodies.put(etag, body)
+
+    content, encoding = body.pick(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,111 @@
+"""
+Frontend build (STATIC_DIR) served from memory.
+
+The directory is walked once at startup into a manifest of relative path
+-> StaticAsset, with gzip/brotli variants compressed at the highest
+levels (the build is a few MB, compressed once per process) and strong
+ETags. Requests are answered from the manifest only: no per-request
+stat, and a path that is not a manifest key (e.g. "../") cannot reach
+the filesystem at all. Unknown paths get index.html for client-side
+routing, except under api/ and assets/, which get a 404 instead of an
+HTML page a browser would cache as a script.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from .serialize import EncodedBody, etag_matches
+
+log = logging.getLogger(__name__)
+
+STATIC_DIR = os.getenv("STATIC_DIR", "/app/static")
+INDEX = "index.html"
+
+# Vite names built assets name-<8 char content hash>.ext
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Unhashed files (favicon, robots.txt, ...) may change with a deploy
+UNHASHED_MAX_AGE = 3600
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/wasm",
+                "application/manifest+json", "image/svg+xml")
+# Smaller files are not worth the Content-Encoding overhead
+MIN_COMPRESS_BYTES = 512
+NOT_FOUND_PREFIXES = ("api/", "assets/")
+
+mimetypes.add_type("text/javascript", ".js")
+mimetypes.add_type("text/javascript", ".mjs")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+
+
+class StaticAsset:
+    __slots__ = ("body", "media_type", "etag", "cache_control")
+
+    def __init__(self, path: str, content: bytes):
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        # (Starlette adds the charset to text/* itself)
+        if media_type.endswith(("json", "+xml")):
+            media_type += "; charset=utf-8"
+        if len(content) >= MIN_COMPRESS_BYTES and media_type.startswith(COMPRESSIBLE):
+            self.body = EncodedBody(content, gzip_level=9, br_quality=11)
+        else:
+            self.body = EncodedBody(content, gzip_level=None, br_quality=None)
+        self.media_type = media_type
+        self.etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+        if HASHED_ASSET.match(path):
+            self.cache_control = IMMUTABLE
+        elif path == INDEX:
+            self.cache_control = "no-cache"
+        else:
+            self.cache_control = f"public, max-age={UNHASHED_MAX_AGE}"
+
+
+_manifest: Dict[str, StaticAsset] = {}
+
+
+def load_manifest(root: str = STATIC_DIR) -> Dict[str, int]:
+    """(Re)build the manifest from `root`; returns file and byte counts."""
+    manifest: Dict[str, StaticAsset] = {}
+    size = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            full = os.path.join(dirpath, filename)
+            path = os.path.relpath(full, root).replace(os.sep, "/")
+            with open(full, "rb") as f:
+                content = f.read()
+            manifest[path] = StaticAsset(path, content)
+            size += len(content)
+    _manifest.clear()
+    _manifest.update(manifest)
+    if INDEX not in manifest:
+        log.warning("No frontend build found", extra={"static_dir": root})
+    log.info("Static manifest loaded", extra={"files": len(manifest), "bytes": size})
+    return {"files": len(manifest), "bytes": size}
+
+
+def _lookup(path: str) -> Optional[StaticAsset]:
+    path = path.lstrip("/")
+    asset = _manifest.get(path or INDEX)
+    if asset is None and not path.startswith(NOT_FOUND_PREFIXES):
+        asset = _manifest.get(INDEX)
+    return asset
+
+
+def static_response(request: Request, path: str) -> Response:
+    """A build file (or the SPA index) from memory, with ETag/304 and compression."""
+    asset = _lookup(path)
+    if asset is None:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+
+    headers = {"ETag": asset.etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request, asset.etag):
+        return Response(status_code=304, headers=headers)
+    content, encoding = asset.body.pick(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from typing import List, Iterable, Tuple
+
+from sqlalchemy import and_
+
+from .db import engine, SessionLocal
+from .columnar import PROPERTY_TAGS, Track, TrackBatch, TrackBatchBuilder
+from .models import TrackSegment, TrackTile, TrackType
+from .tiles import TileKey, union_bounds
+
+# Railway geometry changes rarely; stored tiles are refetched after a week
+STORE_TTL = timedelta(days=7)
+
+
+def _insert(table):
+    """Dialect-specific INSERT supporting ON CONFLICT upserts."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def _to_batch(segments: List[TrackSegment]) -> TrackBatch:
+    builder = TrackBatchBuilder()
+    for seg in segments:
+        props = seg.properties or {}
+        builder.add(
+            int(seg.segment_id),
+            seg.name or "",
+            seg.track_type.value,
+            bool(seg.electrified),
+            bool(seg.multi_track),
+            (props.get(k, "") for k in PROPERTY_TAGS),
+            (v for point in seg.geojson_geometry["coordinates"] for v in point),
+        )
+    return builder.build()
+
+
+def load_tiles(keys: List[TileKey]) -> Tuple[List[TileKey], List[Track]]:
+    """
+    Load tiles that are covered and fresh in the store.
+
+    Returns the covered tile keys and every stored track whose bbox
+    intersects them (a bbox range scan on ix_track_segments_bbox).
+    """
+    if not keys:
+        return [], []
+    cutoff = datetime.utcnow() - STORE_TTL
+    wanted = set(keys)
+
+    with SessionLocal() as db:
+        rows = db.query(TrackTile).filter(
+            TrackTile.row.in_({k[0] for k in keys}),
+            TrackTile.col.in_({k[1] for k in keys}),
+            TrackTile.fetched_at >= cutoff,
+        ).all()
+        covered = [(r.row, r.col) for r in rows if (r.row, r.col) in wanted]
+        if not covered:
+            return [], []
+
+        south, west, north, east = union_bounds(covered)
+        segments = db.query(TrackSegment).filter(and_(
+            TrackSegment.min_lat <= north,
+            TrackSegment.max_lat >= south,
+            TrackSegment.min_lng <= east,
+            TrackSegment.max_lng >= west,
+        )).all()
+        return covered, _to_batch(segments).tracks
+
+
+def save_tiles(keys: List[TileKey], tracks: Iterable[Track], fetched_at: datetime | None = None):
+    """
+    Bulk upsert fetched tracks (keyed on segment_id) and mark tiles covered.
+
+    Either may be empty, e.g. to store tracks first and mark coverage once
+    a bulk import is complete.
+    """
+    fetched_at = fetched_at or datetime.utcnow()
+
+    rows = []
+    for t in tracks:
+        south, west, north, east = t.bbox
+        rows.append({
+            "segment_id": t.segment_id,
+            "name": t.name,
+            "track_type": TrackType(t.track_type),
+            "electrified": t.electrified,
+            "multi_track": t.multi_track,
+            "geojson_geometry": {"type": "LineString", "coordinates": t.coords.tolist()},
+            "properties": t.properties,
+            "min_lat": south,
+            "min_lng": west,
+            "max_lat": north,
+            "max_lng": east,
+            "fetched_at": fetched_at,
+        })
+
+    with SessionLocal() as db:
+        if rows:
+            stmt = _insert(TrackSegment.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["segment_id"],
+                set_={c: stmt.excluded[c] for c in rows[0] if c != "segment_id"},
+            )
+            db.execute(stmt, rows)
+
+        if keys:
+            stmt = _insert(TrackTile.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["row", "col"],
+                set_={"fetched_at": stmt.excluded.fetched_at},
+            )
+            db.execute(stmt, [{"row": r, "col": c, "fetched_at": fetched_at} for r, c in keys])
+        db.commit()
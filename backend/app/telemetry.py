@@ -0,0 +1,131 @@
+"""
+Prometheus metrics and structured logging.
+
+Metrics are per process and served at /metrics. Cache counters are read
+from the caches at scrape time, so the hit ratio is
+rate(signal_cache_hits_total) / (rate(hits) + rate(misses)).
+
+Log records are written one JSON object per line (LOG_FORMAT=text for
+plain lines); fields passed as `extra` become keys of the object.
+"""
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Upstream calls take up to the 45 s client timeout
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60)
+
+REQUEST_LATENCY = Histogram(
+    "signal_http_request_duration_seconds", "API request latency by route template",
+    ["method", "route", "status"],
+)
+OVERPASS_LATENCY = Histogram(
+    "signal_overpass_request_duration_seconds", "Overpass request latency by mirror and outcome",
+    ["server", "status"], buckets=UPSTREAM_BUCKETS,
+)
+PARSE_LATENCY = Histogram(
+    "signal_overpass_parse_duration_seconds", "process_track_data duration",
+)
+PARSE_ELEMENTS = Histogram(
+    "signal_overpass_parse_elements", "Elements per parsed Overpass response",
+    buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000),
+)
+SERIALIZE_LATENCY = Histogram(
+    "signal_serialize_duration_seconds", "Building (and compressing) a track list response body",
+)
+NOMINATIM_LATENCY = Histogram(
+    "signal_nominatim_request_duration_seconds", "Nominatim search latency by outcome",
+    ["status"], buckets=UPSTREAM_BUCKETS,
+)
+
+
+@contextmanager
+def timed(histogram, **labels) -> Iterator[None]:
+    """Observe the duration of the block in `histogram`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - started)
+
+
+class CacheCollector:
+    """Exports the counters of in-process caches (see cache.cache_metrics)."""
+
+    COUNTERS = ("hits", "misses", "evictions", "expirations", "stale_hits")
+    GAUGES = ("entries", "bytes", "max_bytes")
+
+    def __init__(self, read: Callable[[], Dict[str, Dict]]):
+        self.read = read
+
+    def collect(self):
+        caches = self.read()
+        for field in self.COUNTERS:
+            family = CounterMetricFamily(f"signal_cache_{field}", f"Cache {field.replace('_', ' ')}", labels=["cache"])
+            for name, values in caches.items():
+                if field in values:
+                    family.add_metric([name], values[field])
+            yield family
+        for field in self.GAUGES:
+            family = GaugeMetricFamily(f"signal_cache_{field}", f"Cache {field.replace('_', ' ')}", labels=["cache"])
+            for name, values in caches.items():
+                family.add_metric([name], values[field])
+            yield family
+
+
+def register_caches(read: Callable[[], Dict[str, Dict]]):
+    REGISTRY.register(CacheCollector(read))
+
+
+def metrics_body() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+class JsonFormatter(logging.Formatter):
+    # Attributes every LogRecord has; anything else came in through `extra`
+    _STANDARD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._STANDARD:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_handler: logging.Handler | None = None
+
+
+def setup_logging():
+    """Log to stderr in LOG_FORMAT at LOG_LEVEL; safe to call more than once."""
+    global _handler
+    if _handler is not None:
+        return
+    _handler = logging.StreamHandler(sys.stderr)
+    if LOG_FORMAT == "json":
+        _handler.setFormatter(JsonFormatter())
+    else:
+        _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    # One line per upstream request duplicates the latency histograms
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
@@ -0,0 +1,229 @@
+import math
+import time
+from typing import Any, Dict, List, Set, Tuple, Iterable
+
+from .cache import ByteLRU
+from .columnar import Track
+from .geo import BBox, bbox_intersects
+from .nearest import SegmentIndex
+
+# Fixed grid: 0.05° is ~5.5 km N-S and ~3.5 km E-W in Germany, so a
+# default 2 km radius query touches between 1 and 6 tiles.
+TILE_DEG = 0.05
+
+TileKey = Tuple[int, int]
+
+
+def tile_for(lat: float, lng: float) -> TileKey:
+    """Grid tile containing a point."""
+    return (math.floor(lat / TILE_DEG), math.floor(lng / TILE_DEG))
+
+
+def tile_bounds(key: TileKey) -> BBox:
+    """(south, west, north, east) of a tile."""
+    row, col = key
+    return (row * TILE_DEG, col * TILE_DEG, (row + 1) * TILE_DEG, (col + 1) * TILE_DEG)
+
+
+def tiles_for_bbox(bbox: BBox) -> List[TileKey]:
+    """All tiles overlapping a bounding box."""
+    south, west, north, east = bbox
+    r0, c0 = tile_for(south, west)
+    r1, c1 = tile_for(north, east)
+    return [(r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+
+
+def ring_tiles(keys: Iterable[TileKey], width: int = 1) -> List[TileKey]:
+    """Tiles within `width` steps of `keys`, excluding `keys` themselves."""
+    keys = set(keys)
+    ring = {
+        (r + dr, c + dc)
+        for r, c in keys
+        for dr in range(-width, width + 1)
+        for dc in range(-width, width + 1)
+    }
+    return sorted(ring - keys)
+
+
+def union_bounds(keys: Iterable[TileKey]) -> BBox:
+    """Bounding box covering a set of tiles."""
+    bounds = [tile_bounds(k) for k in keys]
+    return (
+        min(b[0] for b in bounds),
+        min(b[1] for b in bounds),
+        max(b[2] for b in bounds),
+        max(b[3] for b in bounds),
+    )
+
+
+# Measured per-way memory beyond its coordinates: the Track and its own
+# single-way batch, index dict entries (WAY_OVERHEAD), and the JSON body and
+# digest Track.to_json() caches once the way is served (JSON_OVERHEAD plus
+# JSON_BYTES_PER_VERTEX, at most ~40 bytes per full-precision [lon,lat] pair)
+WAY_OVERHEAD = 1100
+JSON_OVERHEAD = 500
+JSON_BYTES_PER_VERTEX = 40
+
+
+def way_bytes(track: Track) -> int:
+    """Memory a way held by a TileIndex may take, including its cached JSON."""
+    coords = track.coords
+    return coords.nbytes + len(coords) * JSON_BYTES_PER_VERTEX + WAY_OVERHEAD + JSON_OVERHEAD
+
+
+class TileIndex:
+    """
+    Grid index of railway ways keyed by tile.
+
+    Each tile remembers when it was fetched and which ways intersect it.
+    A way crossing several tiles is stored once and referenced by each.
+
+    Tiles live in a ByteLRU bounded by `max_bytes` and dropped after
+    `max_age` seconds. Ways are detached from the fetch's TrackBatch on
+    ingest, so evicting tiles frees their coordinates instead of leaving
+    them pinned by a surviving neighbour from the same fetch. A tile's size
+    counts its ways' coordinates, bookkeeping and the JSON they cache when
+    served (counted up front, as it is filled in after the put); ways
+    shared between tiles are counted in each.
+    Nearest-segment indexes are rebuilt on demand and kept in a second,
+    separately bounded LRU.
+    """
+
+    def __init__(self, ttl: float, max_age: float, max_bytes: int, segment_bytes: int):
+        self.ttl = ttl
+        self._tiles = ByteLRU(
+            max_bytes, sizeof=lambda entry: entry[2], ttl=max_age, on_evict=self._release, name="tiles"
+        )
+        self._tracks: Dict[int, Track] = {}
+        self._bboxes: Dict[int, BBox] = {}
+        self._refs: Dict[int, int] = {}
+        self._segments = ByteLRU(segment_bytes, sizeof=lambda index: index.nbytes, name="tile_segments")
+        self.stale_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def is_fresh(self, key: TileKey, now: float | None = None) -> bool:
+        age = self.age(key, now)
+        return age is not None and age < self.ttl
+
+    def age(self, key: TileKey, now: float | None = None) -> float | None:
+        """Seconds since a tile was fetched; None if it is not loaded."""
+        entry = self._tiles.peek(key)
+        if entry is None:
+            return None
+        return (now or time.time()) - entry[0]
+
+    def missing(self, keys: Iterable[TileKey], record: bool = True) -> List[TileKey]:
+        """
+        Tiles from `keys` that are absent or expired.
+
+        With `record`, this counts as a lookup in the cache metrics (hit,
+        miss or stale hit) and marks the tiles as recently used.
+        """
+        now = time.time()
+        if not record:
+            return [k for k in keys if not self.is_fresh(k, now)]
+        result = []
+        for k in keys:
+            entry = self._tiles.get(k)
+            if entry is None:
+                result.append(k)
+            elif now - entry[0] >= self.ttl:
+                self.stale_hits += 1
+                result.append(k)
+        return result
+
+    def ingest(self, keys: Iterable[TileKey], tracks: Iterable[Track], fetched_at: float | None = None):
+        """
+        Store the result of a fetch that fully covered `keys`.
+
+        Ways are assigned to every covered tile their bbox intersects, so a
+        tile with no railway is still recorded as covered (and empty).
+        """
+        fetched_at = fetched_at or time.time()
+        keys = list(keys)
+        for k in keys:
+            self._drop_tile(k)
+
+        members: Dict[TileKey, Set[int]] = {k: set() for k in keys}
+        sizes: Dict[TileKey, int] = dict.fromkeys(keys, 0)
+        bounds = {k: tile_bounds(k) for k in keys}
+
+        for track in tracks:
+            way_id = track.id
+            bbox = track.bbox
+            hit = False
+            for k in keys:
+                if bbox_intersects(bbox, bounds[k]):
+                    members[k].add(way_id)
+                    sizes[k] += way_bytes(track)
+                    hit = True
+            if hit:
+                self._tracks[way_id] = track.detach()
+                self._bboxes[way_id] = bbox
+
+        for k in keys:
+            # Reference first: storing the tile may evict another one that
+            # shares ways with it
+            for way_id in members[k]:
+                self._refs[way_id] = self._refs.get(way_id, 0) + 1
+            self._tiles.put(k, (fetched_at, members[k], sizes[k] + WAY_OVERHEAD))
+
+    def query(self, bbox: BBox, keys: Iterable[TileKey] | None = None) -> List[Track]:
+        """Ways from the given (or overlapping) tiles whose bbox intersects `bbox`."""
+        if keys is None:
+            keys = tiles_for_bbox(bbox)
+        seen: Set[int] = set()
+        result = []
+        for k in keys:
+            entry = self._tiles.peek(k)
+            if entry is None:
+                continue
+            for way_id in entry[1]:
+                if way_id in seen:
+                    continue
+                seen.add(way_id)
+                if bbox_intersects(self._bboxes[way_id], bbox):
+                    result.append(self._tracks[way_id])
+        return result
+
+    def segment_index(self, key: TileKey) -> SegmentIndex | None:
+        """Nearest-segment index over a tile's ways."""
+        entry = self._tiles.peek(key)
+        if entry is None:
+            return None
+        index = self._segments.get(key)
+        if index is None:
+            index = SegmentIndex([self._tracks[w] for w in entry[1]])
+            self._segments.put(key, index)
+        return index
+
+    def prune(self) -> int:
+        """Drop tiles older than `max_age`; returns how many."""
+        return self._tiles.expire()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self._tiles.metrics(),
+            "stale_hits": self.stale_hits,
+            "ways": len(self._tracks),
+            "segment_index_bytes": self._segments.bytes,
+        }
+
+    def _drop_tile(self, key: TileKey):
+        entry = self._tiles.pop(key)
+        if entry is not None:
+            self._release(key, entry)
+
+    def _release(self, key: TileKey, entry: Tuple[float, Set[int], int]):
+        """Forget a removed tile: its segment index and its way references."""
+        self._segments.pop(key)
+        for way_id in entry[1]:
+            refs = self._refs.get(way_id, 0) - 1
+            if refs > 0:
+                self._refs[way_id] = refs
+            else:
+                self._refs.pop(way_id, None)
+                self._tracks.pop(way_id, None)
+                self._bboxes.pop(way_id, None)
@@ -0,0 +1,54 @@
+"""
+Upcoming-train windows over a segment's schedule.
+
+Stored passages are read by a range scan on ix_train_passages_segment_time
+(generated schedules are searched the same way, see schedule.py), so a
+window costs O(log n + limit). Pages are continued with an opaque keyset
+cursor over (scheduled_time, id).
+"""
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from .models import TrainPassage
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(scheduled_time: datetime, train_id: int) -> str:
+    raw = f"{scheduled_time.isoformat()}|{train_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverse of encode_cursor; raises ValueError on garbage."""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    when, train_id = raw.split("|")
+    return datetime.fromisoformat(when), int(train_id)
+
+
+def passage_window(db, segment_pk: int, start: datetime, end: datetime, limit: int,
+                   after: Optional[Cursor] = None) -> Tuple[List[TrainPassage], Optional[str]]:
+    """Stored passages of a segment in [start, end), as a keyset-paginated range scan."""
+    query = db.query(TrainPassage).filter(
+        TrainPassage.track_segment_id == segment_pk,
+        TrainPassage.scheduled_time >= start,
+        TrainPassage.scheduled_time < end,
+    )
+    if after is not None:
+        when, train_id = after
+        query = query.filter(or_(
+            TrainPassage.scheduled_time > when,
+            and_(TrainPassage.scheduled_time == when, TrainPassage.id > train_id),
+        ))
+    rows = query.order_by(TrainPassage.scheduled_time, TrainPassage.id).limit(limit + 1).all()
+
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].scheduled_time, page[-1].id) if len(rows) > limit else None
+    return page, next_cursor
+
+
+def has_passages(db, segment_pk: int) -> bool:
+    return db.query(TrainPassage.id).filter(TrainPassage.track_segment_id == segment_pk).first() is not None
@@ -0,0 +1 @@
+# Signal App Benchmarks
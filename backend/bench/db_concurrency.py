@@ -0,0 +1,85 @@
+"""
+DB concurrency benchmark: sync session inside `async def` vs. AsyncSession.
+
+Concurrent writers POST locations (with coordinates, so no geocoding)
+while a prober hits /api/health; a blocking commit shows up as prober
+latency. Uses DATABASE_URL, so point it at PostgreSQL for real numbers.
+
+Run from backend/:  python -m bench.db_concurrency [writers] [seconds]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.db import get_db, init_db
+from app.main import LocationCreate, app
+from app.models import Location
+
+
+@app.post("/bench/location-sync")
+async def legacy_create_location(location: LocationCreate, db: Session = Depends(get_db)):
+    """The previous /api/location persistence path."""
+    db_location = Location(name=location.name, lat=location.lat, lng=location.lng, address=location.address)
+    db.add(db_location)
+    db.commit()
+    db.refresh(db_location)
+    return {"id": db_location.id}
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return 0.0, 0.0
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99) - 1 if len(samples) > 1 else 0] * 1000
+
+
+async def run(client: httpx.AsyncClient, path: str, writers: int, seconds: float):
+    deadline = time.perf_counter() + seconds
+    writes, probes, errors = [], [], []
+
+    async def writer(i: int):
+        while time.perf_counter() < deadline:
+            t = time.perf_counter()
+            try:
+                r = await client.post(path, json={"name": f"bench {i}", "lat": 50.1, "lng": 8.6})
+                r.raise_for_status()
+            except Exception as e:
+                # e.g. pool checkout timing out while the event loop is blocked
+                errors.append(e)
+                continue
+            writes.append(time.perf_counter() - t)
+
+    async def prober():
+        while time.perf_counter() < deadline:
+            t = time.perf_counter()
+            await client.get("/api/health")
+            probes.append(time.perf_counter() - t)
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(prober(), *(writer(i) for i in range(writers)))
+    return writes, probes, errors
+
+
+async def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    await init_db()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{writers} writers, {seconds:.0f} s each")
+        for label, path in (("sync session", "/bench/location-sync"), ("AsyncSession", "/api/location")):
+            writes, probes, errors = await run(client, path, writers, seconds)
+            w50, w99 = percentiles(writes)
+            p50, p99 = percentiles(probes)
+            print(f"{label:13s} writes {len(writes) / seconds:7.0f}/s  p50 {w50:7.2f} ms  p99 {w99:7.2f} ms"
+                  f" | /api/health p50 {p50:6.2f} ms  p99 {p99:7.2f} ms | {len(errors)} errors")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,189 @@
+"""
+Load driver: a weighted mix of API requests from closed-loop workers,
+reporting p50/p99 latency and RPS per endpoint.
+
+Against a running backend (pointed at bench.stubs and a real database):
+
+    python -m bench.load --url http://127.0.0.1:9500 --concurrency 64 --duration 60
+
+Or everything in one process, with the stubs mounted as the upstream
+transport (no network; DATABASE_URL may be SQLite for a smoke run, use
+PostgreSQL for numbers that mean something):
+
+    python -m bench.load --in-process --latency 0.3 --error-429 0.05
+
+The Overpass budget (OVERPASS_RATE, OVERPASS_CONCURRENCY) applies to the
+stubs too: keep the defaults to see behaviour under the public limits,
+raise them to measure the backend itself.
+
+The mix defaults to tracks=40,dashboard=10,trains=20,stats=15,noise=15,
+location=0; trains/stats/noise use track ids seen in /api/tracks answers.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from bench import report, stubs
+
+DEFAULT_MIX = "tracks=40,dashboard=10,trains=20,stats=15,noise=15,location=0"
+# Request locations: jittered around these centres (lat, lng)
+CENTRES = [
+    (50.1109, 8.6821),  # Frankfurt
+    (52.5200, 13.4050),  # Berlin
+    (53.5511, 9.9937),  # Hamburg
+    (48.1351, 11.5820),  # München
+    (50.9375, 6.9603),  # Köln
+]
+JITTER_DEG = 0.02
+TRACK_POOL_MAX = 2000
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+class Driver:
+    """Closed-loop workers drawing endpoints from the mix; latencies per endpoint."""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, int], seed: int = 1):
+        self.client = client
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.rng = random.Random(seed)
+        self.track_ids: List[str] = []
+        self.samples: Dict[str, List[float]] = {n: [] for n in self.names}
+        self.errors: Dict[str, int] = {n: 0 for n in self.names}
+        self.recording = False
+        self.requests: Dict[str, Callable[[], Tuple[str, str, Dict]]] = {
+            "tracks": self._tracks,
+            "dashboard": self._dashboard,
+            "trains": self._trains,
+            "stats": self._stats,
+            "noise": self._noise,
+            "location": self._location,
+        }
+
+    def _point(self) -> Dict[str, float]:
+        lat, lng = self.rng.choice(CENTRES)
+        return {"lat": round(lat + self.rng.uniform(-JITTER_DEG, JITTER_DEG), 5),
+                "lng": round(lng + self.rng.uniform(-JITTER_DEG, JITTER_DEG), 5)}
+
+    def _track(self) -> str:
+        return self.rng.choice(self.track_ids)
+
+    def _tracks(self):
+        return "GET", "/api/tracks", {"params": {**self._point(), "radius": 2000}}
+
+    def _dashboard(self):
+        return "GET", "/api/dashboard", {"params": {**self._point(), "radius": 2000}}
+
+    def _trains(self):
+        return "GET", f"/api/tracks/{self._track()}/trains", {"params": {"hours": 12}}
+
+    def _stats(self):
+        return "GET", f"/api/tracks/{self._track()}/stats", {}
+
+    def _noise(self):
+        return "GET", f"/api/tracks/{self._track()}/noise", {"params": {"distance": self.rng.choice([50, 100, 250, 500])}}
+
+    def _location(self):
+        street = self.rng.choice(["Hauptstraße", "Bahnhofstraße", "Gartenweg", "Schillerstraße"])
+        address = f"{street} {self.rng.randint(1, 200)}, {self.rng.randint(10000, 99999)}"
+        return "POST", "/api/location", {"json": {"address": address}}
+
+    def _remember_tracks(self, resp: httpx.Response):
+        if len(self.track_ids) < TRACK_POOL_MAX:
+            self.track_ids.extend(str(t["id"]) for t in resp.json()[:20])
+
+    async def _one(self):
+        name = self.rng.choices(self.names, self.weights)[0]
+        if name in ("trains", "stats", "noise") and not self.track_ids:
+            name = "tracks"  # nothing to ask about yet
+        method, path, kwargs = self.requests[name]()
+        started = time.perf_counter()
+        try:
+            resp = await self.client.request(method, path, **kwargs)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok and name == "tracks":
+            self._remember_tracks(resp)
+        if not self.recording or name not in self.samples:
+            return
+        if ok:
+            self.samples[name].append(elapsed)
+        else:
+            self.errors[name] += 1
+
+    async def run(self, concurrency: int, warmup: float, duration: float) -> Dict[str, Dict[str, float]]:
+        stop_at = time.perf_counter() + warmup + duration
+
+        async def worker():
+            while time.perf_counter() < stop_at:
+                await self._one()
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        await asyncio.sleep(warmup)
+        self.recording = True
+        measured = time.perf_counter()
+        await asyncio.gather(*workers)
+        seconds = time.perf_counter() - measured
+
+        results = {n: report.summarize(self.samples[n], self.errors[n], seconds) for n in self.names}
+        everything = [s for n in self.names for s in self.samples[n]]
+        results["total"] = report.summarize(everything, sum(self.errors.values()), seconds)
+        return results
+
+
+async def run_in_process(args, mix: Dict[str, int]):
+    """Backend and stubs in this process; the stubs stand in for the public upstreams."""
+    from app import clients
+    from app.main import app
+
+    upstream = httpx.AsyncClient(transport=httpx.ASGITransport(app=stubs.app_from_args(args)),
+                                 headers={"User-Agent": clients.USER_AGENT})
+    async with app.router.lifespan_context(app):
+        await clients.close_client()
+        clients._client = upstream
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://signal",
+                                     timeout=60) as client:
+            return await Driver(client, mix).run(args.concurrency, args.warmup, args.duration)
+
+
+async def run_remote(args, mix: Dict[str, int]):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        return await Driver(client, mix).run(args.concurrency, args.warmup, args.duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the SIGNAL API")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running backend")
+    target.add_argument("--in-process", action="store_true", help="run backend and upstream stubs in this process")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds first (fills caches, track ids)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    stubs.add_arguments(parser)
+    report.add_arguments(parser)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    run = run_in_process if args.in_process else run_remote
+    results = asyncio.run(run(args, mix))
+    report.finish(args, f"{args.concurrency} workers, {args.duration:.0f} s, mix {args.mix}", results,
+                  {"mix": mix, "concurrency": args.concurrency, "duration": args.duration})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Microbenchmarks of hot request-path functions, p50/p99 per call and
+calls per second:
+
+- process_track_data: one Overpass response (n ways)
+- calculate_distance: one haversine
+- generate_day: one uncached day schedule (replaced generate_mock_trains)
+- schedule_window: a 12 h window from cached day schedules
+- exposure_levels: noise levels at 100 receivers
+
+Run from backend/:  python -m bench.micro [--samples 200] [--json out.json] [--baseline base.json]
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict
+
+import numpy as np
+
+from app.noise import Exposure, calculate_distance, type_codes
+from app.overpass import process_track_data
+from app.schedule import TYPES, generate_day, get_day, schedule_window
+from bench import report
+from bench.track_memory import synthetic_overpass
+
+
+def measure(fn: Callable[[], object], samples: int, per_sample: int, ops_per_call: int = 1) -> Dict[str, float]:
+    """Time `samples` batches of `per_sample` calls of `fn` (which does `ops_per_call` operations)."""
+    fn()  # warm up
+    timings = []
+    started = time.perf_counter()
+    for _ in range(samples):
+        t = time.perf_counter()
+        for _ in range(per_sample):
+            fn()
+        timings.append(time.perf_counter() - t)
+    return report.summarize(timings, 0, time.perf_counter() - started, per_sample * ops_per_call)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--ways", type=int, default=500, help="ways per Overpass response")
+    report.add_arguments(parser)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    overpass = synthetic_overpass(args.ways, 60)
+    points = [(50 + rng.random(), 8 + rng.random(), 50 + rng.random(), 8 + rng.random()) for _ in range(1000)]
+    days = iter(range(1, 10**6))
+    today = date.today()
+    schedule = get_day("bench", "main", today)
+    exposure = Exposure(type_codes(TYPES)[schedule.types], schedule.speeds, schedule.seconds // 3600)
+    receivers = np.linspace(25, 1000, 100)
+    now = datetime.now()
+
+    results = {
+        "process_track_data": measure(lambda: process_track_data(overpass), max(args.samples // 10, 5), 1),
+        "calculate_distance": measure(lambda: [calculate_distance(*p) for p in points], args.samples, 1, len(points)),
+        "generate_day": measure(lambda: generate_day("bench", "main", today + timedelta(days=next(days))),
+                                args.samples, 10),
+        "schedule_window": measure(lambda: schedule_window("bench", "main", now, now + timedelta(hours=12), 100),
+                                   args.samples, 10),
+        "exposure_levels": measure(lambda: exposure.levels(receivers), args.samples, 10),
+    }
+
+    report.finish(args, f"Microbenchmarks ({args.ways} ways per Overpass response)", results,
+                  {"samples": args.samples, "ways": args.ways})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Nearest-track benchmark: first-vertex loop vs. SegmentIndex.
+
+Run from backend/:  python -m bench.nearest [n_ways]
+"""
+import random
+import sys
+import time
+
+from app.columnar import TrackBatchBuilder
+from app.nearest import SegmentIndex
+from app.noise import calculate_distance
+
+
+def synthetic_tracks(n: int, seed: int = 1):
+    """Random-walk ways around Frankfurt, 2-30 vertices each."""
+    rng = random.Random(seed)
+    tracks = []
+    for i in range(n):
+        lat = 50.0 + rng.random() * 0.5
+        lng = 8.4 + rng.random() * 0.8
+        coords = []
+        for _ in range(rng.randint(2, 30)):
+            coords.append([lng, lat])
+            lat += rng.uniform(-0.002, 0.002)
+            lng += rng.uniform(-0.003, 0.003)
+        tracks.append({"id": i, "geojson_geometry": {"type": "LineString", "coordinates": coords}})
+    return tracks
+
+
+def first_vertex_loop(tracks, lat, lng):
+    """The previous /api/dashboard implementation."""
+    nearest, min_distance = None, float("inf")
+    for track in tracks:
+        coords = track["geojson_geometry"]["coordinates"][0]
+        distance = calculate_distance(lat, lng, coords[1], coords[0])
+        if distance < min_distance:
+            min_distance, nearest = distance, track
+    return nearest, min_distance
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    tracks = synthetic_tracks(n)
+    rng = random.Random(2)
+    points = [(50.0 + rng.random() * 0.5, 8.4 + rng.random() * 0.8) for _ in range(200)]
+
+    t = time.perf_counter()
+    for lat, lng in points:
+        first_vertex_loop(tracks, lat, lng)
+    loop_ms = (time.perf_counter() - t) / len(points) * 1000
+
+    builder = TrackBatchBuilder()
+    for t in tracks:
+        coords = t["geojson_geometry"]["coordinates"]
+        builder.add(t["id"], "", "main", False, False, (), (v for p in coords for v in p))
+    batch = builder.build()
+
+    t = time.perf_counter()
+    index = SegmentIndex(batch.tracks)
+    build_ms = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    for lat, lng in points:
+        index.nearest(lat, lng, k=5)
+    query_ms = (time.perf_counter() - t) / len(points) * 1000
+
+    print(f"{n} ways, {len(index)} segments")
+    print(f"first-vertex loop:     {loop_ms:8.3f} ms/query")
+    print(f"SegmentIndex build:    {build_ms:8.3f} ms (once per tile)")
+    print(f"SegmentIndex k=5:      {query_ms:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
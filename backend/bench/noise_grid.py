@@ -0,0 +1,52 @@
+"""
+Noise raster benchmark: noise_grid on rail-like synthetic tracks.
+
+Run from backend/:  python -m bench.noise_grid [n_tracks] [size]
+"""
+import math
+import random
+import sys
+import time
+
+from app.columnar import TrackBatchBuilder
+from app.noise import noise_grid
+
+BBOX = (50.10, 8.60, 50.14, 8.66)
+
+
+def synthetic_tracks(n: int, seed: int = 1):
+    """Gently curving 4 km ways with a vertex every 20 m."""
+    rng = random.Random(seed)
+    builder = TrackBatchBuilder()
+    for i in range(n):
+        lat = BBOX[0] + rng.random() * (BBOX[2] - BBOX[0])
+        lng = BBOX[1] + rng.random() * (BBOX[3] - BBOX[1])
+        heading = rng.random() * 2 * math.pi
+        coords = []
+        for _ in range(200):
+            coords.append([lng, lat])
+            heading += rng.uniform(-0.02, 0.02)
+            lat += 20 * math.cos(heading) / 111000
+            lng += 20 * math.sin(heading) / 71000
+        track_type = rng.choice(["main", "branch", "freight"])
+        builder.add(i, "", track_type, False, False, (), (v for p in coords for v in p))
+    return builder.build().tracks
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    tracks = synthetic_tracks(n)
+
+    noise_grid(tracks, BBOX, 64, 64)  # warm-up
+    runs = 5
+    t = time.perf_counter()
+    for _ in range(runs):
+        levels = noise_grid(tracks, BBOX, size, size)
+    ms = (time.perf_counter() - t) / runs * 1000
+
+    print(f"{n} tracks, {size}x{size} grid: {ms:.1f} ms ({levels.min():.1f}-{levels.max():.1f} dB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Overpass response parsing: buffered (text + json + process_track_data)
+vs. incremental TrackStreamParser fed in network-sized chunks.
+
+Reports time and peak memory allocated while parsing (the raw body is
+allocated before measuring, as it would be arriving from the socket).
+
+Run from backend/:  python -m bench.overpass_stream [n_ways] [nodes_per_way]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from app.overpass import TrackStreamParser, ijson, process_track_data
+from bench.track_memory import synthetic_overpass
+
+CHUNK = 64 * 1024
+
+
+def buffered(body: bytes):
+    """The previous path: resp.text for the JSON check, then resp.json()."""
+    text = body.decode()
+    assert text.strip().startswith("{")
+    return process_track_data(json.loads(body))
+
+
+def streamed(body: bytes):
+    parser = TrackStreamParser()
+    view = memoryview(body)
+    for i in range(0, len(body), CHUNK):
+        parser.feed(bytes(view[i:i + CHUNK]))
+    return parser.close()
+
+
+def measure(fn, body: bytes):
+    """(result, seconds, peak bytes)."""
+    gc.collect()
+    t = time.perf_counter()
+    fn(body)
+    elapsed = time.perf_counter() - t
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    body = json.dumps(synthetic_overpass(n, nodes)).encode()
+
+    print(f"{n} ways x {nodes} nodes, {len(body) / 1e6:.1f} MB body, ijson backend: "
+          f"{ijson.backend if ijson is not None else 'none (buffered fallback)'}")
+    for label, fn in (("buffered", buffered), ("streamed", streamed)):
+        batch, seconds, peak = measure(fn, body)
+        print(f"{label:9s} {seconds * 1000:8.1f} ms  peak {peak / 1e6:7.1f} MB  ({len(batch)} ways)")
+
+
+if __name__ == "__main__":
+    main()
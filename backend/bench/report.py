@@ -0,0 +1,81 @@
+"""
+Shared reporting for bench.load and bench.micro: p50/p99/RPS tables,
+JSON results and a regression check against a saved baseline.
+
+    python -m bench.micro --json micro.json                 # record a baseline
+    python -m bench.micro --baseline micro.json             # exit 1 on regression
+"""
+import argparse
+import json
+import math
+import sys
+from typing import Dict, List, Optional
+
+Results = Dict[str, Dict[str, float]]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of unsorted samples (0 if empty)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(samples: List[float], errors: int, seconds: float, per_sample: int = 1) -> Dict[str, float]:
+    """Latency samples (seconds, each covering `per_sample` operations) -> report row."""
+    return {
+        "count": len(samples) * per_sample,
+        "errors": errors,
+        "p50_ms": percentile(samples, 50) / per_sample * 1000,
+        "p99_ms": percentile(samples, 99) / per_sample * 1000,
+        "rps": len(samples) * per_sample / seconds if seconds > 0 else 0.0,
+    }
+
+
+def print_table(title: str, results: Results):
+    print(title)
+    print(f"  {'name':24s} {'count':>9s} {'errors':>7s} {'p50 ms':>10s} {'p99 ms':>10s} {'rps':>11s}")
+    for name, row in results.items():
+        print(f"  {name:24s} {row['count']:9d} {row['errors']:7d} "
+              f"{row['p50_ms']:10.3f} {row['p99_ms']:10.3f} {row['rps']:11.1f}")
+
+
+def regressions(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    """Rows whose p50/p99 grew or whose RPS fell by more than `tolerance` (0.2 = 20 %)."""
+    found = []
+    for name, row in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for field in ("p50_ms", "p99_ms"):
+            if base[field] > 0 and row[field] > base[field] * (1 + tolerance):
+                found.append(f"{name}: {field} {base[field]:.3f} -> {row[field]:.3f}")
+        if base["rps"] > 0 and row["rps"] < base["rps"] * (1 - tolerance):
+            found.append(f"{name}: rps {base['rps']:.1f} -> {row['rps']:.1f}")
+        if row["errors"] > base["errors"] and row["errors"] > row["count"] * 0.01:
+            found.append(f"{name}: errors {base['errors']} -> {row['errors']}")
+    return found
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--json", metavar="FILE", help="write results as JSON (e.g. to use as a baseline)")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a previous --json run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression vs. baseline (default 0.2)")
+
+
+def finish(args: argparse.Namespace, title: str, results: Results, meta: Optional[Dict] = None):
+    """Print, save and check results; exits with status 1 on a regression."""
+    print_table(title, results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta or {}, "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions vs. {args.baseline} (tolerance {args.tolerance:.0%})")
@@ -0,0 +1,72 @@
+"""
+Schedule generation benchmark: per-request random generation vs. the
+seeded, cached day schedules.
+
+Run from backend/:  python -m bench.schedule [n_requests]
+"""
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from app.schedule import _days, generate_day, get_day, schedule_window
+
+
+def legacy_mock_trains(hours: int = 24):
+    """The previous generate_mock_trains("main", hours), one dict per train."""
+    trains = []
+    now = datetime.now()
+    for hour in range(hours):
+        target_time = now + timedelta(hours=hour)
+        for _ in range(20 if 6 <= target_time.hour <= 22 else 4):
+            train_time = target_time.replace(minute=random.randint(0, 59), second=0, microsecond=0)
+            trains.append({
+                "id": random.randint(1000000, 9999999),
+                "train_type": random.choice(["fernverkehr", "regionalverkehr", "sbahn", "gueterverkehr"]),
+                "train_number": f"RE {random.randint(1, 99)}",
+                "scheduled_time": train_time,
+                "operator": random.choice(["DB Regio", "agilis", "Meridian"]),
+                "direction": random.choice(["Nord", "Süd", "Ost", "West"]),
+                "speed_kmh": random.randint(80, 140),
+                "minutes_until": int((train_time - now).total_seconds() / 60),
+            })
+    trains.sort(key=lambda x: x["scheduled_time"])
+    return trains
+
+
+def per_request_ms(fn, n: int) -> float:
+    t = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t) / n * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    today = date.today()
+    now = datetime.now()
+
+    legacy = per_request_ms(lambda i: legacy_mock_trains(24), n)
+    generate = per_request_ms(lambda i: generate_day(str(i), "main", today), n)
+
+    _days.clear()
+    for i in range(100):
+        get_day(str(i), "main", today)
+    hit_day = per_request_ms(lambda i: get_day(str(i % 100), "main", today), n)
+    hit_popup = per_request_ms(
+        lambda i: schedule_window(str(i % 100), "main", now, now + timedelta(hours=2), 1), n)
+    hit_list = per_request_ms(
+        lambda i: schedule_window(str(i % 100), "main", now, now + timedelta(hours=12), 100), n)
+    hit_hourly = per_request_ms(lambda i: get_day(str(i % 100), "main", today).hourly(), n)
+
+    print(f"{n} requests, {len(get_day('0', 'main', today))} trains/day")
+    print(f"legacy random 24h:      {legacy:8.3f} ms/request")
+    print(f"generate_day (miss):    {generate:8.3f} ms/request")
+    print(f"get_day (hit):          {hit_day:8.3f} ms/request")
+    print(f"window 2h, limit 1:     {hit_popup:8.3f} ms/request")
+    print(f"window 12h, limit 100:  {hit_list:8.3f} ms/request")
+    print(f"hourly profile:         {hit_hourly:8.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
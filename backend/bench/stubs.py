@@ -0,0 +1,181 @@
+"""
+Local Overpass and Nominatim stand-ins for load tests.
+
+Overpass (POST /api/interpreter) answers with the ways of a recorded
+response that intersect the query's bbox, or with synthetic ways inside
+it; Nominatim (GET /search) with a recorded result or a deterministic
+point in Germany. Both add latency and inject 429/504 at given rates.
+
+    python -m bench.stubs --port 9600 --latency 0.4 --jitter 0.2 --error-429 0.05 --error-504 0.02
+    OVERPASS_SERVERS=http://127.0.0.1:9600/api/interpreter NOMINATIM_URL=http://127.0.0.1:9600/search \\
+        python -m app.main
+
+Recordings are plain upstream responses, e.g.
+    curl -d 'data=[out:json];way["railway"="rail"](50.0,8.4,50.3,8.9);out body geom;' \\
+        https://overpass-api.de/api/interpreter > overpass.json
+and a JSON object {address: nominatim results} for --nominatim-recording.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.geocode import normalize_address
+
+BBOX_PATTERN = re.compile(r"\((-?[\d.]+),(-?[\d.]+),(-?[\d.]+),(-?[\d.]+)\)")
+# Synthetic density: ways per query and nodes per way
+SYNTHETIC_WAYS = 40
+SYNTHETIC_NODES = 30
+
+
+class StubConfig(NamedTuple):
+    latency: float = 0.3  # seconds
+    jitter: float = 0.1  # uniform +- seconds
+    error_429: float = 0.0  # share of requests
+    error_504: float = 0.0
+    seed: int = 1
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+
+def synthetic_ways(bbox, ways: int = SYNTHETIC_WAYS, nodes: int = SYNTHETIC_NODES) -> List[Dict[str, Any]]:
+    """Deterministic random-walk rail ways inside a bbox (same bbox, same ways)."""
+    south, west, north, east = bbox
+    rng = random.Random(_seed(f"{south:.5f},{west:.5f},{north:.5f},{east:.5f}"))
+    step = max(north - south, east - west) / nodes / 2
+    elements = []
+    for _ in range(ways):
+        lat = rng.uniform(south, north)
+        lon = rng.uniform(west, east)
+        geometry = []
+        for _ in range(nodes):
+            geometry.append({"lat": round(lat, 7), "lon": round(lon, 7)})
+            lat = min(max(lat + rng.uniform(-step, step), south), north)
+            lon = min(max(lon + rng.uniform(-step, step), west), east)
+        elements.append({
+            "type": "way",
+            # Ids derived from position so overlapping tiles share ways
+            "id": _seed(f"{geometry[0]['lat']},{geometry[0]['lon']}") % 10**10,
+            "tags": {
+                "railway": "rail",
+                "usage": rng.choice(["main", "main", "branch", "industrial"]),
+                "name": f"Strecke {rng.randint(1000, 9999)}",
+                "operator": rng.choice(["DB InfraGO", "HLB", "VGF"]),
+                "maxspeed": rng.choice(["80", "120", "160"]),
+                "electrified": rng.choice(["contact_line", "no"]),
+                "tracks": rng.choice(["1", "2"]),
+            },
+            "geometry": geometry,
+        })
+    return elements
+
+
+def _intersects(element: Dict[str, Any], bbox) -> bool:
+    south, west, north, east = bbox
+    return any(south <= p["lat"] <= north and west <= p["lon"] <= east for p in element.get("geometry") or ())
+
+
+def create_app(config: StubConfig, overpass_recording: Optional[Dict[str, Any]] = None,
+               nominatim_recording: Optional[Dict[str, List]] = None) -> FastAPI:
+    app = FastAPI(title="SIGNAL upstream stubs")
+    rng = random.Random(config.seed)
+    counts: Dict[str, int] = {}
+    recorded = (overpass_recording or {}).get("elements")
+    nominatim = {normalize_address(k): v for k, v in (nominatim_recording or {}).items()}
+
+    async def delay_or_fail(service: str) -> Optional[Response]:
+        """Sleep the configured latency; returns an error response to inject, if any."""
+        await asyncio.sleep(max(config.latency + rng.uniform(-config.jitter, config.jitter), 0.0))
+        roll = rng.random()
+        if roll < config.error_429:
+            outcome = "429"
+            response = Response("rate_limited", status_code=429, headers={"Retry-After": "1"})
+        elif roll < config.error_429 + config.error_504:
+            # Overpass sends an HTML page on gateway timeouts
+            outcome = "504"
+            response = Response("<html><body>504 Gateway Timeout</body></html>", status_code=504,
+                                media_type="text/html")
+        else:
+            outcome = "200"
+            response = None
+        counts[f"{service}_{outcome}"] = counts.get(f"{service}_{outcome}", 0) + 1
+        return response
+
+    @app.post("/api/interpreter")
+    async def overpass(request: Request):
+        query = parse_qs((await request.body()).decode()).get("data", [""])[0]
+        match = BBOX_PATTERN.search(query)
+        if match is None:
+            return Response("no bbox in query", status_code=400)
+        bbox = tuple(float(v) for v in match.groups())
+        error = await delay_or_fail("overpass")
+        if error is not None:
+            return error
+        if recorded is not None:
+            elements = [e for e in recorded if _intersects(e, bbox)]
+        else:
+            elements = synthetic_ways(bbox)
+        return JSONResponse({"version": 0.6, "generator": "signal bench stub", "elements": elements})
+
+    @app.get("/search")
+    async def search(q: str = ""):
+        error = await delay_or_fail("nominatim")
+        if error is not None:
+            return error
+        key = normalize_address(q)
+        if key in nominatim:
+            return JSONResponse(nominatim[key])
+        h = _seed(key)
+        lat = 47.5 + (h % 10_000) / 10_000 * 7.0
+        lon = 6.0 + (h // 10_000 % 10_000) / 10_000 * 9.0
+        return JSONResponse([{"lat": f"{lat:.7f}", "lon": f"{lon:.7f}", "display_name": q}])
+
+    @app.get("/stats")
+    async def stats():
+        return counts
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=StubConfig().latency, help="mean upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=StubConfig().jitter, help="uniform latency jitter (s)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--error-504", type=float, default=0.0, help="share of requests answered 504")
+    parser.add_argument("--overpass-recording", help="recorded Overpass JSON response to replay")
+    parser.add_argument("--nominatim-recording", help="JSON object {address: Nominatim results}")
+
+
+def app_from_args(args: argparse.Namespace) -> FastAPI:
+    def load(path):
+        if not path:
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    config = StubConfig(args.latency, args.jitter, args.error_429, args.error_504)
+    return create_app(config, load(args.overpass_recording), load(args.nominatim_recording))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overpass/Nominatim stubs for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9600)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(app_from_args(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
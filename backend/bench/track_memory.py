@@ -0,0 +1,118 @@
+"""
+Track representation benchmark: legacy nested dicts vs. columnar TrackBatch.
+
+Run from backend/:  python -m bench.track_memory [n_ways] [nodes_per_way]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from app.noise import get_track_stats_by_type
+from app.overpass import classify_track_type, process_track_data
+
+
+def synthetic_overpass(n: int, nodes: int, seed: int = 1):
+    """An Overpass `out body geom` response with n ways."""
+    rng = random.Random(seed)
+    operators = ["DB Netz AG", "DB InfraGO", "HLB", "VGF"]
+    elements = []
+    for i in range(n):
+        lat = 50.0 + rng.random() * 0.5
+        lon = 8.4 + rng.random() * 0.8
+        geometry = []
+        for _ in range(nodes):
+            geometry.append({"lat": lat, "lon": lon})
+            lat += rng.uniform(-0.0005, 0.0005)
+            lon += rng.uniform(-0.0005, 0.0005)
+        elements.append({
+            "type": "way",
+            "id": 10_000_000 + i,
+            "tags": {
+                "railway": "rail",
+                "usage": rng.choice(["main", "branch", ""]),
+                "operator": rng.choice(operators),
+                "gauge": "1435",
+                "maxspeed": rng.choice(["80", "120", "160"]),
+                "electrified": "contact_line",
+            },
+            "geometry": geometry,
+        })
+    return {"elements": elements}
+
+
+def legacy_process_track_data(overpass_data):
+    """The previous dict-per-way representation."""
+    tracks = []
+    for element in overpass_data.get("elements", []):
+        if element["type"] != "way":
+            continue
+        tags = element.get("tags", {})
+        geometry = element.get("geometry", [])
+        if not geometry or len(geometry) < 2:
+            continue
+        track_type = classify_track_type(tags)
+        stats = get_track_stats_by_type(track_type)
+        tracks.append({
+            "id": element["id"],
+            "name": tags.get("name", "") or "Bahnstrecke",
+            "segment_id": str(element["id"]),
+            "track_type": track_type,
+            "electrified": tags.get("electrified", "no") != "no",
+            "multi_track": int(tags.get("tracks", "1")) > 1,
+            "geojson_geometry": {
+                "type": "LineString",
+                "coordinates": [[node["lon"], node["lat"]] for node in geometry],
+            },
+            "properties": {
+                "usage": tags.get("usage", ""),
+                "service": tags.get("service", ""),
+                "operator": tags.get("operator", ""),
+                "maxspeed": tags.get("maxspeed", ""),
+                "gauge": tags.get("gauge", ""),
+                "ref": tags.get("ref", ""),
+                **stats,
+            },
+        })
+    return tracks
+
+
+def measure(fn, data):
+    """(result, seconds, bytes retained by the result)."""
+    gc.collect()
+    t = time.perf_counter()
+    fn(data)
+    elapsed = time.perf_counter() - t
+
+    # Separate traced run: tracemalloc itself slows allocation down
+    gc.collect()
+    tracemalloc.start()
+    result = fn(data)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    data = synthetic_overpass(n, nodes)
+
+    legacy, legacy_s, legacy_bytes = measure(legacy_process_track_data, data)
+    del legacy
+    batch, batch_s, batch_bytes = measure(process_track_data, data)
+
+    print(f"{n} ways x {nodes} nodes")
+    print(f"legacy dicts:  {legacy_s * 1000:8.1f} ms  {legacy_bytes / 1e6:8.1f} MB")
+    print(f"TrackBatch:    {batch_s * 1000:8.1f} ms  {batch_bytes / 1e6:8.1f} MB"
+          f"  ({legacy_bytes / max(batch_bytes, 1):.1f}x smaller)")
+
+    t = time.perf_counter()
+    for track in batch:
+        track.to_dict()
+    print(f"to_dict (response edge, all ways): {(time.perf_counter() - t) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
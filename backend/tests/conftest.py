@@ -0,0 +1,67 @@
+"""
+Tests run against a throwaway SQLite database (DATABASE_URL is set
+before the app is imported) and never leave the process: upstreams are
+the bench.stubs apps mounted as the shared client's transport.
+
+Run from backend/:  python -m pytest tests
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="signal-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/signal.db"
+os.environ.setdefault("LOG_FORMAT", "text")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from urllib.parse import urlsplit  # noqa: E402
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app import clients, overpass  # noqa: E402
+from app.clients import ServerPool, UpstreamBudget  # noqa: E402
+from app.db import engine  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.tiles import TileIndex  # noqa: E402
+from bench import stubs  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db_tables():
+    """Fresh tables for one test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def overpass_stubs(monkeypatch, db_tables):
+    """
+    Empty tile cache, fresh mirror health and an unthrottled budget;
+    install(config, ...) mounts one bench.stubs app per OVERPASS_SERVERS
+    mirror (the last config repeats) as the shared client's transport.
+    """
+    monkeypatch.setattr(overpass, "_tiles", TileIndex(overpass.CACHE_TTL, overpass.STALE_TTL,
+                                                      overpass.TILE_CACHE_BYTES, overpass.TILE_INDEX_BYTES))
+    monkeypatch.setattr(overpass, "_failed", {})
+    monkeypatch.setattr(overpass, "_inflight", {})
+    monkeypatch.setattr(overpass, "overpass_pool", ServerPool(overpass.OVERPASS_SERVERS))
+    monkeypatch.setattr(overpass, "overpass_budget", UpstreamBudget(8, 0))
+    previous = clients._client
+
+    def install(*configs: stubs.StubConfig) -> httpx.AsyncClient:
+        mounts = {}
+        for i, url in enumerate(overpass.OVERPASS_SERVERS):
+            app = stubs.create_app(configs[min(i, len(configs) - 1)])
+            mounts[f"all://{urlsplit(url).netloc}"] = httpx.ASGITransport(app=app)
+        clients._client = httpx.AsyncClient(mounts=mounts)
+        return clients._client
+
+    yield install
+    clients._client = previous
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import overpass
+from app.analysis import analyse_batch
+from app.db import SessionLocal
+from app.models import SavedAnalysis
+from bench.stubs import StubConfig
+
+HEALTHY = StubConfig(latency=0.0, jitter=0.0)
+DOWN = StubConfig(latency=0.0, jitter=0.0, error_504=1.0)
+
+SITES = [
+    SimpleNamespace(name="Bad Vilbel", lat=50.1785, lng=8.7360, address=None),
+    SimpleNamespace(name="Friedberg", lat=50.3340, lng=8.7590, address=None),
+    SimpleNamespace(name="Ohne Ort", lat=None, lng=None, address=None),
+]
+
+
+async def _analyse(radius: int = 2000):
+    return {r["index"]: r async for r in analyse_batch(SITES, radius)}
+
+
+@pytest.mark.anyio
+async def test_unavailable_tracks_are_an_error_not_no_track(overpass_stubs):
+    overpass_stubs(DOWN)
+    results = await _analyse()
+
+    for i in (0, 1):
+        assert results[i]["status"] == "error"
+        assert results[i]["error"] == "track data unavailable"
+        assert "nearest_track" not in results[i] and "analysis_id" not in results[i]
+    assert results[2]["status"] == "error" and results[2]["error"] == "lat/lng or address required"
+    with SessionLocal() as db:
+        assert db.query(SavedAnalysis).count() == 0
+
+
+@pytest.mark.anyio
+async def test_rows_report_ok_or_no_track(overpass_stubs):
+    overpass_stubs(HEALTHY)
+    results = await _analyse()
+
+    for i in (0, 1):
+        row = results[i]
+        assert row["status"] in ("ok", "no_track") and "error" not in row
+        assert (row["nearest_track"] is not None) == (row["status"] == "ok")
+        assert row["analysis_id"]
+    assert any(results[i]["status"] == "ok" for i in (0, 1))
+    assert not overpass.unavailable_tiles((50.17, 8.72, 50.19, 8.75))
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app import overpass
+from app.clients import ServerHealth
+from app.overpass import get_tracks_in_bbox
+from bench.stubs import StubConfig
+
+
+def _half_open(health: ServerHealth) -> ServerHealth:
+    for _ in range(health.FAILURE_THRESHOLD):
+        health.record_failure()
+    health.opened_at -= health.OPEN_SECONDS
+    assert health.state == "half_open"
+    return health
+
+
+def test_half_open_breaker_admits_one_probe():
+    health = _half_open(ServerHealth("https://overpass.example/api/interpreter"))
+    assert health.available()
+    assert health.admit()
+    # Everyone else is refused while the probe is in flight
+    assert not health.available()
+    assert not health.admit() and not health.admit()
+
+    health.record_success(0.2)
+    assert health.state == "closed"
+    assert health.admit() and health.admit()
+
+
+def test_failed_probe_reopens_the_breaker():
+    health = _half_open(ServerHealth("https://overpass.example/api/interpreter"))
+    assert health.admit()
+    health.record_failure()
+    assert health.state == "open" and not health.available()
+
+    health.opened_at -= health.OPEN_SECONDS
+    assert health.admit()
+
+
+def test_lost_probe_is_released_after_probe_seconds():
+    health = _half_open(ServerHealth("https://overpass.example/api/interpreter"))
+    assert health.admit()
+    health.probe_started -= health.PROBE_SECONDS
+    assert health.admit()
+
+
+@pytest.mark.anyio
+async def test_concurrent_requests_send_one_probe_per_mirror(overpass_stubs):
+    client = overpass_stubs(StubConfig(latency=0.2, jitter=0.0))
+    for health in overpass.overpass_pool.servers:
+        _half_open(health)
+
+    # Far-apart boxes, so the fetches are not coalesced into one
+    boxes = [(50.0 + i, 8.0, 50.02 + i, 8.04) for i in range(6)]
+    results = await asyncio.gather(*(get_tracks_in_bbox(bbox) for bbox in boxes))
+
+    assert sum(1 for tracks in results if tracks) == len(overpass.overpass_pool.servers)
+    for url in overpass.OVERPASS_SERVERS:
+        counts = (await client.get(f"https://{url.split('/')[2]}/stats")).json()
+        assert counts == {"overpass_200": 1}
+    assert all(h.state == "closed" for h in overpass.overpass_pool.servers)
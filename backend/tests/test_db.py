@@ -0,0 +1,99 @@
+from sqlalchemy import inspect, text
+
+from app import store
+from app.db import create_schema, engine
+from app.models import Base
+from app.overpass import process_track_data
+from app.tiles import tile_for
+
+# track_segments as created by the baseline (create_all at import time)
+OLD_TRACK_SEGMENTS = """
+CREATE TABLE track_segments (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(255),
+    segment_id VARCHAR(100) UNIQUE,
+    track_type VARCHAR(7) NOT NULL,
+    electrified BOOLEAN,
+    multi_track BOOLEAN,
+    geojson_geometry JSON,
+    created_at DATETIME
+)
+"""
+
+# locations as created before address_key/geocoded_at existed
+OLD_LOCATIONS = """
+CREATE TABLE locations (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(255),
+    lat FLOAT NOT NULL,
+    lng FLOAT NOT NULL,
+    address TEXT,
+    created_at DATETIME
+)
+"""
+# train_passages as created before GTFS imports were tracked
+OLD_TRAIN_PASSAGES = """
+CREATE TABLE train_passages (
+    id INTEGER PRIMARY KEY,
+    track_segment_id INTEGER,
+    train_type VARCHAR(15) NOT NULL,
+    train_number VARCHAR(50),
+    direction VARCHAR(100),
+    scheduled_time DATETIME NOT NULL,
+    actual_time DATETIME,
+    operator VARCHAR(100),
+    speed_kmh INTEGER,
+    created_at DATETIME
+)
+"""
+
+
+def test_create_schema_upgrades_existing_tables():
+    Base.metadata.drop_all(bind=engine)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(OLD_LOCATIONS))
+            conn.execute(text(OLD_TRAIN_PASSAGES))
+            conn.execute(text("INSERT INTO locations (lat, lng, address) VALUES (50.1, 8.6, 'Zeil 1')"))
+        # Twice: the upgrade is a no-op on an up-to-date schema
+        for _ in range(2):
+            with engine.begin() as conn:
+                create_schema(conn)
+
+        inspector = inspect(engine)
+        columns = {c["name"] for c in inspector.get_columns("locations")}
+        assert {"address_key", "geocoded_at"} <= columns
+        assert "ix_locations_address_key" in {i["name"] for i in inspector.get_indexes("locations")}
+        assert "import_id" in {c["name"] for c in inspector.get_columns("train_passages")}
+        assert {"ix_train_passages_import_id", "ix_train_passages_segment_time"} <= {
+            i["name"] for i in inspector.get_indexes("train_passages")}
+        assert inspector.get_foreign_keys("train_passages")[0]["referred_table"] == "gtfs_imports"
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE locations SET address_key = 'zeil 1', geocoded_at = CURRENT_TIMESTAMP"))
+            assert conn.execute(text("SELECT address FROM locations WHERE address_key = 'zeil 1'")).scalar() == "Zeil 1"
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+def test_create_schema_upgrades_baseline_track_segments():
+    Base.metadata.drop_all(bind=engine)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(OLD_TRACK_SEGMENTS))
+        with engine.begin() as conn:
+            create_schema(conn)
+
+        inspector = inspect(engine)
+        columns = {c["name"] for c in inspector.get_columns("track_segments")}
+        assert {"properties", "min_lat", "min_lng", "max_lat", "max_lng", "fetched_at"} <= columns
+        assert "ix_track_segments_bbox" in {i["name"] for i in inspector.get_indexes("track_segments")}
+
+        # The track store works on the upgraded table
+        way = {"type": "way", "id": 7, "tags": {"railway": "rail", "name": "Taunusbahn"},
+               "geometry": [{"lat": 50.101, "lon": 8.601}, {"lat": 50.111, "lon": 8.611}]}
+        key = tile_for(50.101, 8.601)
+        store.save_tiles([key], process_track_data({"elements": [way]}).tracks)
+        covered, tracks = store.load_tiles([key])
+        assert covered == [key] and [t.name for t in tracks] == ["Taunusbahn"]
+    finally:
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,48 @@
+import httpx
+import pytest
+
+from app import clients
+from app.geocode import query_nominatim
+from app.main import app
+
+
+@pytest.fixture
+def nominatim():
+    """Answers every Nominatim search with the body in `nominatim.body`."""
+    class Upstream:
+        body = b"[]"
+
+    upstream = Upstream()
+    previous = clients._client
+    clients._client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, content=upstream.body,
+                                       headers={"Content-Type": "application/json"})))
+    yield upstream
+    clients._client = previous
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("body", [b"<html>busy</html>", b'[{"display_name": "x"}]', b'{"error": "x"}'])
+async def test_malformed_response_raises_value_error(nominatim, body):
+    nominatim.body = body
+    with pytest.raises(ValueError):
+        await query_nominatim(f"Malformed {body!r}")
+
+
+@pytest.mark.anyio
+async def test_create_location_maps_malformed_response_to_502(db_tables, nominatim):
+    nominatim.body = b'[{"lat": "fifty"}]'
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://signal") as client:
+        resp = await client.post("/api/location", json={"address": "Kaiserstraße 1, Frankfurt"})
+    assert resp.status_code == 502
+
+
+@pytest.mark.anyio
+async def test_create_location_geocodes_and_caches(db_tables, nominatim):
+    nominatim.body = b'[{"lat": "50.1109", "lon": "8.6821"}]'
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://signal") as client:
+        first = await client.post("/api/location", json={"address": "Hauptstr. 1, Frankfurt"})
+        nominatim.body = b"[]"  # a second lookup would find nothing
+        second = await client.post("/api/location", json={"address": "hauptstrasse 1 frankfurt"})
+    assert first.status_code == 200 and first.json()["lat"] == pytest.approx(50.1109)
+    assert second.status_code == 200 and second.json()["lng"] == pytest.approx(8.6821)
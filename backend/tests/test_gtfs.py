@@ -0,0 +1,139 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func
+
+from app import gtfs
+from app.db import SessionLocal
+from app.frequency import hourly_profile
+from app.gtfs import import_feed
+from app.models import GtfsImport, TrackSegment, TrackType, TrainFrequency, TrainPassage, TrainType
+
+MONDAY = date(2026, 10, 19)
+
+FEED = {
+    "agency.txt": "agency_id,agency_name\nDB,DB Regio\n",
+    "calendar.txt": (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+        "weekdays,1,1,1,1,1,0,0,20260101,20271231\n"
+        "sundays,0,0,0,0,0,0,1,20260101,20271231\n"
+    ),
+    "routes.txt": (
+        "route_id,agency_id,route_short_name,route_type\n"
+        "re4,DB,RE 4,2\n"
+        "ice,DB,ICE,101\n"
+        "bus,DB,42,3\n"
+    ),
+    "trips.txt": (
+        "route_id,service_id,trip_id,trip_headsign,trip_short_name\n"
+        "re4,weekdays,t1,Frankfurt Hbf,RE 4711\n"
+        "ice,weekdays,t2,Berlin Hbf,\n"
+        "bus,weekdays,t3,Bornheim,\n"
+        "re4,sundays,t4,Frankfurt Hbf,RE 4713\n"
+    ),
+    "stops.txt": (
+        "stop_id,stop_name,stop_lat,stop_lon\n"
+        "on_track,Bad Vilbel,50.1000,8.6000\n"
+        "far_away,Feldberg,50.2300,8.4500\n"
+    ),
+    # t2 also runs past midnight; t3 is a bus, t4 does not run in the window
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "t1,07:09:00,07:10:00,on_track,1\n"
+        "t1,07:30:00,07:30:00,far_away,2\n"
+        "t2,23:50:00,23:50:00,on_track,1\n"
+        "t2,24:10:00,24:10:00,on_track,2\n"
+        "t3,08:00:00,08:00:00,on_track,1\n"
+        "t4,09:00:00,09:00:00,on_track,1\n"
+    ),
+}
+# Departures at on_track of rail trips in a Monday + Tuesday window
+EXPECTED_PASSAGES = 6
+
+
+@pytest.fixture
+def feed(tmp_path):
+    for name, content in FEED.items():
+        (tmp_path / name).write_text(content, encoding="utf-8")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def segment_id(db_tables):
+    """One track segment through the on_track stop."""
+    coordinates = [[8.5990, 50.0990], [8.6010, 50.1010]]
+    with SessionLocal() as db:
+        segment = TrackSegment(segment_id="osm_1", track_type=TrackType.MAIN,
+                               geojson_geometry={"type": "LineString", "coordinates": coordinates},
+                               min_lat=50.0990, min_lng=8.5990, max_lat=50.1010, max_lng=8.6010)
+        db.add(segment)
+        db.commit()
+        return segment.id
+
+
+def _passages(db):
+    return db.query(TrainPassage).order_by(TrainPassage.scheduled_time).all()
+
+
+def _rollup_total(db) -> int:
+    return db.query(func.coalesce(func.sum(TrainFrequency.passages), 0)).scalar()
+
+
+def test_import_loads_rail_passages_and_rollup(feed, segment_id):
+    job = import_feed(feed, MONDAY, days=2)
+    assert job.finished_at is not None and job.passages_loaded == EXPECTED_PASSAGES
+
+    with SessionLocal() as db:
+        passages = _passages(db)
+        assert len(passages) == EXPECTED_PASSAGES
+        assert {p.track_segment_id for p in passages} == {segment_id}
+        assert [p.scheduled_time.strftime("%a %H:%M") for p in passages] == [
+            "Mon 07:10", "Mon 23:50", "Tue 00:10", "Tue 07:10", "Tue 23:50", "Wed 00:10",
+        ]
+        re4 = passages[0]
+        assert (re4.train_type, re4.train_number, re4.direction, re4.operator) == (
+            TrainType.REGIONALVERKEHR, "RE 4711", "Frankfurt Hbf", "DB Regio")
+        assert passages[1].train_type == TrainType.FERNVERKEHR
+
+        assert _rollup_total(db) == EXPECTED_PASSAGES
+        profile = hourly_profile(db, segment_id)
+        # Two imported days: one RE per day at 7, one ICE per day at 23 and 0
+        assert profile[7]["total"] == 1.0 and profile[7]["by_type"]["regionalverkehr"] == 1.0
+        assert profile[23]["by_type"]["fernverkehr"] == 1.0
+        assert profile[0]["by_type"]["fernverkehr"] == 1.0
+
+
+def test_interrupted_import_resumes_without_duplicates(feed, segment_id, monkeypatch):
+    load_batch = gtfs._load_batch
+    calls = []
+
+    def failing_load_batch(db, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        load_batch(db, rows)
+
+    monkeypatch.setattr(gtfs, "_load_batch", failing_load_batch)
+    with pytest.raises(RuntimeError):
+        import_feed(feed, MONDAY, days=2, batch_rows=1)
+    with SessionLocal() as db:
+        interrupted = db.query(GtfsImport).one()
+        assert interrupted.finished_at is None and interrupted.rows_done == 1
+        assert len(_passages(db)) == _rollup_total(db) == 2
+
+    monkeypatch.setattr(gtfs, "_load_batch", load_batch)
+    job = import_feed(feed, MONDAY, days=2, batch_rows=1)
+    assert job.id == interrupted.id and job.finished_at is not None
+    with SessionLocal() as db:
+        assert len(_passages(db)) == _rollup_total(db) == EXPECTED_PASSAGES
+
+
+def test_reimport_supersedes_earlier_passages(feed, segment_id):
+    first = import_feed(feed, MONDAY, days=2)
+    assert import_feed(feed, MONDAY, days=2).id == first.id  # finished: nothing to do
+    second = import_feed(feed, MONDAY, days=2, force=True)
+    assert second.id != first.id
+    with SessionLocal() as db:
+        passages = _passages(db)
+        assert len(passages) == _rollup_total(db) == EXPECTED_PASSAGES
+        assert {p.import_id for p in passages} == {second.id}
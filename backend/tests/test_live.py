@@ -0,0 +1,74 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import live
+from app.live import LiveHub, SegmentFeed
+
+
+class Clock(datetime):
+    """datetime whose now() is set by the test."""
+    current = datetime(2026, 10, 19, 8, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+def _decode(event: bytes):
+    name, data = event.decode().strip().split("\n")
+    return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+@pytest.fixture
+async def hub(db_tables):
+    hub = LiveHub()
+    hub.start()
+    yield hub
+    await hub.stop()
+
+
+@pytest.mark.anyio
+async def test_new_subscriber_gets_current_server_time(hub, monkeypatch):
+    monkeypatch.setattr(live, "datetime", Clock)
+    feed, first = await hub.subscribe("4711")
+    name, clock = _decode(first.get_nowait())
+    assert name == "clock" and clock["server_time"] == Clock.current.isoformat()
+    name, snapshot = _decode(first.get_nowait())
+    assert name == "snapshot" and "server_time" not in snapshot and snapshot["trains"]
+
+    # Later subscribers share the cached snapshot but not its age
+    monkeypatch.setattr(Clock, "current", Clock.current + timedelta(minutes=10))
+    cached = feed.snapshot()
+    _, second = await hub.subscribe("4711")
+    name, clock = _decode(second.get_nowait())
+    assert name == "clock" and clock["server_time"] == Clock.current.isoformat()
+    assert second.get_nowait() is cached
+    hub.unsubscribe(feed, first)
+    hub.unsubscribe(feed, second)
+    assert hub.feeds == {}
+
+
+@pytest.mark.anyio
+async def test_client_gone_during_first_load_is_unsubscribed(hub, monkeypatch):
+    load = SegmentFeed._load
+
+    def slow_load(self, now):
+        time.sleep(0.3)
+        return load(self, now)
+
+    monkeypatch.setattr(SegmentFeed, "_load", slow_load)
+    stream = hub.stream("4711")
+    first_event = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0.05)
+    assert hub.subscriber_count == 1
+
+    first_event.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first_event
+    assert hub.subscriber_count == 0
+    assert hub.feeds == {} and len(hub.wheel) == 0
+    await asyncio.sleep(0.3)  # let the abandoned load thread finish
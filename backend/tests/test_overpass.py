@@ -0,0 +1,61 @@
+import pytest
+
+from app import overpass, store
+from app.overpass import get_tracks_in_bbox, unavailable_tiles
+from app.tiles import tiles_for_bbox
+from bench.stubs import StubConfig
+
+HEALTHY = StubConfig(latency=0.0, jitter=0.0)
+RATE_LIMITED = StubConfig(latency=0.0, jitter=0.0, error_429=1.0)
+TIMING_OUT = StubConfig(latency=0.0, jitter=0.0, error_504=1.0)
+
+BBOX = (50.10, 8.66, 50.12, 8.70)
+PRIMARY, SECONDARY = (url.split("/")[2] for url in overpass.OVERPASS_SERVERS[:2])
+
+
+async def upstream_counts(client, host: str):
+    return (await client.get(f"https://{host}/stats")).json()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("failing", [RATE_LIMITED, TIMING_OUT], ids=["429", "504"])
+async def test_fails_over_to_the_next_mirror(overpass_stubs, failing):
+    client = overpass_stubs(failing, HEALTHY)
+
+    tracks = await get_tracks_in_bbox(BBOX)
+    assert tracks and not unavailable_tiles(BBOX)
+
+    primary = await upstream_counts(client, PRIMARY)
+    secondary = await upstream_counts(client, SECONDARY)
+    assert sum(primary.values()) == primary.get("overpass_429", 0) + primary.get("overpass_504", 0) > 0
+    assert secondary == {"overpass_200": 1}
+    health = {h["url"].split("/")[2]: h for h in overpass.overpass_pool.metrics()}
+    assert health[PRIMARY]["failures"] > 0 and health[SECONDARY]["failures"] == 0
+
+
+@pytest.mark.anyio
+async def test_failed_tiles_are_negatively_cached_and_not_stored(overpass_stubs):
+    client = overpass_stubs(TIMING_OUT)
+
+    assert await get_tracks_in_bbox(BBOX) == []
+    keys = tiles_for_bbox(BBOX)
+    assert sorted(unavailable_tiles(BBOX)) == sorted(keys)
+    assert set(overpass._failed) == set(keys)
+    covered, _ = store.load_tiles(keys)
+    assert covered == []
+    attempts = await upstream_counts(client, PRIMARY)
+
+    # Within NEGATIVE_TTL the failure is not retried, even with the upstream back
+    client = overpass_stubs(HEALTHY)
+    assert await get_tracks_in_bbox(BBOX) == []
+    assert await upstream_counts(client, PRIMARY) == {}
+    assert attempts.get("overpass_504", 0) > 0
+
+    # Once it has passed, the tiles are fetched, cached and stored
+    overpass._failed.clear()
+    tracks = await get_tracks_in_bbox(BBOX)
+    assert tracks and not unavailable_tiles(BBOX)
+    covered, stored = store.load_tiles(keys)
+    assert sorted(covered) == sorted(keys) and stored
+    assert await get_tracks_in_bbox(BBOX) == tracks
+    assert await upstream_counts(client, PRIMARY) == {"overpass_200": 1}
@@ -0,0 +1,111 @@
+import osmium
+import pytest
+
+from app import store
+from app.pbf import PIECE_ID_STEP, import_pbf
+from app.tiles import tile_for
+
+# (way id, tags, node coordinates (lat, lon))
+WAYS = [
+    (100, {"railway": "rail", "usage": "main", "name": "Main-Weser-Bahn", "tracks": "2"},
+     [(50.10, 8.60), (50.11, 8.61), (50.12, 8.62)]),
+    # Real-world tag values that are not plain integers
+    (101, {"railway": "rail", "usage": "branch", "tracks": "2;1"}, [(50.20, 8.70), (50.21, 8.71)]),
+    (102, {"railway": "light_rail", "tracks": "2-3"}, [(50.30, 8.80), (50.31, 8.81)]),
+    # Not rail: filtered out in pass 1
+    (103, {"highway": "primary"}, [(50.40, 8.90), (50.41, 8.91)]),
+    # Diagonal across four tiles, with points in two of them
+    (104, {"railway": "rail"}, [(50.26, 8.51), (50.31, 8.56)]),
+    # Leaves the extract: nodes past its bounds are not in the file
+    (105, {"railway": "rail"}, [(50.46, 8.96), (50.48, 8.98), (50.52, 9.05)]),
+    # A node inside is missing (None): split there, not joined across
+    (106, {"railway": "rail"}, [(50.02, 8.52), (50.03, 8.53), None, (50.07, 8.57), (50.08, 8.58)]),
+]
+# Header bounds of the extract (S, W, N, E)
+BOUNDS = (50.0, 8.5, 50.5, 9.0)
+MISSING_NODE = 999_999
+
+
+@pytest.fixture
+def extract(tmp_path):
+    """A small .osm.pbf extract written with libosmium."""
+    path = tmp_path / "fixture.osm.pbf"
+    header = osmium.io.Header()
+    south, west, north, east = BOUNDS
+    header.add_box(osmium.osm.Box(osmium.osm.Location(west, south), osmium.osm.Location(east, north)))
+    writer = osmium.SimpleWriter(str(path), header=header)
+    node_id = 1
+    nodes, ways = [], []
+    for way_id, tags, coords in WAYS:
+        refs = []
+        for point in coords:
+            if point is None or not (south <= point[0] <= north and west <= point[1] <= east):
+                refs.append(MISSING_NODE)
+                continue
+            lat, lon = point
+            nodes.append(osmium.osm.mutable.Node(id=node_id, location=(lon, lat), tags={}))
+            refs.append(node_id)
+            node_id += 1
+        ways.append(osmium.osm.mutable.Way(id=way_id, nodes=refs, tags=tags))
+    for node in nodes:
+        writer.add_node(node)
+    for way in ways:
+        writer.add_way(way)
+    writer.close()
+    return str(path)
+
+
+def test_import_stores_rail_ways_and_covers_tiles(db_tables, extract):
+    counts = import_pbf(extract)
+    assert counts["ways"] == 6
+
+    keys = sorted({tile_for(lat, lon) for _, tags, coords in WAYS[:3] for lat, lon in coords})
+    covered, tracks = store.load_tiles(keys)
+    assert sorted(covered) == keys
+    by_id = {t.id: t for t in tracks}
+    assert {100, 101, 102} <= set(by_id)
+    assert by_id[100].name == "Main-Weser-Bahn"
+    assert by_id[100].multi_track and by_id[101].multi_track and by_id[102].multi_track
+    assert by_id[101].track_type == "branch"
+
+
+def test_import_is_idempotent(db_tables, extract):
+    import_pbf(extract)
+    import_pbf(extract)
+    keys = [tile_for(50.10, 8.60)]
+    _, tracks = store.load_tiles(keys)
+    assert [t.id for t in tracks].count(100) == 1
+
+
+def test_only_tiles_with_points_inside_the_extract_are_covered(db_tables, extract):
+    import_pbf(extract)
+
+    # Diagonal way: the two tiles its points are in, not the other two of its bbox
+    ends = [tile_for(50.26, 8.51), tile_for(50.31, 8.56)]
+    corners = [(ends[0][0], ends[1][1]), (ends[1][0], ends[0][1])]
+    covered, tracks = store.load_tiles(ends + corners)
+    assert sorted(covered) == sorted(ends)
+    assert 104 in {t.id for t in tracks}
+
+    # Border-crossing way: its tile inside the extract is covered, the partial one outside is not
+    inside, outside = tile_for(50.46, 8.96), tile_for(50.52, 9.05)
+    covered, tracks = store.load_tiles([inside, outside])
+    assert covered == [inside]
+    assert [t.coords.tolist() for t in tracks if t.id == 105] == [[[8.96, 50.46], [8.98, 50.48]]]
+
+
+def test_cover_marks_only_tiles_fully_inside_it(db_tables, extract):
+    import_pbf(extract, cover=(50.06, 8.56, 50.26, 8.76))
+    # 50.05-50.10 / 8.55-8.60 sticks out of the box; 50.10-50.15 / 8.60-8.65 lies inside it
+    covered, _ = store.load_tiles([tile_for(50.07, 8.57), tile_for(50.12, 8.62), tile_for(50.22, 8.72)])
+    assert sorted(covered) == sorted([tile_for(50.12, 8.62), tile_for(50.22, 8.72)])
+
+
+def test_ways_are_split_at_missing_nodes(db_tables, extract):
+    import_pbf(extract)
+    _, tracks = store.load_tiles([tile_for(50.02, 8.52), tile_for(50.07, 8.57)])
+    pieces = {t.id: t.coords.tolist() for t in tracks if t.id % PIECE_ID_STEP == 106}
+    assert pieces == {
+        106: [[8.52, 50.02], [8.53, 50.03]],
+        106 + PIECE_ID_STEP: [[8.57, 50.07], [8.58, 50.08]],
+    }
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from app import store
+from app.db import SessionLocal
+from app.models import TrackSegment
+from app.overpass import process_track_data
+from app.tiles import tile_for
+
+
+def _way(way_id: int, name: str, coords, **tags):
+    return {
+        "type": "way",
+        "id": way_id,
+        "tags": {"railway": "rail", "name": name, **tags},
+        "geometry": [{"lat": lat, "lon": lon} for lat, lon in coords],
+    }
+
+
+MAIN = _way(1, "Main-Weser-Bahn", [(50.101, 8.601), (50.111, 8.611)], usage="main", operator="DB InfraGO",
+            maxspeed="160", electrified="contact_line", tracks="2")
+BRANCH = _way(2, "Königsteiner Bahn", [(50.131, 8.621), (50.141, 8.631)], usage="branch", operator="HLB")
+TILE = tile_for(50.101, 8.601)
+OTHER_TILE = (TILE[0] + 5, TILE[1] + 5)
+
+
+def _tracks(*elements):
+    return process_track_data({"elements": list(elements)}).tracks
+
+
+def test_save_and_load_round_trip(db_tables):
+    saved = _tracks(MAIN, BRANCH)
+    store.save_tiles([TILE], saved)
+
+    covered, loaded = store.load_tiles([TILE, OTHER_TILE])
+    assert covered == [TILE]
+    by_id = {t.id: t for t in loaded}
+    assert set(by_id) == {1, 2}
+    for original in saved:
+        track = by_id[original.id]
+        assert track.to_dict() == original.to_dict()
+        assert track.bbox == original.bbox
+
+
+def test_uncovered_tiles_are_not_loaded(db_tables):
+    # Tracks stored without coverage (e.g. mid bulk import) do not count
+    store.save_tiles([], _tracks(MAIN))
+    assert store.load_tiles([TILE]) == ([], [])
+    assert store.load_tiles([]) == ([], [])
+
+
+def test_save_upserts_ways_and_tiles(db_tables):
+    store.save_tiles([TILE], _tracks(MAIN), fetched_at=datetime.utcnow() - timedelta(days=1))
+    renamed = dict(MAIN, tags={**MAIN["tags"], "name": "Main-Weser-Bahn (neu)"})
+    store.save_tiles([TILE], _tracks(renamed, BRANCH))
+
+    with SessionLocal() as db:
+        assert db.query(TrackSegment).filter(TrackSegment.segment_id == "1").count() == 1
+        assert db.query(TrackSegment).count() == 2
+    _, loaded = store.load_tiles([TILE])
+    assert {t.id: t.name for t in loaded} == {1: "Main-Weser-Bahn (neu)", 2: "Königsteiner Bahn"}
+
+
+def test_tiles_expire_after_store_ttl(db_tables):
+    old = datetime.utcnow() - store.STORE_TTL - timedelta(minutes=1)
+    store.save_tiles([TILE], _tracks(MAIN), fetched_at=old)
+    assert store.load_tiles([TILE]) == ([], [])
+
+    # A refetch marks the tile fresh again
+    store.save_tiles([TILE], _tracks(MAIN))
+    covered, loaded = store.load_tiles([TILE])
+    assert covered == [TILE] and [t.id for t in loaded] == [1]
@@ -0,0 +1,43 @@
+from app.overpass import process_track_data
+from app.tiles import TileIndex, tile_for, way_bytes
+from bench.track_memory import synthetic_overpass
+
+
+def _index(max_bytes: int = 10**9) -> TileIndex:
+    return TileIndex(ttl=3600, max_age=86400, max_bytes=max_bytes, segment_bytes=10**6)
+
+
+def test_ingested_ways_do_not_pin_the_fetched_batch():
+    batch = process_track_data(synthetic_overpass(50, 20))
+    keys = sorted({tile_for(t.bbox[0], t.bbox[1]) for t in batch})
+    index = _index()
+    index.ingest(keys, batch)
+
+    tracks = index.query((49, 8, 51, 10), keys)
+    assert len(tracks) == len(batch)
+    for track in tracks:
+        assert track._batch is not batch
+        assert track._batch.coords.base is None  # owns its buffer, not a view into batch.coords
+    original = {t.id: t for t in batch}
+    for track in tracks:
+        assert track.coords.tolist() == original[track.id].coords.tolist()
+        assert track.bbox == original[track.id].bbox
+
+
+def test_tile_size_covers_served_json():
+    batch = process_track_data(synthetic_overpass(50, 20))
+    keys = sorted({tile_for(t.bbox[0], t.bbox[1]) for t in batch})
+    index = _index()
+    index.ingest(keys, batch)
+    for track in index.query((49, 8, 51, 10), keys):
+        assert way_bytes(track) > track.coords.nbytes + len(track.to_json())
+
+
+def test_eviction_releases_ways():
+    batch = process_track_data(synthetic_overpass(50, 20))
+    keys = sorted({tile_for(t.bbox[0], t.bbox[1]) for t in batch})
+    index = _index(max_bytes=1)  # every tile is evicted by the next put
+    index.ingest(keys, batch)
+    assert len(index) <= 1
+    remaining = index.query((49, 8, 51, 10))
+    assert len(index._tracks) == len(remaining)
@@ -0,0 +1,71 @@
+import math
+
+import httpx
+import pytest
+
+from app import main, overpass
+from app.cache import ByteLRU
+from app.main import app
+from bench.stubs import StubConfig
+
+HEALTHY = StubConfig(latency=0.0, jitter=0.0)
+DOWN = StubConfig(latency=0.0, jitter=0.0, error_504=1.0)
+
+
+def tile_of(lat: float, lng: float, z: int):
+    n = 2 ** z
+    x = int((lng + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return z, x, y
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(main, "_mvt_cache", ByteLRU(1024 * 1024, sizeof=lambda entry: len(entry[0])))
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://signal")
+
+
+@pytest.mark.anyio
+async def test_vector_tile_is_not_cached_while_overpass_fails(overpass_stubs, api):
+    z, x, y = tile_of(50.1109, 8.6821, 14)
+    path = f"/api/tiles/{z}/{x}/{y}.mvt"
+
+    overpass_stubs(DOWN)
+    resp = await api.get(path)
+    assert resp.status_code == 503
+    assert resp.headers["cache-control"] == "no-store"
+    assert resp.headers["retry-after"] == str(overpass.NEGATIVE_TTL)
+    assert main._mvt_cache.get((z, x, y)) is None
+
+    # Upstream back, but the tiles are still in the negative cache
+    overpass_stubs(HEALTHY)
+    assert (await api.get(path)).status_code == 503
+
+    overpass._failed.clear()
+    resp = await api.get(path)
+    assert resp.status_code == 200
+    assert resp.content and resp.headers["cache-control"].startswith("public")
+    assert main._mvt_cache.get((z, x, y)) is not None
+
+
+@pytest.mark.anyio
+async def test_dashboard_loads_tiles_once(overpass_stubs, api, monkeypatch):
+    client = overpass_stubs(HEALTHY)
+    load_area = overpass._load_area
+    loads = []
+
+    async def counting_load_area(*args):
+        loads.append(args)
+        return await load_area(*args)
+
+    monkeypatch.setattr(overpass, "_load_area", counting_load_area)
+    resp = await api.get("/api/dashboard", params={"lat": 50.1109, "lng": 8.6821, "radius": 2000, "k": 3})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert len(loads) == 1
+    assert (await client.get("https://overpass-api.de/stats")).json() == {"overpass_200": 1}
+    nearest = body["nearest_tracks"]
+    assert body["tracks_found"] >= len(nearest) > 0
+    assert [h["distance_m"] for h in nearest] == sorted(h["distance_m"] for h in nearest)
+    assert body["nearest_track"] == nearest[0]["track"]
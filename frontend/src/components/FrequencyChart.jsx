@@ -10,44 +10,36 @@ const FrequencyChart = ({ segmentId }) => {
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    generateMockData()
+    fetchFrequency()
   }, [segmentId])
 
-  const generateMockData = () => {
-    // Generate hourly frequency data (24 hours)
-    const hourly = []
-    for (let hour = 0; hour < 24; hour++) {
-      let passengerTrains, freightTrains
-      
-      // Simulate realistic patterns
-      if (hour >= 6 && hour <= 22) { // Day time
-        passengerTrains = Math.floor(Math.random() * 15) + 10 // 10-25 trains
-        freightTrains = Math.floor(Math.random() * 8) + 2    // 2-10 trains
-      } else { // Night time
-        passengerTrains = Math.floor(Math.random() * 3) + 1  // 1-4 trains
-        freightTrains = Math.floor(Math.random() * 5) + 2   // 2-7 trains
-      }
-
-      hourly.push({
-        hour: hour.toString().padStart(2, '0'),
-        passenger: passengerTrains,
-        freight: freightTrains,
-        total: passengerTrains + freightTrains
-      })
-    }
+  const fetchFrequency = async () => {
+    setLoading(true)
+    try {
+      const response = await fetch(`/api/tracks/${segmentId}/frequency`)
+      if (response.ok) {
+        const data = await response.json()
+        const hourly = data.hours.map(h => ({
+          hour: h.hour.toString().padStart(2, '0'),
+          passenger: h.passenger,
+          freight: h.freight,
+          total: h.total
+        }))
 
-    // Generate pie chart data
-    const totalPassenger = hourly.reduce((sum, h) => sum + h.passenger, 0)
-    const totalFreight = hourly.reduce((sum, h) => sum + h.freight, 0)
-    
-    const pie = [
-      { name: 'Personenverkehr', value: totalPassenger, color: '#3b82f6' },
-      { name: 'Güterverkehr', value: totalFreight, color: '#ef4444' }
-    ]
+        const totalPassenger = hourly.reduce((sum, h) => sum + h.passenger, 0)
+        const totalFreight = hourly.reduce((sum, h) => sum + h.freight, 0)
 
-    setHourlyData(hourly)
-    setPieData(pie)
-    setLoading(false)
+        setHourlyData(hourly)
+        setPieData([
+          { name: 'Personenverkehr', value: Math.round(totalPassenger), color: '#3b82f6' },
+          { name: 'Güterverkehr', value: Math.round(totalFreight), color: '#ef4444' }
+        ])
+      }
+    } catch (error) {
+      console.error('Error fetching frequency:', error)
+    } finally {
+      setLoading(false)
+    }
   }
 
   const CustomTooltip = ({ active, payload, label }) => {
@@ -215,7 +207,7 @@ const FrequencyChart = ({ segmentId }) => {
       <div className="grid grid-1 lg:grid-3 gap-4">
         <div className="card text-center">
           <div className="text-2xl font-mono text-amber-400 mb-1">
-            {hourlyData.reduce((sum, h) => sum + h.total, 0)}
+            {Math.round(hourlyData.reduce((sum, h) => sum + h.total, 0))}
           </div>
           <div className="text-sm text-gray-400">Züge/Tag (gesamt)</div>
         </div>
@@ -248,13 +240,13 @@ const FrequencyChart = ({ segmentId }) => {
               <div className="flex justify-between">
                 <span>Hauptverkehrszeit (6-22h):</span>
                 <span className="font-mono text-green-400">
-                  {hourlyData.slice(6, 23).reduce((sum, h) => sum + h.total, 0)} Züge
+                  {Math.round(hourlyData.slice(6, 22).reduce((sum, h) => sum + h.total, 0))} Züge
                 </span>
               </div>
               <div className="flex justify-between">
                 <span>Nachtverkehr (22-6h):</span>
                 <span className="font-mono text-blue-400">
-                  {[...hourlyData.slice(22), ...hourlyData.slice(0, 6)].reduce((sum, h) => sum + h.total, 0)} Züge
+                  {Math.round([...hourlyData.slice(22), ...hourlyData.slice(0, 6)].reduce((sum, h) => sum + h.total, 0))} Züge
                 </span>
               </div>
             </div>
@@ -1,30 +1,13 @@
-import React, { useState, useEffect } from 'react'
+import React from 'react'
 import { useNavigate } from 'react-router-dom'
 import { X, Train, Clock, ArrowRight, MapPin } from 'lucide-react'
 import { motion } from 'framer-motion'
+import useLiveTrains from './useLiveTrains'
 
 const TrackPopup = ({ track, userLocation, onClose }) => {
   const navigate = useNavigate()
-  const [nextTrain, setNextTrain] = useState(null)
-  const [loading, setLoading] = useState(true)
-
-  useEffect(() => {
-    fetchNextTrain()
-  }, [track.id])
-
-  const fetchNextTrain = async () => {
-    try {
-      const response = await fetch(`/api/tracks/${track.id}/trains?hours=2`)
-      if (response.ok) {
-        const trains = await response.json()
-        setNextTrain(trains[0] || null)
-      }
-    } catch (error) {
-      console.error('Error fetching next train:', error)
-    } finally {
-      setLoading(false)
-    }
-  }
+  const { trains, loading } = useLiveTrains(track.id)
+  const nextTrain = trains.find(t => t.minutes_until >= 0) || null
 
   const formatDistance = (distance) => {
     if (distance < 1000) {
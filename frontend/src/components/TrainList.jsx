@@ -1,30 +1,10 @@
-import React, { useState, useEffect } from 'react'
+import React from 'react'
 import { Clock, Train, Navigation, Zap } from 'lucide-react'
 import { motion } from 'framer-motion'
+import useLiveTrains from './useLiveTrains'
 
 const TrainList = ({ segmentId }) => {
-  const [trains, setTrains] = useState([])
-  const [loading, setLoading] = useState(true)
-
-  useEffect(() => {
-    fetchTrains()
-    const interval = setInterval(fetchTrains, 60000) // Update every minute
-    return () => clearInterval(interval)
-  }, [segmentId])
-
-  const fetchTrains = async () => {
-    try {
-      const response = await fetch(`/api/tracks/${segmentId}/trains?hours=12`)
-      if (response.ok) {
-        const data = await response.json()
-        setTrains(data.filter(train => train.minutes_until >= -5)) // Include recently departed
-      }
-    } catch (error) {
-      console.error('Error fetching trains:', error)
-    } finally {
-      setLoading(false)
-    }
-  }
+  const { trains, loading } = useLiveTrains(segmentId)
 
   const getTrainTypeLabel = (type) => {
     switch (type) {
@@ -0,0 +1,60 @@
+import { useState, useEffect } from 'react'
+
+// Departed trains stay in the list this long
+const KEEP_DEPARTED_MS = 5 * 60000
+
+const expectedTime = (train) => new Date(train.actual_time || train.scheduled_time).getTime()
+
+// Upcoming trains of a segment from the live feed (Server-Sent Events):
+// one snapshot, then only departures, additions and delay changes.
+// minutes_until is computed here, against the server clock.
+const useLiveTrains = (segmentId) => {
+  const [trains, setTrains] = useState({})
+  const [loading, setLoading] = useState(true)
+  const [offset, setOffset] = useState(0)
+  const [now, setNow] = useState(Date.now())
+
+  useEffect(() => {
+    if (!segmentId) return
+    setLoading(true)
+    const source = new EventSource(`/api/tracks/${segmentId}/trains/live`)
+    const syncClock = (data) => setOffset(new Date(data.server_time).getTime() - Date.now())
+
+    source.addEventListener('clock', (e) => syncClock(JSON.parse(e.data)))
+    source.addEventListener('snapshot', (e) => {
+      const data = JSON.parse(e.data)
+      setTrains(Object.fromEntries(data.trains.map(t => [t.id, t])))
+      setLoading(false)
+    })
+    source.addEventListener('update', (e) => {
+      const data = JSON.parse(e.data)
+      syncClock(data)
+      setTrains(current => {
+        const next = { ...current }
+        for (const id of data.removed || []) delete next[id]
+        for (const id of data.departed || []) {
+          if (next[id]) next[id] = { ...next[id], departed_at: Date.now() }
+        }
+        for (const t of [...(data.added || []), ...(data.changed || [])]) next[t.id] = t
+        return next
+      })
+    })
+    source.onerror = () => setLoading(false)
+
+    const tick = setInterval(() => setNow(Date.now()), 15000)
+    return () => {
+      source.close()
+      clearInterval(tick)
+    }
+  }, [segmentId])
+
+  const serverNow = now + offset
+  const list = Object.values(trains)
+    .filter(t => !t.departed_at || now - t.departed_at < KEEP_DEPARTED_MS)
+    .map(t => ({ ...t, minutes_until: Math.floor((expectedTime(t) - serverNow) / 60000) }))
+    .sort((a, b) => expectedTime(a) - expectedTime(b))
+
+  return { trains: list, loading }
+}
+
+export default useLiveTrains